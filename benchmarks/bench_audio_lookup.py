@@ -0,0 +1,210 @@
+"""
+音频查找开销模拟基准。
+
+固件播放一个单词前先 SD.exists 再 SD.open <audio>/<单词>.wav,两次都要在 FAT
+目录中从头线性比较目录项（FatFs 只缓存一个扇区,第二次会重新读取）。本脚本在 PC 上
+按 FAT32 目录项布局（8.3 短名 1 项,长文件名每 13 个 UTF-16 字符再加 1 项,每项 32 字节）
+模拟这一过程的读扇区数,并与音频包方案对比: 新建只读连接按 word_id 查询
+<lang>_audio 索引（通过进程 I/O 计数得到实际读页数）,再 seek 一次。
+
+模拟时间 = 读扇区数 × 单扇区读取耗时（--sector-us）,只比较定位开销,音频数据本身
+两种方案读取量相同,不计入。
+
+用法:
+    python -m benchmarks.bench_audio_lookup                       # 合成 7000 个单词
+    python -m benchmarks.bench_audio_lookup --words 20000 --order random
+    python -m benchmarks.bench_audio_lookup --db words_study/en/en_words.db --audio-dir words_study/en/audio
+"""
+import argparse
+import math
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import string
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+from utils.audio_bundle import audio_index_table, pack_audio_bundle
+from utils.db_builder import LANG_SCHEMAS, _create_schema
+from utils.db_package import SD_SECTOR_SIZE, _open_readonly, _process_read_bytes, detect_lang
+
+FAT_DIR_ENTRY = 32
+_SFN_CHARS = set(string.ascii_letters + string.digits + "!#$%&'()-@^_`{}~")
+
+
+def fat_dir_entries(name: str) -> int:
+    """
+    文件名在 FAT32 目录中占用的目录项数。
+
+    主名不超过 8 个、扩展名不超过 3 个合法字符且各自全大写或全小写时,
+    FatFs 只写 8.3 短名（大小写记录在 NT 标志位）,否则额外写长文件名项。
+    """
+    stem, _, ext = name.rpartition(".")
+    if (
+        0 < len(stem) <= 8
+        and len(ext) <= 3
+        and set(stem + ext) <= _SFN_CHARS
+        and (stem.islower() or stem.isupper() or not any(c.isalpha() for c in stem))
+        and (ext.islower() or ext.isupper() or not ext)
+    ):
+        return 1
+    units = len(name.encode("utf-16-le")) // 2
+    return 1 + math.ceil(units / 13)
+
+
+def dir_scan_sectors(names: list) -> dict:
+    """
+    按目录顺序计算查找每个文件需要读取的扇区数（找到为止）,以及完整扫描一遍的扇区数。
+    """
+    entries_per_sector = SD_SECTOR_SIZE // FAT_DIR_ENTRY
+    position = 2  # 子目录开头的 "." 与 ".."
+    found = {}
+    for name in names:
+        position += fat_dir_entries(name)
+        found[name] = math.ceil(position / entries_per_sector)
+    return {"found": found, "full": math.ceil(position / entries_per_sector)}
+
+
+def make_library(root: Path, words: int, seed: int = 0) -> tuple:
+    """
+    生成合成英语词库与音频目录: 单词长度 2~14,少量含大写、空格或连字符,约 5% 没有音频。
+    """
+    rnd = random.Random(seed)
+    db_path = root / "en_words.db"
+    audio_dir = root / "audio"
+    audio_dir.mkdir()
+
+    conn = sqlite3.connect(db_path)
+    _create_schema(conn, "en", True)
+    seen = set()
+    while len(seen) < words:
+        word = "".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(2, 14)))
+        roll = rnd.random()
+        if roll < 0.05:
+            word = word.capitalize()
+        elif roll < 0.08:
+            word = word[: len(word) // 2] + " " + word[len(word) // 2 :]
+        elif roll < 0.10:
+            word = word[: len(word) // 2] + "-" + word[len(word) // 2 :]
+        seen.add(word)
+    words_list = sorted(seen, key=lambda _: rnd.random())
+    conn.executemany("INSERT INTO en_words (en, zh) VALUES (?, '')", ((w,) for w in words_list))
+    conn.commit()
+    conn.close()
+
+    for word in words_list:
+        if rnd.random() < 0.05:
+            continue
+        with wave.open(str(audio_dir / f"{word}.wav"), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(16000)
+            wf.writeframes(b"\0\0" * rnd.randint(100, 400))
+    return db_path, audio_dir
+
+
+def index_lookup_sectors(db_path: Path, lang: str, word_ids: list) -> list:
+    """
+    每次查询都新建只读连接（与固件每次操作打开数据库一致）,返回每次实际读取的扇区数。
+    """
+    table = audio_index_table(lang)
+    results = []
+    for word_id in word_ids:
+        before = _process_read_bytes()
+        conn = _open_readonly(db_path)
+        conn.execute(f"SELECT offset, length FROM {table} WHERE word_id = ?", (word_id,)).fetchone()
+        conn.close()
+        after = _process_read_bytes()
+        if before is None or after is None:
+            raise RuntimeError("当前平台无法读取进程 I/O 计数")
+        results.append(math.ceil((after - before) / SD_SECTOR_SIZE))
+    return results
+
+
+def summarize(name: str, sectors: list, sector_us: float) -> dict:
+    ordered = sorted(sectors)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    mean = statistics.fmean(sectors)
+    print(
+        f"{name:<26} mean {mean:8.1f} sectors  p95 {p95:6d}  max {ordered[-1]:6d}  "
+        f"≈ {mean * sector_us / 1000:8.2f} ms/lookup"
+    )
+    return {"mean": mean, "p95": p95, "max": ordered[-1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="词库数据库,不指定时生成合成词库")
+    parser.add_argument("--audio-dir", help="音频目录（与 --db 一起使用）")
+    parser.add_argument("--words", type=int, default=7000, help="合成词库的单词数")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--order", choices=("sorted", "scandir", "random"), default="sorted",
+                        help="音频文件写入 SD 卡目录的顺序")
+    parser.add_argument("--sector-us", type=float, default=500.0, help="SPI 模式下读取单个扇区的耗时（微秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if args.db:
+            if not args.audio_dir:
+                parser.error("--db 需要同时指定 --audio-dir")
+            db_path = tmp / Path(args.db).name
+            shutil.copyfile(args.db, db_path)
+            audio_dir = Path(args.audio_dir)
+        else:
+            db_path, audio_dir = make_library(tmp, args.words, args.seed)
+
+        conn = sqlite3.connect(db_path)
+        lang = detect_lang(conn)
+        key = LANG_SCHEMAS[lang]["key"][0]
+        words = conn.execute(f"SELECT id, {key} FROM {LANG_SCHEMAS[lang]['words']} WHERE {key} != ''").fetchall()
+        conn.close()
+
+        start = time.perf_counter()
+        summary = pack_audio_bundle(db_path, audio_dir, bundle_path=tmp / "audio.pack", lang=lang)
+        full_s = time.perf_counter() - start
+
+        # 修改少量音频后增量追加
+        touched = [name for name in sorted(os.listdir(audio_dir)) if name.endswith(".wav")][:10]
+        if not args.db:
+            for name in touched:
+                os.utime(audio_dir / name)
+        start = time.perf_counter()
+        incr = pack_audio_bundle(db_path, audio_dir, bundle_path=tmp / "audio.pack", lang=lang)
+        incr_s = time.perf_counter() - start
+
+        names = [entry.name for entry in os.scandir(audio_dir) if entry.name.endswith(".wav")]
+        rnd = random.Random(args.seed)
+        if args.order == "sorted":
+            names.sort()
+        elif args.order == "random":
+            rnd.shuffle(names)
+        scan = dir_scan_sectors(names)
+
+        print(
+            f"\n{lang}: {len(words)} words, {len(names)} audio files, directory {scan['full']} sectors "
+            f"({scan['full'] * SD_SECTOR_SIZE / 1024:.0f} KB), order={args.order}"
+        )
+        print(f"pack full {full_s:.2f} s ({summary['packed']} clips), incremental {incr_s:.2f} s ({incr['written']} clips)\n")
+
+        sample = [rnd.choice(words) for _ in range(args.lookups)]
+        fat = []
+        for _, word in sample:
+            name = f"{word}.wav"
+            # 存在: exists + open 各扫描到该项；不存在: exists 扫描整个目录后放弃
+            fat.append(2 * scan["found"][name] if name in scan["found"] else scan["full"])
+        # 包方案: 按索引查询 + 打开包文件时扫描上级目录（只有少量目录项,计 1 个扇区）
+        index = [s + 1 for s in index_lookup_sectors(db_path, lang, [word_id for word_id, _ in sample])]
+
+        a = summarize("FAT directory scan", fat, args.sector_us)
+        b = summarize("bundle index + seek", index, args.sector_us)
+        print(f"\nspeedup ≈ {a['mean'] / b['mean']:.1f}x fewer sectors per lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+前导静音检测基准测试。
+
+生成合成 WAV（8/16-bit、单/双声道,起音放在末尾附近）,对比向量化实现
+_find_onset_frame 与纯 Python 参考实现 _find_onset_frame_reference 的耗时。
+两者结果一致由 tests/test_audio_onset.py 校验（共用这里的 make_wav）。
+
+用法:
+    python -m benchmarks.bench_audio_onset --seconds 5
+"""
+import argparse
+import io
+import time
+import wave
+
+import numpy as np
+
+from utils.audio import _find_onset_frame, _find_onset_frame_reference
+
+
+def make_wav(nframes: int, nchannels: int, sampwidth: int, onset: int | None, seed: int) -> bytes:
+    """
+    生成一段前 onset 帧为低电平噪声、之后为满幅正弦的 WAV。
+    """
+    rng = np.random.default_rng(seed)
+    max_abs = 127 if sampwidth == 1 else 32767
+    amp = max_abs // 200
+    noise = rng.integers(-amp, amp + 1, size=(nframes, nchannels))
+    data = noise.astype(np.int32)
+    if onset is not None and onset < nframes:
+        t = np.arange(nframes - onset)
+        tone = (np.sin(2 * np.pi * 440 * t / 16000) * max_abs).astype(np.int32)
+        # 只在最后一个声道起音,覆盖多声道取峰值的逻辑
+        data[onset:, -1] = tone
+        # 起音帧放一个负向满幅样本,覆盖 abs 边界
+        data[onset, -1] = -max_abs - 1 if sampwidth == 2 else -128
+
+    if sampwidth == 1:
+        pcm = (data + 128).clip(0, 255).astype(np.uint8).tobytes()
+    else:
+        pcm = data.clip(-32768, 32767).astype("<i2").tobytes()
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(nchannels)
+        wf.setsampwidth(sampwidth)
+        wf.setframerate(16000)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+
+def read_raw(wav_bytes: bytes):
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
+        return wf.readframes(wf.getnframes()), wf.getnchannels(), wf.getsampwidth()
+
+
+def bench(seconds: float, runs: int) -> None:
+    nframes = int(16000 * seconds)
+    for sampwidth in (1, 2):
+        for nchannels in (1, 2):
+            # 起音放在末尾附近,相当于最坏情况的长静音
+            raw, ch, sw = read_raw(make_wav(nframes, nchannels, sampwidth, nframes - 10, 1))
+            threshold = max(1, int((127 if sw == 1 else 32767) * 0.015))
+            timings = {}
+            for name, fn in (("reference", _find_onset_frame_reference), ("vectorized", _find_onset_frame)):
+                start = time.perf_counter()
+                for _ in range(runs):
+                    fn(raw, ch, sw, threshold)
+                timings[name] = (time.perf_counter() - start) / runs * 1000
+            print(
+                f"{sw * 8:>2}-bit {ch}ch {seconds:.1f}s: "
+                f"reference {timings['reference']:8.2f} ms | "
+                f"vectorized {timings['vectorized']:6.3f} ms | "
+                f"x{timings['reference'] / timings['vectorized']:.0f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    bench(args.seconds, args.runs)
+
+
+if __name__ == "__main__":
+    main()
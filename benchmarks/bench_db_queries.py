@@ -0,0 +1,314 @@
+"""
+固件 SQL 回放基准测试。
+
+对 words_study/{jp,en}/*_words.db（以及放大 10 倍 / 100 倍的合成副本）逐条回放
+src/UtilsDb.cpp、src/UtilsWebServer.cpp 中的查询: 章节加载、分数统计、按分数分页、
+UPDATE score、词根 / 词缀 IN 查询、错题记录 JOIN 等,记录每条查询的
+
+- latency_ms: 热连接上多次执行的中位耗时
+- vm_steps:   VDBE 指令数（progress handler 计数）,与扫描的行数成正比,结果稳定可比
+- pages:      冷连接（与固件每次重新打开数据库一致）上实际读取的页数
+- sectors:    上述读取折合的 512 字节 SD 扇区数（不同页大小之间可比）
+- rows:       返回 / 影响的行数
+- plan:       EXPLAIN QUERY PLAN
+
+--save-baseline 保存结果；--baseline 与之对比,任一查询的 vm_steps 或 sectors
+超过基线 threshold 倍即判定为回归并以退出码 1 结束（--gate-latency 时耗时也参与判定）。
+写操作在事务中执行后回滚,不会修改数据库。
+
+用法:
+    python -m benchmarks.bench_db_queries --scales 1,10 --save-baseline bench_db_baseline.json
+    python -m benchmarks.bench_db_queries --scales 1,10 --baseline bench_db_baseline.json --threshold 1.2
+    python -m benchmarks.bench_db_queries --db sd_card/en_words.db --baseline bench_db_baseline.json
+"""
+import argparse
+import json
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from utils.db_package import (
+    SD_SECTOR_SIZE,
+    _open_readonly,
+    _process_read_bytes,
+    detect_lang,
+    explain_query_plan,
+    firmware_queries,
+)
+
+DEFAULT_DBS = ["words_study/en/en_words.db", "words_study/jp/jp_words.db"]
+PROGRESS_STEP = 8
+
+
+def scale_db(src_path: Path, dst_path: Path, factor: int) -> None:
+    """
+    生成放大 factor 倍的副本: 每一份复制的词条键加 "#k" 后缀,来源名同样加后缀,
+    因此章节大小不变而章节数、词条数、错题数和词根关联数都乘以 factor。
+    """
+    shutil.copyfile(src_path, dst_path)
+    conn = sqlite3.connect(str(dst_path))
+    try:
+        lang = detect_lang(conn)
+        words, source, errors = f"{lang}_words", f"{lang}_source", f"{lang}_errors"
+        if lang == "jp":
+            cols = "jp, zh, kanji, romaji, tone, score, sentence, sentence_zh"
+            copy_cols = "jp || :suffix, zh, kanji, romaji, tone, score, sentence, sentence_zh"
+            match = "w2.jp = w.jp || :suffix AND w2.tone = w.tone"
+        else:
+            cols = "en, zh, pos, phonetic, score, sentence, sentence_zh"
+            copy_cols = "en || :suffix, zh, pos, phonetic, score, sentence, sentence_zh"
+            match = "w2.en = w.en || :suffix"
+        max_id = conn.execute(f"SELECT MAX(id) FROM {words}").fetchone()[0]
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+        with conn:
+            for k in range(1, factor):
+                params = {"suffix": f"#{k}", "max_id": max_id}
+                conn.execute(
+                    f"INSERT INTO {words} ({cols}) SELECT {copy_cols} FROM {words} WHERE id <= :max_id ORDER BY id",
+                    params,
+                )
+                mapping = f"FROM {{t}} x JOIN {words} w ON w.id = x.word_id JOIN {words} w2 ON {match} WHERE w.id <= :max_id"
+                conn.execute(
+                    f"INSERT INTO {source} (word_id, source, chapter) "
+                    f"SELECT w2.id, x.source || :suffix, x.chapter {mapping.format(t=source)} ORDER BY x.id",
+                    params,
+                )
+                conn.execute(
+                    f"INSERT INTO {errors} (word_id, wrong_text, created_at) "
+                    f"SELECT w2.id, x.wrong_text, x.created_at {mapping.format(t=errors)} ORDER BY x.id",
+                    params,
+                )
+                for table, col in (("en_word_roots", "root_id"), ("en_word_affixes", "affix_id")):
+                    if table in tables:
+                        conn.execute(
+                            f"INSERT INTO {table} (word_id, {col}) SELECT w2.id, x.{col} {mapping.format(t=table)}",
+                            params,
+                        )
+    finally:
+        conn.close()
+
+
+def build_workload(conn: sqlite3.Connection, lang: str) -> list:
+    """
+    按数据库内容挑选有代表性的参数,返回 (名称, SQL, 参数, 是否写操作) 列表。
+    """
+    q = firmware_queries(lang)
+    words, source = f"{lang}_words", f"{lang}_source"
+
+    chapters = conn.execute(
+        f"SELECT source, chapter, COUNT(*) AS n FROM {source} WHERE chapter <> '' "
+        "GROUP BY source, chapter ORDER BY n DESC, source, chapter"
+    ).fetchall()
+    big_source = conn.execute(
+        f"SELECT source FROM {source} GROUP BY source ORDER BY COUNT(*) DESC, source LIMIT 1"
+    ).fetchone()[0]
+    if chapters:
+        big_chapter, small_chapter = chapters[0][:2], chapters[-1][:2]
+    else:
+        big_chapter = small_chapter = (big_source, "")
+
+    ids = [r[0] for r in conn.execute(q["load_chapter"], {"1": big_chapter[0], "2": big_chapter[1]})]
+    id_list = ",".join(map(str, ids)) or "0"
+    score, score_count = conn.execute(
+        f"SELECT score, COUNT(*) FROM {words} GROUP BY score ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()
+    deep_offset = (score_count // 2) // 50 * 50
+    any_id = ids[0] if ids else 1
+
+    workload = [
+        ("load_chapter_big", q["load_chapter"], {"1": big_chapter[0], "2": big_chapter[1]}, False),
+        ("load_chapter_small", q["load_chapter"], {"1": small_chapter[0], "2": small_chapter[1]}, False),
+        ("load_source_big", q["load_source"], {"1": big_source}, False),
+        ("load_by_ids", q["load_by_ids"].format(ids=id_list), {}, False),
+        ("score_stats", q["score_stats"], {}, False),
+        ("score_page_first", q["score_page"], {"1": score, "2": 0}, False),
+        ("score_page_deep", q["score_page"], {"1": score, "2": deep_offset}, False),
+        ("source_list", q["source_list"], {}, False),
+        ("chapter_list", q["chapter_list"], {"1": big_source}, False),
+        ("has_chapter", q["has_chapter"], {"1": big_source}, False),
+        ("web_sources", q["web_sources"], {}, False),
+        ("web_source_total", q["web_source_total"], {"1": big_source}, False),
+        ("web_chapters", q["web_chapters"], {"1": big_source}, False),
+        ("errors", q["errors"], {}, False),
+        ("update_score", q["update_score"], {"1": 5, "2": any_id}, True),
+        ("insert_error", q["insert_error"], {"1": any_id, "2": "bench", "3": "0"}, True),
+    ]
+    if lang == "en":
+        root_ids = [r[0] for r in conn.execute(q["word_roots_in"].format(ids=id_list))]
+        affix_ids = [r[0] for r in conn.execute(q["word_affixes_in"].format(ids=id_list))]
+        workload += [
+            ("word_roots_in", q["word_roots_in"].format(ids=id_list), {}, False),
+            ("word_affixes_in", q["word_affixes_in"].format(ids=id_list), {}, False),
+            ("root_meanings", q["root_meanings"].format(ids=",".join(map(str, root_ids[:8])) or "0"), {}, False),
+            ("affix_meanings", q["affix_meanings"].format(ids=",".join(map(str, affix_ids[:8])) or "0"), {}, False),
+        ]
+    return workload
+
+
+def _execute(conn: sqlite3.Connection, sql: str, params: dict, write: bool) -> int:
+    if write:
+        conn.execute("BEGIN")
+        try:
+            return conn.execute(sql, params).rowcount
+        finally:
+            conn.execute("ROLLBACK")
+    return len(conn.execute(sql, params).fetchall())
+
+
+def run_query(db_path: Path, conn: sqlite3.Connection, sql: str, params: dict, write: bool, repeat: int) -> dict:
+    steps = 0
+
+    def count_steps():
+        nonlocal steps
+        steps += PROGRESS_STEP
+        return 0
+
+    conn.set_progress_handler(count_steps, PROGRESS_STEP)
+    rows = _execute(conn, sql, params, write)
+    conn.set_progress_handler(None, 0)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _execute(conn, sql, params, write)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    pages = sectors = None
+    before = _process_read_bytes()
+    if before is not None:
+        cold = sqlite3.connect(str(db_path), isolation_level=None) if write else _open_readonly(db_path)
+        try:
+            page_size = cold.execute("PRAGMA page_size").fetchone()[0]
+            before = _process_read_bytes()
+            _execute(cold, sql, params, write)
+            pages = -(-(_process_read_bytes() - before) // page_size)
+            sectors = pages * page_size // SD_SECTOR_SIZE
+        finally:
+            cold.close()
+
+    return {
+        "latency_ms": round(statistics.median(timings), 4),
+        "vm_steps": steps,
+        "pages": pages,
+        "sectors": sectors,
+        "rows": rows,
+        "plan": explain_query_plan(conn, sql, params),
+    }
+
+
+def bench_db(db_path: Path, label: str, repeat: int) -> dict:
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    try:
+        lang = detect_lang(conn)
+        results = {}
+        for name, sql, params, write in build_workload(conn, lang):
+            results[name] = run_query(db_path, conn, sql, params, write, repeat)
+    finally:
+        conn.close()
+    return {"label": label, "db": str(db_path), "queries": results}
+
+
+def compare(results: dict, baseline: dict, threshold: float, gate_latency: bool) -> list:
+    """
+    返回回归列表。sectors 允许 8 个扇区的绝对误差,耗时只在 gate_latency 时判定。
+    """
+    regressions = []
+    for label, run in results.items():
+        base_run = baseline.get(label)
+        if base_run is None:
+            continue
+        for name, cur in run["queries"].items():
+            base = base_run["queries"].get(name)
+            if base is None:
+                continue
+            checks = [("vm_steps", 0), ("sectors", 8)]
+            if gate_latency:
+                checks.append(("latency_ms", 0.05))
+            for metric, slack in checks:
+                old, new = base.get(metric), cur.get(metric)
+                if old is None or new is None:
+                    continue
+                if new > old * threshold + slack:
+                    regressions.append(f"{label} {name}: {metric} {old} -> {new}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", action="append", help="要测试的数据库,可重复；默认为 words_study 下的两个库")
+    parser.add_argument("--scales", default="1,10,100", help="放大倍数列表,如 1,10,100")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--baseline", help="基线 JSON,提供时进行回归判定")
+    parser.add_argument("--save-baseline", help="把本次结果保存为基线 JSON")
+    parser.add_argument("--threshold", type=float, default=1.2, help="超过基线多少倍算回归")
+    parser.add_argument("--gate-latency", action="store_true", help="耗时也参与回归判定")
+    parser.add_argument("--work-dir", help="放大副本的存放目录（可复用）,默认临时目录")
+    parser.add_argument("--show-plans", action="store_true")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    db_paths = [Path(p) for p in (args.db or DEFAULT_DBS)]
+
+    tmp = None
+    if args.work_dir:
+        work_dir = Path(args.work_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        work_dir = Path(tmp.name)
+
+    results = {}
+    try:
+        for db_path in db_paths:
+            with sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True) as conn:
+                lang = detect_lang(conn)
+            for scale in scales:
+                label = f"{lang}@{scale}x"
+                if scale == 1:
+                    target = db_path
+                else:
+                    target = work_dir / f"{db_path.stem}_{scale}x.db"
+                    if not target.exists() or target.stat().st_mtime < db_path.stat().st_mtime:
+                        start = time.perf_counter()
+                        scale_db(db_path, target, scale)
+                        print(f"生成 {target.name}: {time.perf_counter() - start:.1f} s")
+                results[label] = bench_db(target, label, args.repeat)
+
+                print(f"\n== {label}  ({target})")
+                print(f"{'query':<20} {'latency ms':>11} {'vm_steps':>10} {'pages':>7} {'sectors':>8} {'rows':>7}")
+                for name, r in results[label]["queries"].items():
+                    pages = "-" if r["pages"] is None else r["pages"]
+                    sectors = "-" if r["sectors"] is None else r["sectors"]
+                    print(
+                        f"{name:<20} {r['latency_ms']:>11.3f} {r['vm_steps']:>10} "
+                        f"{pages:>7} {sectors:>8} {r['rows']:>7}"
+                    )
+                    if args.show_plans:
+                        for step in r["plan"]:
+                            print(f"{'':<22}{step}")
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n基线已保存: {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold, args.gate_latency)
+        if regressions:
+            print(f"\n检测到 {len(regressions)} 处回归（阈值 x{args.threshold}）:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n与基线相比无回归（阈值 x{args.threshold}）")
+
+
+if __name__ == "__main__":
+    main()
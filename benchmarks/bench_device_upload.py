@@ -0,0 +1,147 @@
+"""
+设备批量导入基准。
+
+生成合成词库目录（--sources 个来源,每个来源 --chapters 个章节文件）,在本机启动
+DeviceStandIn 模拟设备 Web 控制面板,对比:
+- naive: 每个文件一次 requests.post 新建连接,上传原始 JSON（含例句等设备不读取的字段）；
+- pooled: upload_vocab_tree,复用连接、只上传设备字段、按设备内存预算切分,
+  分别用 workers=1 与 --workers 并行上传。
+
+--latency-ms 模拟每个请求的 WiFi 往返,--handshake-ms 模拟建立新连接的开销,
+--free-heap 为模拟设备的空闲堆；naive 模式下超出内存的大文件会像设备上一样导入失败。
+
+用法:
+    python -m benchmarks.bench_device_upload
+    python -m benchmarks.bench_device_upload --sources 20 --chapters 10 --latency-ms 20 --workers 4
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+from utils.device_client import DeviceClient, upload_vocab_tree
+from utils.device_standin import DeviceStandIn
+
+
+def make_tree(root: Path, sources: int, chapters: int, per_file: int, seed: int) -> int:
+    """
+    :return: 生成的词条总数
+    """
+    rng = random.Random(seed)
+    total = 0
+    for s in range(sources):
+        source_dir = root / f"source{s:02d}"
+        source_dir.mkdir(parents=True)
+        for c in range(chapters):
+            n = rng.randint(per_file // 2, per_file * 3 // 2)
+            entries = [
+                {
+                    "en": f"s{s}c{c}w{i}",
+                    "zh": "n. 示例释义；测试用的中文解释",
+                    "pos": "n.",
+                    "phonetic": "/ˈsæmpəl/",
+                    "score": rng.randint(1, 5),
+                    "sentence": "This is an example sentence used only on the PC side.",
+                    "sentence_zh": "这是只在 PC 端使用的例句。",
+                }
+                for i in range(n)
+            ]
+            (source_dir / f"第{c + 1}课.json").write_text(
+                json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            total += n
+    return total
+
+
+def bench_naive(url: str, word_root: Path, root: str) -> dict:
+    files = sorted(word_root.rglob("*.json"))
+    errors = 0
+    sent = 0
+    imported = 0
+    start = time.perf_counter()
+    for json_file in files:
+        payload = json_file.read_bytes()
+        sent += len(payload)
+        r = requests.post(
+            f"{url}/api/files/upload",
+            params={"path": f"{root}/{json_file.parent.name}"},
+            files={"file": (json_file.name, payload, "application/json")},
+            headers={"Connection": "close"},
+            timeout=60,
+        )
+        if r.status_code != 200:
+            errors += 1
+        else:
+            imported += r.json()["imported"]
+    return {"files": len(files), "requests": len(files), "bytes": sent, "imported": imported, "errors": errors,
+            "elapsed": time.perf_counter() - start}
+
+
+def bench_pooled(url: str, word_root: Path, workers: int) -> dict:
+    with DeviceClient(url, pool_maxsize=max(workers, 1)) as client:
+        summary = upload_vocab_tree(client, word_root, workers=workers)
+    return {"files": summary["files"], "requests": summary["requests"], "bytes": summary["bytes"],
+            "imported": summary["imported"], "errors": len(summary["errors"]), "elapsed": summary["elapsed"]}
+
+
+def report(name: str, result: dict) -> None:
+    # 只按成功导入的文件与词条计算吞吐
+    elapsed = result["elapsed"]
+    files = result["files"] - result["errors"]
+    print(
+        f"{name:<18} {elapsed:7.2f} s | {files / elapsed:7.1f} files/s | "
+        f"{result['imported'] / elapsed:8.0f} entries/s | {result['requests']:4d} req | "
+        f"{result['bytes'] / 1e3:8.0f} KB | errors {result['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, default=8)
+    parser.add_argument("--chapters", type=int, default=6)
+    parser.add_argument("--per-file", type=int, default=120, help="每个章节文件的平均词条数")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--handshake-ms", type=float, default=20.0)
+    parser.add_argument("--free-heap", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        word_root = Path(tmp) / "word"
+        entries = make_tree(word_root, args.sources, args.chapters, args.per_file, args.seed)
+        print(
+            f"{args.sources * args.chapters} files, {entries} entries, latency {args.latency_ms} ms, "
+            f"handshake {args.handshake_ms} ms, free heap {args.free_heap} B"
+        )
+        runs = [("naive", lambda url, root: bench_naive(url, word_root, root)),
+                ("pooled workers=1", lambda url, root: bench_pooled(url, word_root, 1))]
+        if args.workers > 1:
+            runs.append((f"pooled workers={args.workers}",
+                         lambda url, root: bench_pooled(url, word_root, args.workers)))
+
+        results = []
+        for i, (name, run) in enumerate(runs):
+            # 每种方式导入到新的数据库,互不影响
+            with DeviceStandIn(
+                Path(tmp) / f"en_words_{i}.db",
+                lang="en",
+                free_heap=args.free_heap,
+                latency=args.latency_ms / 1000,
+                handshake=args.handshake_ms / 1000,
+            ) as standin:
+                with DeviceClient(standin.url) as client:
+                    root = client.list_files()["root"]
+                results.append((name, run(standin.url, root)))
+
+        print()
+        for name, result in results:
+            report(name, result)
+
+
+if __name__ == "__main__":
+    main()
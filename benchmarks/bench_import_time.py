@@ -0,0 +1,92 @@
+"""
+import 耗时基准。
+
+在全新的子进程中用 python -X importtime 执行若干典型入口,解析 stderr 中每个模块的
+累计耗时,输出相对空解释器（baseline）多出的耗时以及是否加载了 requests / numpy / dotenv 等重量级依赖。
+每个场景重复 --repeat 次取最小值,减少磁盘缓存带来的抖动。
+
+用法:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --repeat 10 --max-ms 150
+"""
+import argparse
+import subprocess
+import sys
+
+SCENARIOS = {
+    "baseline": "pass",
+    "import utils": "import utils",
+    "json helpers": "from utils import load_json_list, split_json_file",
+    "stats": "from utils import analyze_vocab_mastery_db",
+    "cli --help": "import sys; sys.argv = ['wordcardputer', '--help']\n"
+                  "from utils.cli import main\n"
+                  "try:\n    main()\nexcept SystemExit:\n    pass",
+    "tts": "from utils import generate_tts_youdao",
+}
+
+HEAVY = ("requests", "numpy", "dotenv")
+
+
+def measure(code: str) -> dict:
+    """
+    运行一次,返回 {"total_us", "modules": {模块名: 累计微秒}}。
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # 嵌套导入的模块名前有缩进,只累加顶层模块得到总耗时
+        name = name.rstrip()
+        if not name.startswith("  "):
+            total += int(cumulative)
+        modules[name.strip()] = int(cumulative)
+    return {"total_us": total, "modules": modules}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="每个场景列出耗时最多的几个模块")
+    parser.add_argument("--max-ms", type=float, help="import utils 比解释器启动多出的耗时超过该值时以非零状态退出")
+    args = parser.parse_args()
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        runs = [measure(code) for _ in range(args.repeat)]
+        results[name] = min(runs, key=lambda r: r["total_us"])
+
+    # 解释器启动本身（site 及其 .pth 钩子）导入的模块不计入各场景
+    baseline = results["baseline"]
+    for name, best in results.items():
+        best["extra_us"] = best["total_us"] - baseline["total_us"]
+        if name == "baseline":
+            print(f"{name:<14} {best['total_us'] / 1000:8.1f} ms  (解释器启动)")
+            continue
+        heavy = [mod for mod in HEAVY if mod in best["modules"]]
+        print(f"{name:<14} {best['extra_us'] / 1000:+8.1f} ms  heavy: {', '.join(heavy) or '-'}")
+        top = sorted(
+            (
+                (us, mod)
+                for mod, us in best["modules"].items()
+                if mod not in baseline["modules"] and not mod.startswith("utils")
+            ),
+            reverse=True,
+        )[: args.top]
+        for us, mod in top:
+            print(f"    {mod:<40} {us / 1000:8.1f} ms")
+
+    if args.max_ms is not None and results["import utils"]["extra_us"] / 1000 > args.max_ms:
+        print(f"\nimport utils 超过 {args.max_ms} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
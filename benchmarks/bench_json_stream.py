@@ -0,0 +1,75 @@
+"""
+流式 JSON 读取基准测试。
+
+生成一个大型导出词典（单个 JSON 列表）,对比 load_json_list 整体载入与
+iter_json_list 逐条读取的耗时和峰值内存（tracemalloc）,并校验结果一致。
+
+用法:
+    python -m benchmarks.bench_json_stream --entries 200000
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from utils.json_utils import iter_json_list, load_json_list
+
+
+def make_dictionary(path: Path, entries: int, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    data = [
+        {
+            "en": f"word{i}",
+            "zh": f"释义{i}; 另一个释义{rnd.randint(0, 99)}",
+            "pos": rnd.choice(["n.", "v.", "adj.", "adv."]),
+            "phonetic": f"/wɜːd{i}/",
+            "score": rnd.randint(1, 5),
+            "sentence": f"This is example sentence number {i} for the word.",
+            "sentence_zh": f"这是单词的第 {i} 个例句。",
+        }
+        for i in range(entries)
+    ]
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=4), encoding="utf-8")
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "dictionary.json"
+        make_dictionary(path, args.entries)
+        size_mb = path.stat().st_size / 1e6
+        print(f"dictionary: {args.entries} entries, {size_mb:.1f} MB")
+
+        cases = [
+            ("load_json_list (full)", lambda: [item["en"] for item in load_json_list(path)]),
+            ("iter_json_list (full)", lambda: [item["en"] for item in iter_json_list(path)]),
+            ("iter_json_list (en)", lambda: [item["en"] for item in iter_json_list(path, fields=("en",))]),
+        ]
+        results = []
+        for name, func in cases:
+            values, elapsed, peak = measure(func)
+            results.append(values)
+            print(f"{name:<24} {elapsed:7.3f} s   peak {peak / 1e6:8.1f} MB")
+
+        assert all(r == results[0] for r in results), "读取结果不一致"
+        print("results identical")
+
+
+if __name__ == "__main__":
+    main()
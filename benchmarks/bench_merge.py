@@ -0,0 +1,117 @@
+"""
+词条合并基准测试。
+
+生成一个由大量章节 JSON 组成的合成词库（高频词在多个章节中重复出现,
+各章节给出不同释义）,对比逐次 split/拼接的旧合并算法与
+collect_merged_entries_by_key 的有序集合累加实现,并校验两者结果一致。
+
+用法:
+    python -m benchmarks.bench_merge --chapters 2000 --per-chapter 60 --workers 4
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from utils.json_utils import collect_merged_entries_by_key, load_json_list
+
+
+def legacy_collect(json_files, key_field="en", score_field="score", tone_field=None):
+    """
+    旧版合并算法（每次合并都对已拼接的字符串 split）,仅用于对比。
+    """
+    all_entries = {}
+    for json_file in json_files:
+        for entry in load_json_list(json_file):
+            key_value = entry.get(key_field)
+            if not key_value:
+                continue
+            if key_value not in all_entries:
+                all_entries[key_value] = dict(entry)
+                continue
+            merged = all_entries[key_value]
+            for field, val in entry.items():
+                if field == key_field:
+                    continue
+                if field not in merged:
+                    merged[field] = val
+                    continue
+                old = merged[field]
+                if score_field and field == score_field:
+                    try:
+                        merged[field] = max(old, val)
+                    except Exception:
+                        merged[field] = old
+                elif tone_field and field == tone_field:
+                    if old == val:
+                        merged[field] = val
+                    elif old != -1 and val == -1:
+                        merged[field] = old
+                    elif val != -1 and old == -1:
+                        merged[field] = val
+                    else:
+                        merged[field] = -1
+                else:
+                    old_str = str(old) if old is not None else ""
+                    val_str = str(val) if val is not None else ""
+                    if old_str != val_str and val_str not in old_str.split("; "):
+                        merged[field] = f"{old_str}; {val_str}" if old_str else val_str
+    return all_entries
+
+
+def make_corpus(root: Path, chapters: int, per_chapter: int, vocab: int, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    # Zipf 式分布: 少数高频词出现在大量章节中
+    weights = [1 / (i + 1) for i in range(vocab)]
+    for c in range(chapters):
+        words = rnd.choices(range(vocab), weights=weights, k=per_chapter)
+        entries = [
+            {
+                "en": f"word{w}",
+                "zh": f"释义{w}-{rnd.randint(0, 40)}",
+                "pos": rnd.choice(["n", "v", "adj", ""]),
+                "score": rnd.randint(1, 5),
+                "sentence": f"sentence {w} from chapter {c}",
+            }
+            for w in words
+        ]
+        out = root / f"source{c % 20}" / f"chapter{c}.json"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, default=2000)
+    parser.add_argument("--per-chapter", type=int, default=60)
+    parser.add_argument("--vocab", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_corpus(root, args.chapters, args.per_chapter, args.vocab)
+        files = sorted(root.rglob("*.json"))
+        print(f"corpus: {len(files)} chapters x {args.per_chapter} entries, vocab {args.vocab}")
+
+        start = time.perf_counter()
+        expected = legacy_collect(files)
+        legacy_time = time.perf_counter() - start
+
+        timings = {}
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            actual = collect_merged_entries_by_key(root, key_field="en", tone_field=None, workers=workers)
+            timings[workers] = time.perf_counter() - start
+            assert actual == expected, "合并结果与旧算法不一致"
+
+        print(f"legacy split/concat      {legacy_time:7.3f} s")
+        for workers, t in timings.items():
+            print(f"ordered-set, workers={workers:<3} {t:7.3f} s  (x{legacy_time / t:.1f})")
+        print(f"merged entries: {len(expected)}, results identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+分数增量同步基准。
+
+生成 --words 个词条的主库并复制为设备库,首次同步建立变更日志后,
+在设备库和主库上各随机修改一部分分数（另加若干错题记录）,对比:
+- full: 忽略变更日志,全量比对两个数据库；
+- incremental: 只读取变更日志。
+每个变更规模在相同的数据库副本上分别运行两种方式,并检查同步后两个数据库一致。
+全量比对没有修改时间,分数不同时一律以主库为准,因此会丢掉设备上的修改；
+增量同步按修改时间逐个词条取较晚的一方。
+
+用法:
+    python -m benchmarks.bench_score_sync
+    python -m benchmarks.bench_score_sync --words 20000 --changes 10,100,1000
+"""
+import argparse
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from utils.db_builder import LANG_SCHEMAS, _create_schema
+from utils.score_sync import sync_scores
+
+
+def make_master(path: Path, words: int, seed: int) -> None:
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    _create_schema(conn, "en", True)
+    conn.executemany(
+        LANG_SCHEMAS["en"]["upsert"],
+        ((f"word{i}", "释义", "n.", "/wɜːd/", rng.randint(1, 5), "", "") for i in range(words)),
+    )
+    conn.executemany(
+        "INSERT INTO en_source (word_id, source, chapter) VALUES (?, ?, ?)",
+        ((i + 1, f"source{i % 10}", f"{i // 100:03d}") for i in range(words)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def mutate(path: Path, words: int, changes: int, rng: random.Random, errors: bool) -> None:
+    conn = sqlite3.connect(path)
+    ids = rng.sample(range(1, words + 1), changes)
+    conn.executemany("UPDATE en_words SET score = ? WHERE id = ?", ((rng.randint(1, 5), i) for i in ids))
+    if errors:
+        conn.executemany(
+            "INSERT INTO en_errors (word_id, wrong_text, created_at) VALUES (?, ?, ?)",
+            ((i, "typo", "2026-01-01 12:00") for i in ids[: max(1, changes // 10)]),
+        )
+    conn.commit()
+    conn.close()
+
+
+def snapshot(path: Path) -> list:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT en, score FROM en_words ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=7000)
+    parser.add_argument("--changes", default="10,100,1000", help="每一方修改的分数数量列表")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        master, device = tmp / "master.db", tmp / "device.db"
+        make_master(master, args.words, args.seed)
+        shutil.copy(master, device)
+        sync_scores(master, device)
+
+        print(f"\n{args.words} words")
+        for changes in (int(x) for x in args.changes.split(",")):
+            rng = random.Random(args.seed + changes)
+            mutate(device, args.words, changes, rng, errors=True)
+            # 主库的修改晚于设备,用于产生冲突
+            time.sleep(1.0)
+            mutate(master, args.words, changes, rng, errors=False)
+
+            results = {}
+            for mode in ("full", "incremental"):
+                m, d = tmp / f"{mode}_master.db", tmp / f"{mode}_device.db"
+                shutil.copy(master, m)
+                shutil.copy(device, d)
+                start = time.perf_counter()
+                summary = sync_scores(m, d, full=mode == "full", prefer="master")
+                results[mode] = (time.perf_counter() - start, summary, snapshot(m), snapshot(d))
+
+            for mode, (elapsed, summary, _, _) in results.items():
+                print(
+                    f"changes {changes:5d} | {mode:<11} {elapsed * 1000:8.1f} ms | "
+                    f"scores → master {summary['scores']['to_master']:5d} / → device {summary['scores']['to_device']:5d} | "
+                    f"errors {summary['errors']['to_master']:4d}"
+                )
+            full, incremental = results["full"], results["incremental"]
+            assert full[3] == full[2] and incremental[3] == incremental[2], "同步后两个数据库不一致"
+
+            # 下一轮从增量同步后的状态继续
+            shutil.copy(tmp / "incremental_master.db", master)
+            shutil.copy(tmp / "incremental_device.db", device)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+MP3 → WAV 转码后端基准测试。
+
+对同一段 MP3 分别使用 transcode_mp3_to_wav 的各个后端重复转码,
+对比单次耗时,并检查输出 WAV 的格式与时长是否一致。
+
+未指定 --mp3 时,使用 ffmpeg 生成一段 1 秒、44.1kHz 立体声的测试 MP3
+（与有道返回的短音频规模相近）。
+
+用法:
+    python -m benchmarks.bench_transcode --runs 30
+    python -m benchmarks.bench_transcode --mp3 sample.mp3
+"""
+import argparse
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+from utils import tts
+
+
+def make_sample_mp3() -> bytes:
+    result = subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", "sine=frequency=440:duration=1:sample_rate=44100",
+            "-ac", "2", "-f", "mp3", "pipe:1",
+        ],
+        capture_output=True,
+        timeout=30,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode(errors="ignore"))
+    return result.stdout
+
+
+def available_backends() -> list:
+    backends = []
+    if tts.miniaudio is not None:
+        backends.append("miniaudio")
+    if shutil.which("ffmpeg"):
+        backends += ["pipe", "ffmpeg"]
+    return backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mp3", type=Path, help="测试用 MP3 文件,默认由 ffmpeg 生成")
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    mp3_bytes = args.mp3.read_bytes() if args.mp3 else make_sample_mp3()
+    backends = available_backends()
+    if not backends:
+        raise SystemExit("没有可用的转码后端（需要 miniaudio 或 ffmpeg）")
+
+    print(f"MP3 {len(mp3_bytes)} bytes, {args.runs} runs per backend")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            out = Path(tmp) / f"{backend}.wav"
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                ok, msg = tts.transcode_mp3_to_wav(mp3_bytes, out, backend=backend)
+                timings.append(time.perf_counter() - start)
+                if not ok:
+                    raise SystemExit(f"{backend} 转码失败: {msg}")
+
+            with wave.open(str(out), "rb") as wf:
+                fmt = (wf.getframerate(), wf.getnchannels(), wf.getsampwidth() * 8)
+                duration = wf.getnframes() / wf.getframerate()
+
+            ms = [t * 1000 for t in timings]
+            print(
+                f"{backend:<10} mean {statistics.mean(ms):7.2f} ms | "
+                f"p50 {statistics.median(ms):7.2f} ms | "
+                f"{fmt[0]} Hz {fmt[1]} ch {fmt[2]}-bit, {duration:.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+TTS HTTP 连接复用基准测试。
+
+在本机启动一个模拟有道 / MiniMax 接口的 HTTP 服务,分别用
+「每次 requests.get/post 新建连接」和「TTSClient 复用连接池」
+发起同样数量的请求,对比单次请求延迟。
+
+服务端在每个新连接建立时额外等待 --handshake-ms 毫秒,用来模拟
+公网 TCP + TLS 握手的往返开销（本地回环上握手几乎为 0）。
+
+用法:
+    python -m benchmarks.bench_tts_http --requests 200 --handshake-ms 30
+"""
+import argparse
+import json
+import socket
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from utils.tts import TTSClient
+
+
+FAKE_MP3 = b"\xff\xfb" + b"\x00" * 4000
+FAKE_WAV_HEX = (b"RIFF" + b"\x00" * 4000).hex()
+
+
+def make_handler(handshake_ms: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            # 每个连接只执行一次,模拟握手延迟
+            time.sleep(handshake_ms / 1000)
+            super().setup()
+            # 关闭 Nagle,避免 keep-alive 下头部与正文分包触发延迟 ACK
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, body: bytes, content_type: str):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._send(FAKE_MP3, "audio/mpeg")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            body = json.dumps({
+                "base_resp": {"status_code": 0},
+                "data": {"audio": FAKE_WAV_HEX},
+            }).encode()
+            self._send(body, "application/json")
+
+    return StubHandler
+
+
+def summarize(name: str, latencies: list) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(
+        f"{name:<24} mean {statistics.mean(ms):7.2f} ms | "
+        f"p50 {statistics.median(ms):7.2f} ms | p95 {p95:7.2f} ms | "
+        f"total {sum(ms) / 1000:6.2f} s"
+    )
+
+
+def bench_bare(base_url: str, n: int) -> list:
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        r = requests.get(f"{base_url}/dictvoice", params={"audio": f"w{i}", "type": 2}, timeout=10)
+        r.content
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_client(base_url: str, n: int) -> list:
+    latencies = []
+    with TTSClient(api_key="stub", youdao_url=f"{base_url}/dictvoice") as client:
+        for i in range(n):
+            start = time.perf_counter()
+            client.download_youdao_mp3(f"w{i}")
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.handshake_ms))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"stub server: {base_url}, {args.requests} requests, handshake {args.handshake_ms} ms")
+    try:
+        summarize("requests.get (no reuse)", bench_bare(base_url, args.requests))
+        summarize("TTSClient (pooled)", bench_client(base_url, args.requests))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
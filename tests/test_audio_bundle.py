@@ -0,0 +1,153 @@
+"""
+pack_audio_bundle / read_bundle_clip 的测试: 整体打包、增量追加、
+无效空间过多时的自动重打包。
+"""
+import os
+import sqlite3
+import struct
+import wave
+
+import pytest
+
+from utils.audio_bundle import audio_index_table, pack_audio_bundle, read_bundle_clip, read_bundle_header
+from utils.db_builder import LANG_SCHEMAS, _create_schema
+
+
+WORDS = [f"word{i}" for i in range(8)]
+
+
+def _write_clip(path, word: str, version: int, frames: int = 700) -> bytes:
+    # 内容随单词和版本变化,长度不是 512 的整数倍以检查对齐填充
+    samples = [((i * (version + 3) + len(word) * 97) % 2000) - 1000 for i in range(frames)]
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(struct.pack(f"<{frames}h", *samples))
+    # 保证修改后的 mtime 与之前不同
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + version * 1_000_000_000))
+    return path.read_bytes()
+
+
+@pytest.fixture
+def library(tmp_path):
+    db = tmp_path / "en_words.db"
+    conn = sqlite3.connect(db)
+    _create_schema(conn, "en", True)
+    conn.executemany(LANG_SCHEMAS["en"]["upsert"], ((w, "释义", "n.", "", 3, "", "") for w in WORDS))
+    conn.commit()
+    conn.close()
+
+    audio = tmp_path / "audio"
+    audio.mkdir()
+    clips = {word_id: _write_clip(audio / f"{word}.wav", word, 0) for word_id, word in enumerate(WORDS, 1)}
+    return db, audio, tmp_path / "audio.pack", clips
+
+
+def _offsets(db) -> dict:
+    conn = sqlite3.connect(db)
+    try:
+        return dict(conn.execute(f"SELECT word_id, offset FROM {audio_index_table('en')}"))
+    finally:
+        conn.close()
+
+
+def _check_clips(db, bundle, clips: dict) -> None:
+    for word_id, data in clips.items():
+        assert read_bundle_clip(db, bundle, word_id) == data, word_id
+
+
+def test_full_pack(library):
+    db, audio, bundle, clips = library
+
+    summary = pack_audio_bundle(db, audio, bundle)
+
+    assert summary["repacked"]
+    assert summary["packed"] == summary["written"] == len(WORDS)
+    assert summary["garbage_bytes"] == 0
+    assert read_bundle_header(bundle) == {"version": 1, "generation": 1, "align": 512}
+    assert all(offset % 512 == 0 for offset in _offsets(db).values())
+    _check_clips(db, bundle, clips)
+    assert read_bundle_clip(db, bundle, 999) is None
+
+
+def test_incremental_append_keeps_other_offsets(library):
+    db, audio, bundle, clips = library
+    pack_audio_bundle(db, audio, bundle)
+    before = _offsets(db)
+    size_before = bundle.stat().st_size
+
+    clips[3] = _write_clip(audio / f"{WORDS[2]}.wav", WORDS[2], 1, frames=900)
+    summary = pack_audio_bundle(db, audio, bundle)
+
+    assert not summary["repacked"]
+    assert summary["written"] == 1
+    assert summary["reused"] == len(WORDS) - 1
+    assert summary["garbage_bytes"] > 0
+    after = _offsets(db)
+    assert after[3] == size_before
+    assert {k: v for k, v in after.items() if k != 3} == {k: v for k, v in before.items() if k != 3}
+    assert read_bundle_header(bundle)["generation"] == 1
+    _check_clips(db, bundle, clips)
+
+    # 没有变化时不写入任何内容
+    summary = pack_audio_bundle(db, audio, bundle)
+    assert summary["written"] == 0 and not summary["repacked"]
+    assert _offsets(db) == after
+
+
+def test_removed_clip_is_dropped_from_index(library):
+    db, audio, bundle, clips = library
+    pack_audio_bundle(db, audio, bundle)
+
+    (audio / f"{WORDS[0]}.wav").unlink()
+    del clips[1]
+    summary = pack_audio_bundle(db, audio, bundle)
+
+    assert summary["missing"] == 1
+    assert read_bundle_clip(db, bundle, 1) is None
+    _check_clips(db, bundle, clips)
+
+
+def test_garbage_triggers_repack(library):
+    db, audio, bundle, clips = library
+    pack_audio_bundle(db, audio, bundle)
+
+    # 修改超过 1/4 的音频,追加后无效空间超过 max_garbage
+    for word_id in (1, 2, 3):
+        clips[word_id] = _write_clip(audio / f"{WORDS[word_id - 1]}.wav", WORDS[word_id - 1], 2)
+    summary = pack_audio_bundle(db, audio, bundle)
+
+    assert summary["repacked"]
+    assert summary["garbage_bytes"] == 0
+    assert read_bundle_header(bundle)["generation"] == 2
+    offsets = _offsets(db)
+    assert [offsets[word_id] for word_id in sorted(offsets)] == sorted(offsets.values())
+    _check_clips(db, bundle, clips)
+
+
+def test_mismatched_bundle_forces_repack(library):
+    db, audio, bundle, clips = library
+    pack_audio_bundle(db, audio, bundle)
+
+    # 包文件被替换为旧版本: 代数与索引不一致,不能在其上追加
+    bundle.write_bytes(b"\0" * 4096)
+    summary = pack_audio_bundle(db, audio, bundle)
+    assert summary["repacked"]
+    _check_clips(db, bundle, clips)
+
+    assert pack_audio_bundle(db, audio, bundle, incremental=False)["repacked"]
+    _check_clips(db, bundle, clips)
+
+
+def test_invalid_clip_is_skipped(library):
+    db, audio, bundle, clips = library
+    (audio / f"{WORDS[4]}.wav").write_bytes(b"RIFF\0\0\0\0WAVEjunk" + b"\0" * 40)
+    del clips[5]
+
+    summary = pack_audio_bundle(db, audio, bundle)
+
+    assert [item["word"] for item in summary["invalid"]] == [WORDS[4]]
+    assert read_bundle_clip(db, bundle, 5) is None
+    _check_clips(db, bundle, clips)
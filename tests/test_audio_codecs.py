@@ -0,0 +1,166 @@
+"""
+IMA-ADPCM / μ-law 编码器的测试: 向量化实现与逐样本参考实现逐字节一致,
+参考解码器往返的 SNR,以及 encode_wav 写出的文件。
+"""
+import wave
+
+import numpy as np
+import pytest
+
+from utils.audio import (
+    _ima_adpcm_encode_reference,
+    decode_wav_reference,
+    encode_wav,
+    ima_adpcm_decode,
+    ima_adpcm_encode,
+    ima_samples_per_block,
+    mulaw_decode,
+    mulaw_encode,
+    snr_db,
+)
+
+
+RATE = 16000
+
+
+def _speech_like(n: int, seed: int = 0) -> np.ndarray:
+    # 调幅的低频正弦 + 噪声,包络变化较大,接近单词发音
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / RATE
+    x = 0.3 * 32767 * np.sin(2 * np.pi * 300 * t) * np.sin(2 * np.pi * 3 * t) + rng.normal(0, 500, n)
+    return np.clip(x, -32768, 32767).astype(np.int16)
+
+
+def _signals() -> dict:
+    rng = np.random.default_rng(1)
+    t = np.arange(RATE) / RATE
+    return {
+        "sine": (0.5 * 32767 * np.sin(2 * np.pi * 440 * t)).astype(np.int16),
+        "speech": _speech_like(RATE),
+        "silence": np.zeros(RATE, dtype=np.int16),
+        "noise": rng.integers(-32768, 32768, RATE).astype(np.int16),
+        "square": np.where(np.arange(RATE) % 40 < 20, 32767, -32768).astype(np.int16),
+    }
+
+
+def _mulaw_encode_scalar(x: int) -> int:
+    sign = 0x80 if x < 0 else 0
+    magnitude = min(abs(x), 32635) + 0x84
+    exponent = magnitude.bit_length() - 8
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return ~(sign | (exponent << 4) | mantissa) & 0xFF
+
+
+def _write_pcm(path, samples: np.ndarray, nchannels: int = 1, sampwidth: int = 2) -> None:
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(nchannels)
+        wf.setsampwidth(sampwidth)
+        wf.setframerate(RATE)
+        if sampwidth == 1:
+            wf.writeframes(((samples.astype(np.int32) >> 8) + 128).astype(np.uint8).tobytes())
+        else:
+            wf.writeframes(samples.astype("<i2").tobytes())
+
+
+@pytest.mark.parametrize("block_align", (256, 512))
+@pytest.mark.parametrize("name", list(_signals()))
+def test_ima_vectorized_matches_reference(name, block_align):
+    samples = _signals()[name]
+    assert ima_adpcm_encode(samples, block_align) == _ima_adpcm_encode_reference(samples, block_align)
+
+
+@pytest.mark.parametrize("n", (0, 1, 2, 504, 505, 506, 1010, 1011))
+def test_ima_block_boundaries(n):
+    samples = _speech_like(n, seed=n)
+    encoded = ima_adpcm_encode(samples)
+    assert encoded == _ima_adpcm_encode_reference(samples)
+    spb = ima_samples_per_block(256)
+    assert len(encoded) == 256 * max(1, -(-n // spb))
+    assert len(ima_adpcm_decode(encoded, 256, n)) == n
+
+
+@pytest.mark.parametrize("name, min_snr", [("sine", 30), ("speech", 28)])
+def test_ima_round_trip_snr(name, min_snr):
+    samples = _signals()[name]
+    decoded = ima_adpcm_decode(ima_adpcm_encode(samples), 256, len(samples))
+    assert decoded.dtype == np.int16
+    assert snr_db(samples, decoded) > min_snr
+
+
+def test_ima_silence_round_trip_is_exact():
+    samples = _signals()["silence"]
+    assert snr_db(samples, ima_adpcm_decode(ima_adpcm_encode(samples), 256, len(samples))) == float("inf")
+
+
+def test_mulaw_matches_scalar_reference():
+    samples = np.arange(-32768, 32768, dtype=np.int16)
+    expected = bytes(_mulaw_encode_scalar(int(x)) for x in samples)
+    assert mulaw_encode(samples) == expected
+
+
+def test_mulaw_codes_round_trip():
+    codes = bytes(range(256))
+    decoded = mulaw_decode(codes)
+    reencoded = mulaw_encode(decoded)
+    # 0x7F 为负零,解码为 0 后重新编码为 0xFF
+    assert reencoded == bytes(0xFF if c == 0x7F else c for c in codes)
+
+
+@pytest.mark.parametrize("name", ("sine", "speech", "noise"))
+def test_mulaw_round_trip_snr(name):
+    samples = _signals()[name]
+    decoded = mulaw_decode(mulaw_encode(samples))
+    assert snr_db(samples, decoded) > 30
+    # 量化误差不超过所在段的步长
+    error = np.abs(samples.astype(np.int32) - decoded)
+    assert error.max() <= 1024
+
+
+def test_encode_wav_ima(tmp_path):
+    samples = _speech_like(RATE)
+    src, dst = tmp_path / "in.wav", tmp_path / "out.wav"
+    _write_pcm(src, samples)
+
+    ok, info = encode_wav(src, dst, codec="ima_adpcm")
+
+    assert ok, info
+    assert info["bytes_after"] < info["bytes_before"] / 3.5
+    assert info["seconds"] == pytest.approx(1.0)
+    decoded, framerate = decode_wav_reference(dst)
+    assert framerate == RATE
+    assert decoded.shape == (len(samples), 1)
+    assert np.array_equal(decoded[:, 0], ima_adpcm_decode(ima_adpcm_encode(samples), 256, len(samples)))
+    assert info["snr_db"] == round(snr_db(samples, decoded), 2)
+    assert info["snr_db"] > 28
+
+
+@pytest.mark.parametrize("nchannels, sampwidth", [(1, 2), (2, 2), (1, 1)])
+def test_encode_wav_mulaw(tmp_path, nchannels, sampwidth):
+    samples = _speech_like(RATE * nchannels)
+    if sampwidth == 1:
+        samples = (samples.astype(np.int32) >> 8 << 8).astype(np.int16)
+    src, dst = tmp_path / "in.wav", tmp_path / "out.wav"
+    _write_pcm(src, samples, nchannels, sampwidth)
+
+    ok, info = encode_wav(src, dst, codec="mulaw")
+
+    assert ok, info
+    decoded, framerate = decode_wav_reference(dst)
+    assert decoded.shape == (RATE, nchannels)
+    assert np.array_equal(decoded.reshape(-1), mulaw_decode(mulaw_encode(samples)))
+    assert info["snr_db"] > 25
+
+
+def test_encode_wav_errors(tmp_path):
+    stereo = tmp_path / "stereo.wav"
+    _write_pcm(stereo, _speech_like(200), nchannels=2)
+    ok, msg = encode_wav(stereo, codec="ima_adpcm")
+    assert not ok and "单声道" in msg
+
+    empty = tmp_path / "empty.wav"
+    _write_pcm(empty, np.zeros(0, dtype=np.int16))
+    ok, msg = encode_wav(empty, codec="mulaw")
+    assert not ok and "为空" in msg
+
+    with pytest.raises(ValueError):
+        encode_wav(stereo, codec="flac")
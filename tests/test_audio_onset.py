@@ -0,0 +1,49 @@
+"""
+_find_onset_frame（NumPy 向量化）与 _find_onset_frame_reference（纯 Python）的等价性测试。
+"""
+import random
+
+import pytest
+
+from benchmarks.bench_audio_onset import make_wav, read_raw
+from utils.audio import _find_onset_frame, _find_onset_frame_reference
+
+
+RATIOS = (0.001, 0.015, 0.2)
+
+
+def _check(raw: bytes, nchannels: int, sampwidth: int) -> None:
+    max_abs = 127 if sampwidth == 1 else 32767
+    for ratio in RATIOS:
+        threshold = max(1, int(max_abs * ratio))
+        expected = _find_onset_frame_reference(raw, nchannels, sampwidth, threshold)
+        assert _find_onset_frame(raw, nchannels, sampwidth, threshold) == expected, (ratio, expected)
+
+
+@pytest.mark.parametrize("sampwidth", (1, 2))
+@pytest.mark.parametrize("nchannels", (1, 2))
+@pytest.mark.parametrize("onset", (None, 0, 1, 999))
+def test_layouts(nchannels: int, sampwidth: int, onset: int | None) -> None:
+    # onset 为 None 时整段都是低于阈值的噪声（全静音）
+    raw, ch, sw = read_raw(make_wav(1000, nchannels, sampwidth, onset, seed=onset or 0))
+    _check(raw, ch, sw)
+
+
+@pytest.mark.parametrize("sampwidth", (1, 2))
+@pytest.mark.parametrize("nchannels", (1, 2))
+def test_empty(nchannels: int, sampwidth: int) -> None:
+    raw, ch, sw = read_raw(make_wav(0, nchannels, sampwidth, None, seed=0))
+    assert raw == b""
+    _check(raw, ch, sw)
+    assert _find_onset_frame(raw, ch, sw, 1) == -1
+
+
+def test_random_synthetic_wavs() -> None:
+    rnd = random.Random(0)
+    for seed in range(200):
+        nchannels = rnd.choice([1, 2])
+        sampwidth = rnd.choice([1, 2])
+        nframes = rnd.randint(1, 4000)
+        onset = rnd.choice([None, 0, rnd.randint(0, nframes - 1)])
+        raw, ch, sw = read_raw(make_wav(nframes, nchannels, sampwidth, onset, seed))
+        _check(raw, ch, sw)
@@ -0,0 +1,91 @@
+"""
+DeviceClient / upload_vocab_tree 与本地模拟设备 DeviceStandIn 的端到端测试。
+"""
+import json
+
+import pytest
+
+from utils.device_client import DEVICE_IMPORT_FIELDS, DeviceClient, DeviceError, upload_vocab_tree
+from utils.device_standin import DeviceStandIn
+
+
+def _entries(prefix: str, n: int) -> list:
+    return [
+        {
+            "en": f"{prefix}{i:03d}",
+            "zh": "中文释义",
+            "pos": "n.",
+            "phonetic": "/test/",
+            "score": i % 5 + 1,
+            "sentence": "Only used on the PC.",
+            "sentence_zh": "只在 PC 端使用。",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def device(tmp_path):
+    with DeviceStandIn(tmp_path / "en_words.db", lang="en", port=0, free_heap=60_000) as standin:
+        with DeviceClient(standin.url, max_retries=0) as client:
+            yield standin, client
+
+
+@pytest.fixture
+def word_root(tmp_path):
+    root = tmp_path / "word"
+    (root / "新概念").mkdir(parents=True)
+    # 以 z 开头使 id 顺序与字母顺序不同,检查导出按导入顺序
+    (root / "core.json").write_text(json.dumps(list(reversed(_entries("z", 120))), ensure_ascii=False), "utf-8")
+    (root / "新概念" / "第一课.json").write_text(json.dumps(_entries("a", 40), ensure_ascii=False), "utf-8")
+    return root
+
+
+def test_upload_splits_by_memory_budget(device, word_root):
+    standin, client = device
+    summary = upload_vocab_tree(client, word_root, workers=2, memory_budget=8_000)
+
+    assert summary["errors"] == []
+    assert summary["uploaded"] == 2
+    assert summary["imported"] == summary["entries"] == 160
+    assert summary["requests"] > 2
+    assert standin.counters["uploads"] == summary["requests"]
+
+    items = {item["name"]: item for item in client.list_files()["items"]}
+    assert items["core"]["wordCount"] == 120
+    assert items["新概念"]["chapterCount"] == 1
+    chapters = client.list_files(f"{standin.root}/新概念")["items"]
+    assert [(c["name"], c["wordCount"]) for c in chapters] == [("全部", 40), ("第一课", 40)]
+
+
+def test_download_keeps_order_and_device_fields(device, word_root):
+    standin, client = device
+    upload_vocab_tree(client, word_root, memory_budget=8_000)
+
+    words = client.download(f"{standin.root}/core")
+    assert [w["en"] for w in words] == [e["en"] for e in reversed(_entries("z", 120))]
+    assert all(tuple(w) == DEVICE_IMPORT_FIELDS["en"] for w in words)
+
+    chapter = client.download(f"{standin.root}/新概念/第一课")
+    assert [w["en"] for w in chapter] == [e["en"] for e in _entries("a", 40)]
+
+
+def test_parent_path_is_rejected(device):
+    standin, client = device
+    with pytest.raises(DeviceError) as excinfo:
+        client.upload_json(f"{standin.root}/../jp", "x.json", b'[{"en":"a","zh":"b"}]')
+    assert excinfo.value.status == 400
+    with pytest.raises(DeviceError) as excinfo:
+        client.download(f"{standin.root}/../core")
+    assert excinfo.value.status == 400
+
+
+def test_over_budget_payload_is_rejected(device):
+    standin, client = device
+    payload = json.dumps(_entries("big", 400), ensure_ascii=False).encode("utf-8")
+    with pytest.raises(DeviceError) as excinfo:
+        client.upload_json(standin.root, "big.json", payload)
+    assert excinfo.value.status == 400
+    assert "JSON 解析失败" in str(excinfo.value)
+    assert standin.counters["out_of_memory"] == 1
+    assert client.list_files()["items"] == []
@@ -0,0 +1,208 @@
+"""
+utils/json_utils.py 的测试: 流式读取（iter_json_list）与大词库拆分（split_json_file / process_folder）。
+"""
+import json
+import math
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from utils.json_utils import iter_json_list, process_folder, split_json_file
+
+
+def _entries(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        {"jp": f"単語{i}", "zh": "释义 \"引号\" \\ 反斜杠", "score": rng.randint(1, 5), "tags": [i, None, 1.5]}
+        for i in range(n)
+    ]
+
+
+def _write(path: Path, data) -> None:
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=4), encoding="utf-8")
+
+
+def _read(path: Path) -> list:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+# 覆盖数字、字符串、转义、嵌套和空白,逐个块大小读取时边界会落在每个字符之间
+_TRICKY_DOCUMENT = (
+    ' [ 0, -12.5e-3 ,1E+10, 123456789012345678901234567890, 3.14159,\n'
+    '  "a\\"b\\\\c\\/\\n\\u00e9\\ud83d\\ude00", "単語", true, false, null,\n'
+    '  {"jp": "猫", "score": 5, "nested": {"list": [1, [2.0, {}], []], "s": "]}[,"}},\n'
+    '  [], {}, "", -0, 1e5 ]\n'
+)
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 24))
+def test_iter_json_list_chunk_boundaries(tmp_path, chunk_size):
+    path = tmp_path / "doc.json"
+    path.write_text(_TRICKY_DOCUMENT, encoding="utf-8")
+    assert list(iter_json_list(path, chunk_size=chunk_size)) == json.loads(_TRICKY_DOCUMENT)
+
+
+@pytest.mark.parametrize("chunk_size", (1, 7, 1 << 16))
+def test_iter_json_list_matches_json_load(tmp_path, chunk_size):
+    path = tmp_path / "words.json"
+    entries = _entries(300)
+    _write(path, entries)
+    assert list(iter_json_list(path, chunk_size=chunk_size)) == entries
+    assert list(iter_json_list(path, fields=("jp", "missing"), chunk_size=chunk_size)) == [
+        {"jp": e["jp"]} for e in entries
+    ]
+
+
+@pytest.mark.parametrize("text", ["[]", " [ \n ] \n", "\t[\r\n]"])
+def test_iter_json_list_empty_list(tmp_path, text):
+    path = tmp_path / "empty.json"
+    path.write_text(text, encoding="utf-8")
+    assert list(iter_json_list(path, chunk_size=1)) == []
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "   ",
+        '{"jp": "猫"}',
+        '"[1, 2]"',
+        "1",
+        "[1, 2",
+        "[1, 2,",
+        "[1 2]",
+        "[1, 2] 3",
+        '[{"jp": "猫"]',
+        '["unterminated]',
+    ],
+)
+def test_iter_json_list_rejects_invalid(tmp_path, text):
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+    for chunk_size in (1, 3, 1 << 16):
+        with pytest.raises(ValueError):
+            list(iter_json_list(path, chunk_size=chunk_size))
+
+
+def _old_split(file_path: Path, max_per_file: int) -> dict:
+    """重构前 split_json_file 的输出: 整体载入后按位置切片,json.dump(indent=2)。"""
+    data = _read(file_path)
+    parts = math.ceil(len(data) / max_per_file)
+    per_file = math.ceil(len(data) / parts)
+    return {
+        f"{file_path.stem}_part{i+1}.json": json.dumps(data[i * per_file:(i + 1) * per_file], ensure_ascii=False, indent=2)
+        for i in range(parts)
+    }
+
+
+@pytest.mark.parametrize("total, max_per_file", [(61, 60), (220, 60), (600, 60), (7, 3)])
+def test_positional_split_matches_old_output(tmp_path, total, max_per_file):
+    source = tmp_path / "N5.json"
+    _write(source, _entries(total))
+    expected = _old_split(source, max_per_file)
+
+    summary = split_json_file(source, max_per_file)
+
+    assert summary == {"file": str(source), "total": total, "parts": len(expected)}
+    written = {p.name: p.read_text(encoding="utf-8") for p in tmp_path.glob("N5_part*.json")}
+    assert written == expected
+
+
+def test_no_split_below_limit(tmp_path):
+    source = tmp_path / "N5.json"
+    _write(source, _entries(60))
+    assert split_json_file(source, 60)["parts"] == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["N5.json"]
+
+
+def test_balanced_split_round_robin(tmp_path):
+    source = tmp_path / "N5.json"
+    entries = _entries(230, seed=1)
+    _write(source, entries)
+
+    summary = split_json_file(source, 60, balance_key="score")
+    assert summary["parts"] == 4
+
+    parts = [_read(tmp_path / f"N5_part{i+1}.json") for i in range(4)]
+    assert sorted(len(p) for p in parts) == [57, 57, 58, 58]
+    # 每个分值在各份中的数量最多相差 1
+    counts = [Counter(e["score"] for e in part) for part in parts]
+    for score in range(1, 6):
+        per_part = [c[score] for c in counts]
+        assert max(per_part) - min(per_part) <= 1, (score, per_part)
+    # 份内保持原文件顺序,且所有词条恰好出现一次
+    index = {e["jp"]: i for i, e in enumerate(entries)}
+    for part in parts:
+        positions = [index[e["jp"]] for e in part]
+        assert positions == sorted(positions)
+    assert sorted(e["jp"] for part in parts for e in part) == sorted(index)
+
+
+def test_balanced_split_mixed_key_types(tmp_path):
+    source = tmp_path / "mixed.json"
+    values = [3, "3", 1.5, "abc", None, 10**400, "1" + "0" * 400, [1], True, "nan"]
+    _write(source, [{"jp": str(i), "score": v} for i, v in enumerate(values)] + [{"jp": "missing"}, "plain"])
+
+    summary = split_json_file(source, 4, balance_key="score")
+
+    assert summary["parts"] == 3
+    written = [e for i in range(3) for e in _read(tmp_path / f"mixed_part{i+1}.json")]
+    assert len(written) == len(values) + 2
+
+
+def test_manifest_skips_unchanged_files(tmp_path):
+    _write(tmp_path / "a.json", _entries(130))
+    _write(tmp_path / "b.json", _entries(10))
+
+    first = process_folder(tmp_path, 60)
+    assert first == {"files": 2, "split": 1, "skipped": 0, "errors": []}
+    part_mtimes = {p.name: p.stat().st_mtime_ns for p in tmp_path.glob("a_part*.json")}
+    assert sorted(part_mtimes) == ["a_part1.json", "a_part2.json", "a_part3.json"]
+
+    second = process_folder(tmp_path, 60)
+    assert second == {"files": 2, "split": 0, "skipped": 2, "errors": []}
+    assert {p.name: p.stat().st_mtime_ns for p in tmp_path.glob("a_part*.json")} == part_mtimes
+
+    # 修改源文件、改变参数或删除分片后重新拆分
+    _write(tmp_path / "b.json", _entries(70))
+    assert process_folder(tmp_path, 60)["skipped"] == 1
+    assert (tmp_path / "b_part2.json").exists()
+    (tmp_path / "a_part2.json").unlink()
+    assert process_folder(tmp_path, 60)["skipped"] == 1
+    assert (tmp_path / "a_part2.json").exists()
+    assert process_folder(tmp_path, 60, balance_key="score")["skipped"] == 0
+    assert process_folder(tmp_path, 60, balance_key="score", force=True)["skipped"] == 0
+
+
+def test_fewer_parts_remove_recorded_stale_parts(tmp_path):
+    source = tmp_path / "N5.json"
+    _write(source, _entries(200))
+    process_folder(tmp_path, 60)
+    assert len(list(tmp_path.glob("N5_part*.json"))) == 4
+
+    _write(source, _entries(100))
+    process_folder(tmp_path, 60)
+    assert sorted(p.name for p in tmp_path.glob("N5_part*.json")) == ["N5_part1.json", "N5_part2.json"]
+
+    _write(source, _entries(10))
+    process_folder(tmp_path, 60, force=True)
+    assert list(tmp_path.glob("N5_part*.json")) == []
+
+
+def test_unrecorded_parts_are_kept(tmp_path):
+    # 手工创建的 N5_part1.json 不是本工具写入的,不能被删除
+    _write(tmp_path / "N5.json", _entries(1))
+    hand_made = _entries(10, seed=2)
+    _write(tmp_path / "N5_part1.json", hand_made)
+
+    summary = process_folder(tmp_path, 60)
+
+    assert summary["errors"] == []
+    assert _read(tmp_path / "N5_part1.json") == hand_made
+
+    # 单文件模式从不删除分片
+    _write(tmp_path / "N5_part2.json", hand_made)
+    split_json_file(tmp_path / "N5.json", 60)
+    assert _read(tmp_path / "N5_part2.json") == hand_made
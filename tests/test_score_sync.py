@@ -0,0 +1,278 @@
+"""
+sync_scores 的测试: 按修改时间的 last-writer-wins、全量比对的 prefer、
+错题删除的传播、变更日志的清空以及 dry_run。
+"""
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from utils.db_builder import LANG_SCHEMAS, _create_schema
+from utils.score_sync import sync_scores
+
+
+WORDS = ("apple", "banana", "cherry", "date")
+# 有效的 Unix 时间（晚于 _MIN_VALID_TIME）
+T0 = 1_800_000_000
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _make_db(path: Path) -> None:
+    conn = _connect(path)
+    _create_schema(conn, "en", True)
+    conn.executemany(
+        LANG_SCHEMAS["en"]["upsert"],
+        ((word, "释义", "n.", "", 3, "", "") for word in WORDS),
+    )
+    conn.executemany(
+        "INSERT INTO en_source (word_id, source, chapter) VALUES (?, 'core', '001')",
+        ((i + 1,) for i in range(len(WORDS))),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _set_score(path: Path, word: str, score: int, changed_at: int | None = None) -> None:
+    # 触发器以当前时间记录修改,测试中改写为指定时间以控制先后顺序
+    conn = _connect(path)
+    conn.execute("UPDATE en_words SET score = ? WHERE en = ?", (score, word))
+    if changed_at is not None:
+        conn.execute(
+            "UPDATE en_changes SET changed_at = ? WHERE kind = 'score' "
+            "AND row_id = (SELECT id FROM en_words WHERE en = ?)",
+            (changed_at, word),
+        )
+    conn.commit()
+    conn.close()
+
+
+def _add_error(path: Path, word: str, wrong_text: str, created_at: str = "2026-01-01 12:00") -> None:
+    conn = _connect(path)
+    conn.execute(
+        "INSERT INTO en_errors (word_id, wrong_text, created_at) SELECT id, ?, ? FROM en_words WHERE en = ?",
+        (wrong_text, created_at, word),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _delete_error(path: Path, word: str, wrong_text: str) -> None:
+    conn = _connect(path)
+    conn.execute(
+        "DELETE FROM en_errors WHERE wrong_text = ? AND word_id = (SELECT id FROM en_words WHERE en = ?)",
+        (wrong_text, word),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _scores(path: Path) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT en, score FROM en_words"))
+    finally:
+        conn.close()
+
+
+def _errors(path: Path) -> list:
+    conn = sqlite3.connect(path)
+    try:
+        return sorted(conn.execute(
+            "SELECT w.en, e.wrong_text, e.created_at FROM en_errors e JOIN en_words w ON w.id = e.word_id"
+        ))
+    finally:
+        conn.close()
+
+
+def _log_sizes(path: Path) -> tuple:
+    conn = sqlite3.connect(path)
+    try:
+        return (
+            conn.execute("SELECT COUNT(*) FROM en_changes").fetchone()[0],
+            conn.execute("SELECT COUNT(*) FROM en_error_deletes").fetchone()[0],
+        )
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def dbs(tmp_path):
+    """已完成首次同步（双方都有变更日志）的主库与设备库。"""
+    master, device = tmp_path / "master.db", tmp_path / "device.db"
+    _make_db(master)
+    shutil.copy(master, device)
+    summary = sync_scores(master, device)
+    assert summary["baseline"]
+    return master, device
+
+
+def test_first_sync_is_baseline_and_creates_logs(dbs):
+    master, device = dbs
+    assert _log_sizes(master) == (0, 0)
+    assert _log_sizes(device) == (0, 0)
+    assert not sync_scores(master, device)["baseline"]
+
+
+def test_single_side_edits_propagate(dbs):
+    master, device = dbs
+    _set_score(device, "apple", 5)
+    _set_score(master, "banana", 1)
+
+    summary = sync_scores(master, device)
+
+    assert summary["scores"] == {"to_master": 1, "to_device": 1}
+    assert summary["conflicts"] == 0
+    assert _scores(master) == _scores(device) == {"apple": 5, "banana": 1, "cherry": 3, "date": 3}
+    assert _log_sizes(master) == _log_sizes(device) == (0, 0)
+
+
+def test_device_newer_edit_wins(dbs):
+    master, device = dbs
+    _set_score(master, "apple", 5, changed_at=T0)
+    _set_score(device, "apple", 1, changed_at=T0 + 60)
+
+    summary = sync_scores(master, device)
+
+    assert summary["conflicts"] == 1
+    assert summary["scores"] == {"to_master": 1, "to_device": 0}
+    assert _scores(master)["apple"] == _scores(device)["apple"] == 1
+
+
+def test_master_newer_edit_wins(dbs):
+    master, device = dbs
+    _set_score(device, "apple", 5, changed_at=T0)
+    _set_score(master, "apple", 1, changed_at=T0 + 60)
+
+    summary = sync_scores(master, device)
+
+    assert summary["conflicts"] == 1
+    assert summary["scores"] == {"to_master": 0, "to_device": 1}
+    # 分数下降也按修改时间保留,不取最大值
+    assert _scores(master)["apple"] == _scores(device)["apple"] == 1
+
+
+def test_invalid_device_time_uses_fallback(dbs):
+    master, device = dbs
+    _set_score(master, "apple", 5, changed_at=T0)
+    # 设备未校时,时间戳停留在 1970 年附近
+    _set_score(device, "apple", 1, changed_at=60)
+
+    sync_scores(master, device, device_time_fallback=T0 + 60)
+    assert _scores(master)["apple"] == 1
+
+    _set_score(master, "banana", 5, changed_at=T0)
+    _set_score(device, "banana", 1, changed_at=60)
+    sync_scores(master, device, device_time_fallback=T0 - 60)
+    assert _scores(device)["banana"] == 5
+
+
+@pytest.mark.parametrize("prefer, expected", [("device", 1), ("master", 5)])
+def test_full_sync_prefers_side(dbs, prefer, expected):
+    master, device = dbs
+    _set_score(master, "apple", 5, changed_at=T0 + 60)
+    _set_score(device, "apple", 1, changed_at=T0)
+
+    summary = sync_scores(master, device, full=True, prefer=prefer)
+
+    assert summary["baseline"]
+    assert summary["conflicts"] == 0
+    assert _scores(master)["apple"] == _scores(device)["apple"] == expected
+
+
+def test_errors_are_copied_both_ways(dbs):
+    master, device = dbs
+    _add_error(device, "apple", "aple")
+    _add_error(master, "banana", "banan")
+
+    summary = sync_scores(master, device)
+
+    assert summary["errors"] == {"to_master": 1, "to_device": 1}
+    assert _errors(master) == _errors(device) == [
+        ("apple", "aple", "2026-01-01 12:00"),
+        ("banana", "banan", "2026-01-01 12:00"),
+    ]
+    # 再次同步没有新的变更
+    assert sync_scores(master, device)["errors"] == {"to_master": 0, "to_device": 0}
+
+
+def test_deleted_error_propagates(dbs):
+    master, device = dbs
+    _add_error(device, "apple", "aple")
+    sync_scores(master, device)
+
+    _delete_error(device, "apple", "aple")
+    summary = sync_scores(master, device)
+
+    assert summary["error_deletes"] == {"to_master": 1, "to_device": 0}
+    assert _errors(master) == _errors(device) == []
+    assert _log_sizes(master) == _log_sizes(device) == (0, 0)
+
+
+@pytest.mark.parametrize("deleted_on", ["device", "master"])
+def test_deleted_error_not_revived_by_full_sync(dbs, deleted_on):
+    master, device = dbs
+    _add_error(device, "apple", "aple")
+    _add_error(device, "banana", "banan")
+    sync_scores(master, device)
+
+    _delete_error(device if deleted_on == "device" else master, "apple", "aple")
+    summary = sync_scores(master, device, full=True)
+
+    assert summary["baseline"]
+    assert _errors(master) == _errors(device) == [("banana", "banan", "2026-01-01 12:00")]
+    assert sync_scores(master, device, full=True)["errors"] == {"to_master": 0, "to_device": 0}
+    assert _errors(master) == _errors(device) == [("banana", "banan", "2026-01-01 12:00")]
+
+
+def test_baseline_does_not_push_master_errors_to_device(tmp_path):
+    # 设备在建立变更日志之前删除了错题,主库中仍有: 首次同步不能把它推回设备
+    master, device = tmp_path / "master.db", tmp_path / "device.db"
+    _make_db(master)
+    _add_error(master, "apple", "aple")
+    shutil.copy(master, device)
+    _delete_error(device, "apple", "aple")
+    _add_error(device, "banana", "banan")
+
+    summary = sync_scores(master, device)
+
+    assert summary["baseline"]
+    assert summary["errors"] == {"to_master": 1, "to_device": 0}
+    assert _errors(device) == [("banana", "banan", "2026-01-01 12:00")]
+
+
+def test_dry_run_writes_nothing(dbs):
+    master, device = dbs
+    _set_score(device, "apple", 5)
+    _add_error(device, "apple", "aple")
+    _set_score(master, "banana", 1)
+    before = (master.read_bytes(), device.read_bytes())
+
+    summary = sync_scores(master, device, dry_run=True)
+
+    assert summary["dry_run"]
+    assert summary["scores"] == {"to_master": 1, "to_device": 1}
+    assert summary["errors"] == {"to_master": 1, "to_device": 0}
+    assert len(summary["changeset"]["scores"]) == 2
+    assert (master.read_bytes(), device.read_bytes()) == before
+
+    # 预览不清空变更日志,之后的真正同步得到相同结果
+    assert sync_scores(master, device)["scores"] == {"to_master": 1, "to_device": 1}
+
+
+def test_dry_run_on_fresh_databases_creates_no_logs(tmp_path):
+    master, device = tmp_path / "master.db", tmp_path / "device.db"
+    _make_db(master)
+    shutil.copy(master, device)
+    _set_score(device, "apple", 5)
+    before = (master.read_bytes(), device.read_bytes())
+
+    summary = sync_scores(master, device, dry_run=True)
+
+    assert summary["baseline"]
+    assert (master.read_bytes(), device.read_bytes()) == before
@@ -1,38 +1,102 @@
-from .tts import (
-    generate_tts_minimax,
-    generate_tts_youdao,
-)
-
-from .audio import (
-    trim_leading_silence_wav,
-    trim_leading_silence_in_folder,
-)
-
-from .json_utils import (
-    load_json_list,
-    extract_field_values,
-    extract_jp_fields,
-    extract_en_fields,
-    extract_all_values_from_folder,
-    extract_all_jp_from_folder,
-    extract_all_en_from_folder,
-    list_wav_filenames,
-    collect_merged_entries_by_key,
-    collect_merged_entries,
-    collect_merged_entries_en,
-    apply_merge_and_rewrite_by_key,
-    apply_merge_and_rewrite,
-    apply_merge_and_rewrite_en,
-    filter_json_by_key_difference,
-    filter_json_by_jp_difference,
-    filter_json_by_en_difference,
-    dedupe_json_by_key,
-    dedupe_json_by_jp,
-    dedupe_json_by_en,
-    split_json_file,
-    process_folder,
-)
-
-from .stats import (
-    analyze_vocab_mastery,
-)
+"""
+WordCardputer 词库与音频工具。
+
+公开函数按需加载（PEP 562 模块级 __getattr__）: import utils 只执行本文件,
+第一次访问某个名字时才导入对应子模块,因此只用 JSON 工具时不会加载
+requests / numpy / dotenv。
+"""
+import importlib
+
+_LAZY = {
+    ".tts": (
+        "generate_tts_minimax",
+        "generate_tts_youdao",
+    ),
+    ".tts_cache": (
+        "TTSCache",
+        "synthesize_cached",
+        "build_audio_library",
+    ),
+    ".audio": (
+        "trim_leading_silence_wav",
+        "trim_leading_silence_in_folder",
+    ),
+    ".audio_audit": (
+        "audit_audio_coverage",
+        "audit_audio_library",
+    ),
+    ".audio_bundle": (
+        "pack_audio_bundle",
+        "read_bundle_clip",
+    ),
+    ".json_utils": (
+        "load_json_list",
+        "extract_field_values",
+        "extract_jp_fields",
+        "extract_en_fields",
+        "extract_all_values_from_folder",
+        "extract_all_jp_from_folder",
+        "extract_all_en_from_folder",
+        "list_wav_filenames",
+        "collect_merged_entries_by_key",
+        "collect_merged_entries",
+        "collect_merged_entries_en",
+        "apply_merge_and_rewrite_by_key",
+        "apply_merge_and_rewrite",
+        "apply_merge_and_rewrite_en",
+        "filter_json_by_key_difference",
+        "filter_json_by_jp_difference",
+        "filter_json_by_en_difference",
+        "dedupe_json_by_key",
+        "dedupe_json_by_jp",
+        "dedupe_json_by_en",
+        "split_json_file",
+        "process_folder",
+    ),
+    ".key_index": (
+        "KeyIndex",
+        "dedupe_corpus_by_key",
+    ),
+    ".db_builder": (
+        "build_vocab_db",
+        "export_vocab_db",
+    ),
+    ".db_package": (
+        "package_db_for_device",
+    ),
+    ".stats": (
+        "analyze_vocab_mastery",
+        "analyze_vocab_mastery_db",
+    ),
+    ".score_history": (
+        "ScoreHistory",
+    ),
+    ".score_sync": (
+        "sync_scores",
+    ),
+    ".device_client": (
+        "DeviceClient",
+        "upload_vocab_tree",
+    ),
+    ".device_standin": (
+        "DeviceStandIn",
+    ),
+}
+
+_ATTR_MODULE = {name: module for module, names in _LAZY.items() for name in names}
+
+__all__ = list(_ATTR_MODULE)
+
+
+def __getattr__(name: str):
+    module = _ATTR_MODULE.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # 缓存到模块字典,之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
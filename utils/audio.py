@@ -1,7 +1,286 @@
 import os
+import json
+import time
 import wave
-from typing import Tuple
+import struct
+from typing import List, Tuple
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .metrics import collect_worker_result, get_metrics, metrics_run, worker_task
+
+
+def _find_onset_frame_reference(
+    raw: bytes,
+    nchannels: int,
+    sampwidth: int,
+    threshold: int,
+) -> int:
+    """
+    逐帧、逐声道查找第一个峰值达到阈值的帧（纯 Python 参考实现）。
+
+    保留用于校验 _find_onset_frame 的结果,未找到时返回 -1。
+    """
+    frame_size = sampwidth * nchannels
+    nframes = len(raw) // frame_size
+
+    for i in range(nframes):
+        base = i * frame_size
+        peak = 0
+        for c in range(nchannels):
+            off = base + c * sampwidth
+            if sampwidth == 1:
+                v = raw[off] - 128
+            else:
+                v = int.from_bytes(raw[off:off + 2], "little", signed=True)
+            av = abs(v)
+            if av > peak:
+                peak = av
+        if peak >= threshold:
+            return i
+    return -1
+
+
+def _find_onset_frame(
+    raw: bytes,
+    nchannels: int,
+    sampwidth: int,
+    threshold: int,
+) -> int:
+    """
+    向量化查找第一个峰值达到阈值的帧,未找到时返回 -1。
+
+    np.frombuffer 直接视图原始缓冲区,不复制数据；用两次比较代替 abs,
+    既省去中间数组,也避免 int16 的 -32768 取绝对值溢出。
+    """
+    frame_size = sampwidth * nchannels
+    nframes = len(raw) // frame_size
+    if nframes == 0:
+        return -1
+
+    if sampwidth == 1:
+        # 8-bit PCM 为无符号,128 为零点
+        samples = np.frombuffer(raw, dtype=np.uint8, count=nframes * nchannels)
+        loud = (samples >= 128 + threshold) | (samples <= 128 - threshold)
+    else:
+        samples = np.frombuffer(raw, dtype="<i2", count=nframes * nchannels)
+        loud = (samples >= threshold) | (samples <= -threshold)
+
+    # 交错存储下,第一个超阈值的样本必然属于第一个超阈值的帧
+    idx = int(np.argmax(loud))
+    return idx // nchannels if loud[idx] else -1
+
+
+def read_wav_layout(f) -> dict:
+    """
+    解析 RIFF/WAVE 头,返回格式信息与 data 块在文件中的位置。
+
+    只读取块头,不读取音频数据；非 fmt/data 的块（如 LIST）直接跳过。
+
+    :param f: 以二进制模式打开的文件对象
+    :return: {"format_tag", "nchannels", "framerate", "sampwidth",
+              "block_align", "fact_samples", "data_offset", "data_size"}
+    :raises ValueError: 文件结构不合法
+    """
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise ValueError("不是 RIFF/WAVE 文件")
+
+    layout = None
+    fact_samples = None
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            break
+        chunk_id = chunk_header[:4]
+        chunk_size = struct.unpack("<I", chunk_header[4:])[0]
+
+        if chunk_id == b"fmt ":
+            body = f.read(chunk_size)
+            if len(body) < 16:
+                raise ValueError("fmt 块长度不足")
+            format_tag, nchannels, framerate, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+            layout = {
+                "format_tag": format_tag,
+                "nchannels": nchannels,
+                "framerate": framerate,
+                "sampwidth": (bits + 7) // 8,
+                "block_align": block_align,
+            }
+            if chunk_size % 2:
+                f.seek(1, os.SEEK_CUR)
+        elif chunk_id == b"fact" and chunk_size >= 4:
+            # 压缩编码（ADPCM / μ-law）记录的实际样本帧数
+            fact_samples = struct.unpack("<I", f.read(4))[0]
+            f.seek(chunk_size - 4 + chunk_size % 2, os.SEEK_CUR)
+        elif chunk_id == b"data":
+            if layout is None:
+                raise ValueError("data 块出现在 fmt 块之前")
+            layout["fact_samples"] = fact_samples
+            data_offset = f.tell()
+            # 兼容 data 长度写大了的截断文件
+            file_size = f.seek(0, os.SEEK_END)
+            layout["data_offset"] = data_offset
+            layout["data_size"] = min(chunk_size, file_size - data_offset)
+            return layout
+        else:
+            f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+    raise ValueError("缺少 fmt 或 data 块")
+
+
+def _pcm_wav_header(nchannels: int, sampwidth: int, framerate: int, data_size: int) -> bytes:
+    """
+    生成标准 44 字节 PCM WAV 头（与 wave 模块写出的一致）。
+    """
+    block_align = nchannels * sampwidth
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        nchannels,
+        framerate,
+        framerate * block_align,
+        block_align,
+        sampwidth * 8,
+        b"data",
+        data_size,
+    )
+
+
+def _copy_file_range(src, dst, offset: int, count: int, chunk_size: int = 1 << 16) -> None:
+    """
+    把 src 中 [offset, offset + count) 的字节追加写入 dst。
+
+    优先使用 os.copy_file_range 在内核内复制；平台不支持时退回到
+    固定大小缓冲区 + memoryview 的分块复制,内存占用与文件大小无关。
+    """
+    dst.flush()
+    if hasattr(os, "copy_file_range"):
+        try:
+            while count > 0:
+                n = os.copy_file_range(src.fileno(), dst.fileno(), count, offset)
+                if n == 0:
+                    break
+                offset += n
+                count -= n
+            if count == 0:
+                return
+        except OSError:
+            pass
+
+    buf = bytearray(min(chunk_size, max(count, 1)))
+    view = memoryview(buf)
+    src.seek(offset)
+    dst.seek(0, os.SEEK_END)
+    while count > 0:
+        n = src.readinto(view[:min(len(buf), count)])
+        if not n:
+            break
+        dst.write(view[:n])
+        count -= n
+
+
+def _trim_leading_silence_streaming(
+    wav_path: Path,
+    output_path: Path,
+    threshold_ratio: float,
+    keep_ms: int,
+    max_trim_ms: int,
+    chunk_frames: int,
+) -> Tuple[bool, str]:
+    """
+    流式裁剪: 分块扫描起音,再把剩余 data 区直接复制到输出文件。
+
+    峰值内存由 chunk_frames 决定,与音频时长无关。结果与整文件读取的
+    实现一致: 起音通常落在 max_trim_ms 窗口内,扫描到即停止；只有窗口
+    内全是静音时才会继续分块向后确认文件中确实存在发音。
+    """
+    try:
+        src = wav_path.open("rb")
+    except Exception as e:
+        return False, f"读取 WAV 失败: {e}"
+
+    with src:
+        try:
+            layout = read_wav_layout(src)
+        except Exception as e:
+            return False, f"读取 WAV 失败: {e}"
+
+        if layout["format_tag"] not in (1, 0xFFFE):
+            return False, f"读取 WAV 失败: unknown format: {layout['format_tag']}"
+
+        nchannels = layout["nchannels"]
+        sampwidth = layout["sampwidth"]
+        framerate = layout["framerate"]
+        frame_size = sampwidth * nchannels
+        data_offset = layout["data_offset"]
+        nframes = layout["data_size"] // frame_size if frame_size else 0
+
+        if nframes == 0:
+            return False, "WAV 文件为空"
+        if sampwidth not in (1, 2):
+            return False, f"仅支持 8/16-bit PCM, 当前为 {sampwidth * 8}-bit"
+
+        max_abs = 127 if sampwidth == 1 else 32767
+        threshold = max(1, int(max_abs * threshold_ratio))
+
+        buf = bytearray(chunk_frames * frame_size)
+        view = memoryview(buf)
+        start_frame = -1
+        scanned = 0
+        src.seek(data_offset)
+        while scanned < nframes:
+            want = min(chunk_frames, nframes - scanned) * frame_size
+            n = src.readinto(view[:want])
+            if not n:
+                break
+            onset = _find_onset_frame(view[:n], nchannels, sampwidth, threshold)
+            if onset >= 0:
+                start_frame = scanned + onset
+                break
+            scanned += n // frame_size
+
+        if start_frame < 0:
+            return False, "未检测到有效发音段"
+
+        keep_frames = max(0, int(framerate * keep_ms / 1000))
+        max_trim_frames = max(0, int(framerate * max_trim_ms / 1000))
+        trim_start = max(0, start_frame - keep_frames)
+        trim_start = min(trim_start, max_trim_frames)
+
+        if trim_start <= 0:
+            return True, str(output_path)
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path.resolve() == wav_path.resolve():
+            tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+            target_path = tmp_path
+        else:
+            tmp_path = None
+            target_path = output_path
+
+        new_size = (nframes - trim_start) * frame_size
+        try:
+            with target_path.open("wb") as dst:
+                dst.write(_pcm_wav_header(nchannels, sampwidth, framerate, new_size))
+                _copy_file_range(src, dst, data_offset + trim_start * frame_size, new_size)
+        except Exception as e:
+            return False, f"写入 WAV 失败: {e}"
+
+    try:
+        if tmp_path is not None:
+            os.replace(str(tmp_path), str(output_path))
+    except Exception as e:
+        return False, f"写入 WAV 失败: {e}"
+
+    return True, str(output_path)
 
 
 def trim_leading_silence_wav(
@@ -10,17 +289,28 @@ def trim_leading_silence_wav(
     threshold_ratio: float = 0.015,
     keep_ms: int = 40,
     max_trim_ms: int = 800,
+    streaming: bool = False,
+    chunk_frames: int = 4096,
 ) -> Tuple[bool, str]:
     """
     裁剪 WAV 文件开头静音,保留少量前导缓冲避免爆破音丢失。
+
+    streaming=True 时分块扫描起音并直接复制剩余数据,不把整段音频
+    读入内存,适合例句等较长的录音；chunk_frames 为每次读取的帧数。
     """
     wav_path = Path(wav_path)
     if output_path is None:
         output_path = wav_path
     output_path = Path(output_path)
 
+    if streaming:
+        return _trim_leading_silence_streaming(
+            wav_path, output_path, threshold_ratio, keep_ms, max_trim_ms, chunk_frames
+        )
+
+    metrics = get_metrics()
     try:
-        with wave.open(str(wav_path), "rb") as wf:
+        with metrics.stage("read"), wave.open(str(wav_path), "rb") as wf:
             nchannels = wf.getnchannels()
             sampwidth = wf.getsampwidth()
             framerate = wf.getframerate()
@@ -30,6 +320,7 @@ def trim_leading_silence_wav(
             raw = wf.readframes(nframes)
     except Exception as e:
         return False, f"读取 WAV 失败: {e}"
+    metrics.count("bytes_read", len(raw))
 
     if nframes == 0 or len(raw) == 0:
         return False, "WAV 文件为空"
@@ -39,27 +330,10 @@ def trim_leading_silence_wav(
     frame_size = sampwidth * nchannels
     max_abs = 127 if sampwidth == 1 else 32767
     threshold = max(1, int(max_abs * threshold_ratio))
-    start_frame = 0
-    found = False
 
-    for i in range(nframes):
-        base = i * frame_size
-        peak = 0
-        for c in range(nchannels):
-            off = base + c * sampwidth
-            if sampwidth == 1:
-                v = raw[off] - 128
-            else:
-                v = int.from_bytes(raw[off:off + 2], "little", signed=True)
-            av = abs(v)
-            if av > peak:
-                peak = av
-        if peak >= threshold:
-            start_frame = i
-            found = True
-            break
-
-    if not found:
+    with metrics.stage("analyze"):
+        start_frame = _find_onset_frame(raw, nchannels, sampwidth, threshold)
+    if start_frame < 0:
         return False, "未检测到有效发音段"
 
     keep_frames = max(0, int(framerate * keep_ms / 1000))
@@ -81,64 +355,937 @@ def trim_leading_silence_wav(
         target_path = output_path
 
     try:
-        with wave.open(str(target_path), "wb") as wf:
-            wf.setnchannels(nchannels)
-            wf.setsampwidth(sampwidth)
-            wf.setframerate(framerate)
-            wf.setcomptype(comptype, compname)
-            wf.writeframes(new_raw)
-        if tmp_path is not None:
-            os.replace(str(tmp_path), str(output_path))
+        with metrics.stage("write"):
+            with wave.open(str(target_path), "wb") as wf:
+                wf.setnchannels(nchannels)
+                wf.setsampwidth(sampwidth)
+                wf.setframerate(framerate)
+                wf.setcomptype(comptype, compname)
+                wf.writeframes(new_raw)
+            if tmp_path is not None:
+                os.replace(str(tmp_path), str(output_path))
     except Exception as e:
         return False, f"写入 WAV 失败: {e}"
+    metrics.count("bytes_written", len(new_raw))
+    metrics.count("trimmed")
 
     return True, str(output_path)
 
 
+class TrimManifest:
+    """
+    批量裁剪的增量清单。
+
+    记录每个文件处理后的 (size, mtime_ns) 以及所用裁剪参数,
+    再次运行时两者都未变化的文件直接跳过。这也避免了长静音文件
+    因 max_trim_ms 上限而在每次运行时被重复裁掉一段。
+    """
+
+    def __init__(self, path: str | Path, params: dict):
+        self.path = Path(path)
+        self.params = params
+        self.entries: dict = {}
+
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception as e:
+                print(f"读取清单 {self.path} 失败,将全部重新处理: {e}")
+
+    @staticmethod
+    def _stat(path: Path) -> Tuple[int, int]:
+        st = path.stat()
+        return st.st_size, st.st_mtime_ns
+
+    def is_current(self, key: str, path: Path) -> bool:
+        entry = self.entries.get(key)
+        if entry is None or entry.get("params") != self.params:
+            return False
+        size, mtime_ns = self._stat(path)
+        return entry.get("size") == size and entry.get("mtime_ns") == mtime_ns
+
+    def record(self, key: str, path: Path) -> None:
+        size, mtime_ns = self._stat(path)
+        self.entries[key] = {"size": size, "mtime_ns": mtime_ns, "params": self.params}
+
+    def save(self) -> None:
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.entries, ensure_ascii=False), encoding="utf-8")
+        os.replace(str(tmp_path), str(self.path))
+
+
+def _trim_in_place(args: Tuple[str, float, int, int, bool]) -> Tuple[bool, str]:
+    """
+    进程池任务: 原地裁剪单个文件（参数打包为元组便于 map）。
+    """
+    wav_path, threshold_ratio, keep_ms, max_trim_ms, streaming = args
+    with get_metrics().stage("item"):
+        return trim_leading_silence_wav(
+            wav_path=wav_path,
+            output_path=wav_path,
+            threshold_ratio=threshold_ratio,
+            keep_ms=keep_ms,
+            max_trim_ms=max_trim_ms,
+            streaming=streaming,
+        )
+
+
 def trim_leading_silence_in_folder(
     folder_path: str | Path,
     recursive: bool = True,
     threshold_ratio: float = 0.015,
     keep_ms: int = 40,
     max_trim_ms: int = 800,
+    workers: int = 1,
+    incremental: bool = True,
+    manifest_path: str | Path | None = None,
+    streaming: bool = False,
 ) -> dict:
     """
     批量裁剪文件夹内 WAV 文件的前导静音。
+
+    :param folder_path: 文件夹路径
+    :param recursive: 是否递归子文件夹
+    :param threshold_ratio: 起音阈值（相对满幅）
+    :param keep_ms: 起音前保留的缓冲时长
+    :param max_trim_ms: 最多裁掉的时长
+    :param workers: 并行进程数,1 表示在当前进程串行处理
+    :param incremental: 是否跳过清单中已用相同参数处理过且未改动的文件
+    :param manifest_path: 清单路径,默认 folder/.trim_manifest.json
+    :param streaming: 是否使用流式裁剪（见 trim_leading_silence_wav）
+    :return: 统计结果 dict（含耗时与每秒处理文件数）
+    """
+    with metrics_run("trim_leading_silence_in_folder") as metrics:
+        folder = Path(folder_path)
+        if not folder.is_dir():
+            raise NotADirectoryError(f"{folder} 不是有效文件夹")
+
+        start_time = time.perf_counter()
+        with metrics.stage("scan"):
+            wav_files = list(folder.rglob("*.wav")) if recursive else list(folder.glob("*.wav"))
+        summary = {
+            "folder": str(folder),
+            "total": len(wav_files),
+            "success": 0,
+            "failed": 0,
+            "skipped": 0,
+            "errors": [],
+        }
+
+        params = {
+            "threshold_ratio": threshold_ratio,
+            "keep_ms": keep_ms,
+            "max_trim_ms": max_trim_ms,
+        }
+        if manifest_path is None:
+            manifest_path = folder / ".trim_manifest.json"
+        manifest = TrimManifest(manifest_path, params)
+
+        pending = []
+        with metrics.stage("manifest"):
+            for wav_file in wav_files:
+                key = wav_file.relative_to(folder).as_posix()
+                if incremental and manifest.is_current(key, wav_file):
+                    summary["skipped"] += 1
+                else:
+                    pending.append((key, wav_file))
+        metrics.count("cache_hits", summary["skipped"])
+
+        tasks = [
+            (str(wav_file), threshold_ratio, keep_ms, max_trim_ms, streaming)
+            for _, wav_file in pending
+        ]
+        executor = None
+        if workers > 1 and len(tasks) > 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            chunksize = max(1, len(tasks) // (workers * 8))
+            results = executor.map(worker_task(_trim_in_place), tasks, chunksize=chunksize)
+            results = map(collect_worker_result, results)
+        else:
+            results = map(_trim_in_place, tasks)
+
+        last_save = time.perf_counter()
+        try:
+            for done, ((key, wav_file), (ok, msg)) in enumerate(zip(pending, results), 1):
+                if ok:
+                    summary["success"] += 1
+                    manifest.record(key, wav_file)
+                else:
+                    summary["failed"] += 1
+                    summary["errors"].append({"file": str(wav_file), "error": msg})
+                metrics.count("items_ok" if ok else "items_failed")
+
+                # 每 500 个文件或每 30 秒落盘一次,中断后只有最近未落盘的文件会被重新裁剪
+                if done % 500 == 0 or time.perf_counter() - last_save >= 30:
+                    manifest.save()
+                    last_save = time.perf_counter()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            if pending:
+                manifest.save()
+
+        elapsed = time.perf_counter() - start_time
+        summary["elapsed"] = round(elapsed, 3)
+        summary["files_per_sec"] = round(len(pending) / elapsed, 1) if elapsed > 0 else 0.0
+        return summary
+
+
+def validate_device_wav(wav_path: str | Path) -> Tuple[bool, str]:
+    """
+    按设备端 playWavStream 的解析方式校验 WAV 头。
+
+    固件要求:
+    - 文件以 "RIFF" 开头,偏移 8 处紧跟 "WAVEfmt "（fmt 必须是第一个块）；
+    - audiofmt == 1（纯 PCM,不接受 WAVE_FORMAT_EXTENSIBLE）；
+    - 8 或 16 bit,1~2 声道,采样率不超过 48kHz；
+    - 从 fmt 之后按块长度逐块跳转（不处理奇数长度的填充字节）能找到 data 块,
+      且 data 非空、不超出文件末尾。
+
+    :param wav_path: WAV 文件路径
+    :return: (是否符合, 说明)
+    """
+    try:
+        with open(wav_path, "rb") as f:
+            header = f.read(36)
+            if len(header) < 36:
+                return False, "文件头不完整"
+            if header[:4] != b"RIFF" or header[8:16] != b"WAVEfmt ":
+                return False, "缺少 RIFF/WAVEfmt 头（fmt 必须是第一个块）"
+
+            fmt_size, audiofmt, channels, sample_rate, _, _, bits = struct.unpack(
+                "<IHHIIHH", header[16:36]
+            )
+            if audiofmt != 1:
+                return False, f"audiofmt={audiofmt},固件只接受 PCM (1)"
+            if bits not in (8, 16):
+                return False, f"{bits}-bit,固件只支持 8/16-bit"
+            if channels not in (1, 2):
+                return False, f"{channels} 声道,固件只支持 1~2 声道"
+            if sample_rate == 0 or sample_rate > 48000:
+                return False, f"采样率 {sample_rate} Hz 超出范围"
+
+            file_size = f.seek(0, os.SEEK_END)
+            pos = 20 + fmt_size
+            while True:
+                f.seek(pos)
+                sub = f.read(8)
+                if len(sub) < 8:
+                    return False, "找不到 data 块"
+                chunk_id = sub[:4]
+                chunk_size = struct.unpack("<I", sub[4:])[0]
+                if chunk_id == b"data":
+                    break
+                pos += 8 + chunk_size
+
+            data_offset = pos + 8
+            if chunk_size == 0:
+                return False, "data 块为空"
+            if data_offset + chunk_size > file_size:
+                return False, "data 长度超出文件末尾"
+    except Exception as e:
+        return False, f"读取 WAV 失败: {e}"
+
+    return True, "ok"
+
+
+def _read_wav_float(wav_path: Path) -> Tuple[np.ndarray, int]:
+    """
+    读取 8/16-bit PCM WAV,返回 (frames, channels) 的 float32 数组与采样率。
+    """
+    with wave.open(str(wav_path), "rb") as wf:
+        nchannels = wf.getnchannels()
+        sampwidth = wf.getsampwidth()
+        framerate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+
+    if sampwidth == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sampwidth == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    else:
+        raise ValueError(f"仅支持 8/16-bit PCM, 当前为 {sampwidth * 8}-bit")
+
+    nframes = len(samples) // nchannels
+    return samples[:nframes * nchannels].reshape(nframes, nchannels), framerate
+
+
+def _resample(x: np.ndarray, src_rate: int, dst_rate: int, taps: int = 63) -> np.ndarray:
+    """
+    对单声道 float 信号重采样。
+
+    降采样前先用 Hann 窗 sinc 低通滤波抑制混叠,再线性插值到目标采样点。
+    对语音提示音而言精度足够,且只依赖 NumPy。
+    """
+    if src_rate == dst_rate or len(x) == 0:
+        return x
+
+    if dst_rate < src_rate:
+        cutoff = 0.5 * dst_rate / src_rate * 0.9
+        n = np.arange(taps) - (taps - 1) / 2
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hanning(taps)
+        kernel /= kernel.sum()
+        x = np.convolve(x, kernel.astype(np.float32), mode="same")
+
+    out_len = int(round(len(x) * dst_rate / src_rate))
+    positions = np.arange(out_len, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(len(x)), x).astype(np.float32)
+
+
+def normalize_wav(
+    wav_path: str | Path,
+    output_path: str | Path | None = None,
+    target_rate: int = 16000,
+    threshold_ratio: float = 0.015,
+    keep_ms: int = 40,
+    tail_keep_ms: int = 80,
+    loudness: str = "peak",
+    peak_dbfs: float = -1.0,
+    rms_dbfs: float = -20.0,
+) -> Tuple[bool, dict | str]:
+    """
+    将单个 WAV 规范化为设备播放格式。
+
+    处理步骤:
+    1. 混音为单声道；
+    2. 裁剪首尾静音（首部保留 keep_ms,尾部保留 tail_keep_ms）；
+    3. 重采样到 target_rate；
+    4. 响度归一化: "peak" 使峰值达到 peak_dbfs,"rms" 使均方根达到
+       rms_dbfs（同时以 peak_dbfs 为上限防止削波）,None 不调整；
+    5. 以 16-bit PCM、标准 44 字节头写出,并按固件规则校验。
+
+    :return: (是否成功, 处理前后的字节数与时长 或 错误信息)
+    """
+    wav_path = Path(wav_path)
+    output_path = Path(output_path) if output_path is not None else wav_path
+    if loudness not in ("peak", "rms", None):
+        raise ValueError(f"未知的响度归一化方式: {loudness}")
+
+    try:
+        bytes_before = wav_path.stat().st_size
+        samples, framerate = _read_wav_float(wav_path)
+    except Exception as e:
+        return False, f"读取 WAV 失败: {e}"
+
+    if len(samples) == 0:
+        return False, "WAV 文件为空"
+    seconds_before = len(samples) / framerate
+
+    mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+
+    loud = np.abs(mono) >= threshold_ratio
+    if not loud.any():
+        return False, "未检测到有效发音段"
+    first = int(np.argmax(loud))
+    last = len(loud) - 1 - int(np.argmax(loud[::-1]))
+    start = max(0, first - int(framerate * keep_ms / 1000))
+    end = min(len(mono), last + 1 + int(framerate * tail_keep_ms / 1000))
+    mono = _resample(mono[start:end], framerate, target_rate)
+
+    peak_target = 10 ** (peak_dbfs / 20)
+    if loudness == "peak":
+        peak = float(np.abs(mono).max())
+        if peak > 0:
+            mono = mono * (peak_target / peak)
+    elif loudness == "rms":
+        rms = float(np.sqrt(np.mean(np.square(mono, dtype=np.float64))))
+        peak = float(np.abs(mono).max())
+        if rms > 0:
+            gain = 10 ** (rms_dbfs / 20) / rms
+            mono = mono * min(gain, peak_target / peak)
+
+    pcm = (np.clip(mono, -1.0, 32767 / 32768) * 32768).astype("<i2").tobytes()
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            f.write(_pcm_wav_header(1, 2, target_rate, len(pcm)))
+            f.write(pcm)
+        ok, msg = validate_device_wav(tmp_path)
+        if not ok:
+            tmp_path.unlink(missing_ok=True)
+            return False, f"输出不符合固件格式: {msg}"
+        os.replace(str(tmp_path), str(output_path))
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        return False, f"写入 WAV 失败: {e}"
+
+    return True, {
+        "file": str(output_path),
+        "bytes_before": bytes_before,
+        "bytes_after": output_path.stat().st_size,
+        "seconds_before": seconds_before,
+        "seconds_after": len(mono) / target_rate,
+    }
+
+
+def _normalize_task(args: Tuple[str, str, dict]) -> Tuple[bool, dict | str]:
+    """
+    进程池任务: 规范化单个文件（参数打包为元组便于 map）。
+    """
+    wav_path, output_path, options = args
+    return normalize_wav(wav_path, output_path, **options)
+
+
+def normalize_audio_folder(
+    folder_path: str | Path,
+    output_folder: str | Path | None = None,
+    recursive: bool = True,
+    workers: int = 1,
+    **options,
+) -> dict:
+    """
+    批量规范化文件夹内的 WAV,使其符合设备播放格式。
+
+    :param folder_path: 输入文件夹
+    :param output_folder: 输出文件夹（保持相对路径）,None 表示原地覆盖
+    :param recursive: 是否递归子文件夹
+    :param workers: 并行进程数,1 表示在当前进程串行处理
+    :param options: 传给 normalize_wav 的参数（target_rate / loudness 等）
+    :return: 统计结果 dict,含节省的字节数与播放秒数
     """
     folder = Path(folder_path)
     if not folder.is_dir():
         raise NotADirectoryError(f"{folder} 不是有效文件夹")
+    out_root = Path(output_folder) if output_folder is not None else folder
 
+    start_time = time.perf_counter()
     wav_files = list(folder.rglob("*.wav")) if recursive else list(folder.glob("*.wav"))
+    tasks = [
+        (str(f), str(out_root / f.relative_to(folder)), options)
+        for f in wav_files
+    ]
+
     summary = {
         "folder": str(folder),
         "total": len(wav_files),
         "success": 0,
         "failed": 0,
         "errors": [],
+        "bytes_before": 0,
+        "bytes_after": 0,
+        "bytes_saved": 0,
+        "seconds_before": 0.0,
+        "seconds_after": 0.0,
+        "seconds_saved": 0.0,
     }
 
-    for wav_file in wav_files:
-        ok, msg = trim_leading_silence_wav(
-            wav_path=wav_file,
-            output_path=wav_file,
-            threshold_ratio=threshold_ratio,
-            keep_ms=keep_ms,
-            max_trim_ms=max_trim_ms,
-        )
-        if ok:
-            summary["success"] += 1
-        else:
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(tasks) // (workers * 8))
+            results = list(executor.map(_normalize_task, tasks, chunksize=chunksize))
+    else:
+        results = [_normalize_task(task) for task in tasks]
+
+    for wav_file, (ok, info) in zip(wav_files, results):
+        if not ok:
             summary["failed"] += 1
-            summary["errors"].append({"file": str(wav_file), "error": msg})
+            summary["errors"].append({"file": str(wav_file), "error": info})
+            continue
+        summary["success"] += 1
+        for key in ("bytes_before", "bytes_after", "seconds_before", "seconds_after"):
+            summary[key] += info[key]
 
+    summary["bytes_saved"] = summary["bytes_before"] - summary["bytes_after"]
+    summary["seconds_saved"] = round(summary["seconds_before"] - summary["seconds_after"], 3)
+    summary["seconds_before"] = round(summary["seconds_before"], 3)
+    summary["seconds_after"] = round(summary["seconds_after"], 3)
+
+    elapsed = time.perf_counter() - start_time
+    summary["elapsed"] = round(elapsed, 3)
+    summary["files_per_sec"] = round(len(tasks) / elapsed, 1) if elapsed > 0 else 0.0
     return summary
 
 
-if __name__ == "__main__":
-    summary = trim_leading_silence_in_folder(r"D:\Project\WordCardputer\words_study\en\audio")
-    print(summary)
+# ---------------------------------------------------------------------------
+# 压缩编码: IMA-ADPCM（4-bit,约 4:1）与 G.711 μ-law（8-bit,2:1）
+# ---------------------------------------------------------------------------
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_MULAW = 0x0007
+WAVE_FORMAT_IMA_ADPCM = 0x0011
+
+_IMA_STEP_TABLE = np.array([
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767,
+], dtype=np.int32)
+_IMA_INDEX_TABLE = np.array([-1, -1, -1, -1, 2, 4, 6, 8] * 2, dtype=np.int32)
+
+
+def ima_block_align(framerate: int) -> int:
+    """
+    单声道 IMA-ADPCM 的块大小,与 Windows ACM 编码器的约定一致（16kHz 为 256 字节）。
+    """
+    return 256 * max(1, framerate // 11025)
+
+
+def ima_samples_per_block(block_align: int) -> int:
+    # 4 字节块头（首样本 + 步长索引）,其余每字节两个样本
+    return (block_align - 4) * 2 + 1
+
+
+def _ima_blocks(samples: np.ndarray, block_align: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    把 int16 样本切成整块（末块用最后一个样本补齐）,并为每块选择初始步长索引。
+
+    每块的块头都记录了预测值和步长索引,块之间没有依赖,所以各块可以独立编码。
+    初始索引取步长表中最接近块开头 8 个差分平均幅度的一项,编码器几个样本后即可收敛。
+    """
+    spb = ima_samples_per_block(block_align)
+    samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+    nblocks = max(1, -(-len(samples) // spb))
+    padded = np.full(nblocks * spb, samples[-1] if len(samples) else 0, dtype=np.int32)
+    padded[:len(samples)] = samples
+    blocks = padded.reshape(nblocks, spb)
+
+    head = np.abs(np.diff(blocks[:, :9], axis=1)).mean(axis=1)
+    index = np.searchsorted(_IMA_STEP_TABLE, head).clip(0, 88).astype(np.int32)
+    return blocks, index
+
+
+def _ima_adpcm_encode_reference(samples: np.ndarray, block_align: int = 256) -> bytes:
+    """
+    逐样本编码 IMA-ADPCM 单声道数据（纯 Python 参考实现）。
+
+    保留用于校验 ima_adpcm_encode 的结果,两者输出逐字节一致。
+    """
+    blocks, index = _ima_blocks(samples, block_align)
+    step_table = _IMA_STEP_TABLE.tolist()
+    index_table = _IMA_INDEX_TABLE.tolist()
+    out = bytearray()
+    for block, idx in zip(blocks.tolist(), index.tolist()):
+        pred = block[0]
+        out += struct.pack("<hBB", pred, idx, 0)
+        codes = []
+        for sample in block[1:]:
+            step = step_table[idx]
+            diff = sample - pred
+            code = 0
+            if diff < 0:
+                code = 8
+                diff = -diff
+            vpdiff = step >> 3
+            if diff >= step:
+                code |= 4
+                diff -= step
+                vpdiff += step
+            step >>= 1
+            if diff >= step:
+                code |= 2
+                diff -= step
+                vpdiff += step
+            step >>= 1
+            if diff >= step:
+                code |= 1
+                vpdiff += step
+            pred = pred - vpdiff if code & 8 else pred + vpdiff
+            pred = max(-32768, min(32767, pred))
+            idx = max(0, min(88, idx + index_table[code]))
+            codes.append(code)
+        out += bytes(lo | (hi << 4) for lo, hi in zip(codes[0::2], codes[1::2]))
+    return bytes(out)
+
+
+def _ima_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    以 (步长索引 * 16 + 4-bit 码) 为下标的查表: 带符号的预测增量与下一个步长索引。
+    """
+    step = _IMA_STEP_TABLE[:, None]
+    code = np.arange(16)[None, :]
+    vpdiff = (step >> 3) + step * ((code & 4) > 0) + (step >> 1) * ((code & 2) > 0) + (step >> 2) * (code & 1)
+    vpdiff = np.where(code & 8, -vpdiff, vpdiff)
+    next_index = np.clip(np.arange(89)[:, None] + _IMA_INDEX_TABLE[None, :], 0, 88)
+    return vpdiff.reshape(-1).astype(np.int32), next_index.reshape(-1).astype(np.int32)
+
+
+_IMA_VPDIFF, _IMA_NEXT_INDEX = _ima_tables()
+
+
+def _ima_encode_blocks(blocks: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """
+    编码 (nblocks, samples_per_block) 的 int32 样本块,返回 (nblocks, block_align) 的字节块。
+
+    ADPCM 在块内逐样本依赖前一个状态,无法按样本向量化；但各块互相独立,
+    这里在块内位置上循环、在所有块上同时计算,循环次数只与块长有关。
+    块可以来自多个文件,块越多向量化收益越大。
+    """
+    nblocks, spb = blocks.shape
+    columns = np.ascontiguousarray(blocks.T)
+    pred = columns[0].copy()
+    idx = index.astype(np.int32)
+    codes = np.empty((spb - 1, nblocks), dtype=np.uint8)
+
+    for t in range(1, spb):
+        step = _IMA_STEP_TABLE[idx]
+        diff = columns[t] - pred
+        code = (diff < 0).astype(np.int32) << 3
+        diff = np.abs(diff)
+
+        bit = diff >= step
+        code |= bit << 2
+        diff -= step * bit
+        half = step >> 1
+        bit = diff >= half
+        code |= bit << 1
+        diff -= half * bit
+        code |= diff >= (step >> 2)
+
+        key = idx * 16 + code
+        pred += _IMA_VPDIFF[key]
+        np.clip(pred, -32768, 32767, out=pred)
+        idx = _IMA_NEXT_INDEX[key]
+        codes[t - 1] = code
+
+    header = np.zeros((nblocks, 4), dtype=np.uint8)
+    header[:, :2] = columns[0].astype("<i2").view(np.uint8).reshape(nblocks, 2)
+    header[:, 2] = index
+    packed = (codes[0::2] | (codes[1::2] << 4)).T
+    return np.concatenate([header, packed], axis=1)
+
+
+def ima_adpcm_encode(samples: np.ndarray, block_align: int = 256) -> bytes:
+    """
+    编码 IMA-ADPCM 单声道数据（向量化实现,与 _ima_adpcm_encode_reference 逐字节一致）。
+
+    :param samples: int16 单声道样本
+    :param block_align: 块字节数
+    :return: data 块内容（整数个块）
+    """
+    return _ima_encode_blocks(*_ima_blocks(samples, block_align)).tobytes()
+
+
+def _ima_decode_blocks(blocks: np.ndarray) -> np.ndarray:
+    """
+    解码 (nblocks, block_align) 的字节块,返回 (nblocks, samples_per_block) 的 int16 样本。
+    """
+    nblocks, block_align = blocks.shape
+    spb = ima_samples_per_block(block_align)
+    pred = blocks[:, :2].copy().view("<i2")[:, 0].astype(np.int32)
+    idx = np.clip(blocks[:, 2].astype(np.int32), 0, 88)
+    nibbles = np.empty((spb - 1, nblocks), dtype=np.int32)
+    nibbles[0::2] = (blocks[:, 4:] & 0x0F).T
+    nibbles[1::2] = (blocks[:, 4:] >> 4).T
+
+    out = np.empty((spb, nblocks), dtype=np.int16)
+    out[0] = pred
+    for t in range(spb - 1):
+        key = idx * 16 + nibbles[t]
+        pred += _IMA_VPDIFF[key]
+        np.clip(pred, -32768, 32767, out=pred)
+        idx = _IMA_NEXT_INDEX[key]
+        out[t + 1] = pred
+    return out.T
+
+
+def ima_adpcm_decode(data: bytes, block_align: int = 256, nsamples: int | None = None) -> np.ndarray:
+    """
+    解码 IMA-ADPCM 单声道数据（参考解码器,同样在所有块上向量化）。
+
+    :param data: data 块内容,末尾不足一块时补零
+    :param block_align: 块字节数
+    :param nsamples: 实际样本数（fact 块）,None 表示全部
+    :return: int16 样本
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    nblocks = -(-len(raw) // block_align)
+    if nblocks == 0:
+        return np.zeros(0, dtype=np.int16)
+    buf = np.zeros(nblocks * block_align, dtype=np.uint8)
+    buf[:len(raw)] = raw
+    out = _ima_decode_blocks(buf.reshape(nblocks, block_align)).reshape(-1)
+    return out if nsamples is None else out[:nsamples]
+
+
+def mulaw_encode(samples: np.ndarray) -> bytes:
+    """
+    G.711 μ-law 编码（向量化）,int16 → 每样本 1 字节。
+    """
+    x = np.asarray(samples, dtype=np.int32)
+    sign = (x < 0).astype(np.int32) << 7
+    magnitude = np.minimum(np.abs(x), 32635) + 0x84
+    exponent = np.frexp(magnitude)[1] - 8
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def mulaw_decode(data: bytes) -> np.ndarray:
+    """
+    G.711 μ-law 解码（参考解码器）,每字节 → int16。
+    """
+    b = ~np.frombuffer(data, dtype=np.uint8).astype(np.int32) & 0xFF
+    exponent = (b >> 4) & 0x07
+    magnitude = (((b & 0x0F) << 3) + 0x84 << exponent) - 0x84
+    return np.where(b & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+def snr_db(reference: np.ndarray, decoded: np.ndarray) -> float:
+    """
+    往返信噪比（dB）: 10·log10(Σx² / Σ(x - y)²),完全一致时返回 inf。
+    """
+    x = np.asarray(reference, dtype=np.float64).reshape(-1)
+    y = np.asarray(decoded, dtype=np.float64).reshape(-1)[:len(x)]
+    noise = float(np.sum(np.square(x - y)))
+    signal = float(np.sum(np.square(x)))
+    if noise == 0:
+        return float("inf")
+    if signal == 0:
+        return float("-inf")
+    return float(10 * np.log10(signal / noise))
+
+
+def _encoded_wav_bytes(format_tag: int, nchannels: int, framerate: int, block_align: int,
+                       bits: int, extra: bytes, nframes: int, data: bytes) -> bytes:
+    """
+    生成非 PCM 编码的 WAV: fmt（含 cbSize 扩展）+ fact（样本帧数）+ data。
+    """
+    samples_per_block = ima_samples_per_block(block_align) if format_tag == WAVE_FORMAT_IMA_ADPCM else 1
+    byte_rate = framerate * block_align // samples_per_block
+    fmt = struct.pack("<HHIIHHH", format_tag, nchannels, framerate, byte_rate, block_align, bits, len(extra)) + extra
+    chunks = (
+        b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        + b"fact" + struct.pack("<II", 4, nframes)
+        + b"data" + struct.pack("<I", len(data)) + data
+        + (b"\0" if len(data) % 2 else b"")
+    )
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+def decode_wav_reference(wav_path: str | Path) -> Tuple[np.ndarray, int]:
+    """
+    参考解码器: 读取 PCM / μ-law / IMA-ADPCM（单声道）WAV,
+    返回 (frames, channels) 的 int16 数组与采样率。
+    """
+    with open(wav_path, "rb") as f:
+        layout = read_wav_layout(f)
+        f.seek(layout["data_offset"])
+        data = f.read(layout["data_size"])
+
+    nchannels = layout["nchannels"]
+    format_tag = layout["format_tag"]
+    if format_tag == WAVE_FORMAT_PCM and layout["sampwidth"] == 2:
+        samples = np.frombuffer(data[: len(data) // 2 * 2], dtype="<i2")
+    elif format_tag == WAVE_FORMAT_PCM and layout["sampwidth"] == 1:
+        samples = ((np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 128) << 8).astype(np.int16)
+    elif format_tag == WAVE_FORMAT_MULAW:
+        samples = mulaw_decode(data)
+    elif format_tag == WAVE_FORMAT_IMA_ADPCM:
+        if nchannels != 1:
+            raise ValueError("参考解码器只支持单声道 IMA-ADPCM")
+        samples = ima_adpcm_decode(data, layout["block_align"], layout["fact_samples"])
+    else:
+        raise ValueError(f"不支持的 WAV 编码: format_tag={format_tag}")
+
+    nframes = len(samples) // nchannels
+    return samples[: nframes * nchannels].reshape(nframes, nchannels), layout["framerate"]
+
+
+def _read_pcm16(wav_path: Path) -> Tuple[np.ndarray, int, int]:
+    """
+    读取 8/16-bit PCM WAV,返回交错存储的 int16 样本、声道数与采样率。
+    """
+    with wave.open(str(wav_path), "rb") as wf:
+        nchannels = wf.getnchannels()
+        sampwidth = wf.getsampwidth()
+        framerate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+    if sampwidth == 2:
+        pcm = np.frombuffer(raw, dtype="<i2")
+    elif sampwidth == 1:
+        pcm = ((np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128) << 8).astype(np.int16)
+    else:
+        raise ValueError(f"仅支持 8/16-bit PCM, 当前为 {sampwidth * 8}-bit")
+    return pcm[: len(pcm) // nchannels * nchannels], nchannels, framerate
+
+
+def _encode_batch(args: Tuple[List[Tuple[str, str | None]], str]) -> List[Tuple[bool, dict | str]]:
+    """
+    进程池任务: 编码一批文件。
+
+    IMA-ADPCM 把同一块大小的所有文件的块堆叠起来一次编码、一次解码,
+    这样向量化的宽度是整批的块数,而不只是单个短音频的几十个块。
+    """
+    items, codec = args
+    results: List[Tuple[bool, dict | str] | None] = [None] * len(items)
+    loaded = {}
+    for i, (wav_path, _) in enumerate(items):
+        try:
+            pcm, nchannels, framerate = _read_pcm16(Path(wav_path))
+        except Exception as e:
+            results[i] = (False, f"读取 WAV 失败: {e}")
+            continue
+        if len(pcm) == 0:
+            results[i] = (False, "WAV 文件为空")
+        elif codec == "ima_adpcm" and nchannels != 1:
+            results[i] = (False, "IMA-ADPCM 只支持单声道,请先用 normalize_wav 混音")
+        else:
+            loaded[i] = (pcm, nchannels, framerate)
+
+    encoded: dict = {}
+    if codec == "ima_adpcm":
+        groups: dict = {}
+        for i, (pcm, _, framerate) in loaded.items():
+            groups.setdefault(ima_block_align(framerate), []).append(i)
+        for block_align, members in groups.items():
+            parts = [_ima_blocks(loaded[i][0], block_align) for i in members]
+            data = _ima_encode_blocks(
+                np.concatenate([blocks for blocks, _ in parts]),
+                np.concatenate([index for _, index in parts]),
+            )
+            decoded = _ima_decode_blocks(data)
+            start = 0
+            extra = struct.pack("<H", ima_samples_per_block(block_align))
+            for i, (blocks, _) in zip(members, parts):
+                end = start + len(blocks)
+                pcm, _, framerate = loaded[i]
+                wav_bytes = _encoded_wav_bytes(
+                    WAVE_FORMAT_IMA_ADPCM, 1, framerate, block_align, 4, extra, len(pcm), data[start:end].tobytes()
+                )
+                encoded[i] = (wav_bytes, decoded[start:end].reshape(-1)[: len(pcm)])
+                start = end
+    else:
+        for i, (pcm, nchannels, framerate) in loaded.items():
+            data = mulaw_encode(pcm)
+            wav_bytes = _encoded_wav_bytes(
+                WAVE_FORMAT_MULAW, nchannels, framerate, nchannels, 8, b"", len(pcm) // nchannels, data
+            )
+            encoded[i] = (wav_bytes, mulaw_decode(data))
+
+    for i, (wav_bytes, decoded) in encoded.items():
+        wav_path, output_path = items[i]
+        pcm, nchannels, framerate = loaded[i]
+        info = {
+            "file": str(output_path if output_path is not None else wav_path),
+            "bytes_before": Path(wav_path).stat().st_size,
+            "bytes_after": len(wav_bytes),
+            "seconds": len(pcm) / nchannels / framerate,
+            "snr_db": round(snr_db(pcm, decoded), 2),
+        }
+        if output_path is not None:
+            output_path = Path(output_path)
+            tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+            try:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_bytes(wav_bytes)
+                os.replace(str(tmp_path), str(output_path))
+            except Exception as e:
+                tmp_path.unlink(missing_ok=True)
+                results[i] = (False, f"写入 WAV 失败: {e}")
+                continue
+        results[i] = (True, info)
+    return results
+
+
+def encode_wav(
+    wav_path: str | Path,
+    output_path: str | Path | None = None,
+    codec: str = "ima_adpcm",
+) -> Tuple[bool, dict | str]:
+    """
+    把 8/16-bit PCM WAV 编码为 IMA-ADPCM（单声道,约 4:1）或 μ-law（8-bit,2:1）,
+    并用参考解码器还原计算往返 SNR。
+
+    注意当前固件 playWavStream 只播放 PCM,编码结果用于评估和后续固件适配。
 
-    # trim_leading_silence_wav(r"D:\Project\WordCardputer\words_study\en\audio\abreast.wav",
-    #                          r"D:\Project\WordCardputer\words_study\en\audio\abreast_trimed.wav")
-    pass
+    :param wav_path: 输入 WAV
+    :param output_path: 输出路径,None 表示只评估不写文件
+    :param codec: "ima_adpcm" / "mulaw"
+    :return: (是否成功, {"bytes_before", "bytes_after", "seconds", "snr_db"} 或 错误信息)
+    """
+    if codec not in ("ima_adpcm", "mulaw"):
+        raise ValueError(f"未知的编码: {codec}")
+    return _encode_batch(([(str(wav_path), str(output_path) if output_path is not None else None)], codec))[0]
+
+
+def encode_audio_folder(
+    folder_path: str | Path,
+    output_folder: str | Path | None = None,
+    codec: str = "ima_adpcm",
+    recursive: bool = True,
+    workers: int = 1,
+    sd_read_bytes_per_sec: float = 1_000_000,
+    batch_size: int = 64,
+) -> dict:
+    """
+    批量编码文件夹内的 WAV,统计压缩前后字节数、往返 SNR 与预计节省的 SD 读取时间。
+
+    :param folder_path: 输入文件夹
+    :param output_folder: 输出文件夹（保持相对路径）,None 表示只评估不写文件
+    :param codec: "ima_adpcm" / "mulaw"
+    :param recursive: 是否递归子文件夹
+    :param workers: 并行进程数,1 表示在当前进程串行处理
+    :param sd_read_bytes_per_sec: 设备 SD 卡（SPI）持续读取速度,用于估算节省的读取时间
+    :param batch_size: 每个进程任务一起编码的文件数上限
+    :return: 统计结果 dict
+    """
+    folder = Path(folder_path)
+    if not folder.is_dir():
+        raise NotADirectoryError(f"{folder} 不是有效文件夹")
+
+    if codec not in ("ima_adpcm", "mulaw"):
+        raise ValueError(f"未知的编码: {codec}")
+
+    start_time = time.perf_counter()
+    wav_files = list(folder.rglob("*.wav")) if recursive else list(folder.glob("*.wav"))
+    items = [
+        (str(f), str(Path(output_folder) / f.relative_to(folder)) if output_folder is not None else None)
+        for f in wav_files
+    ]
+    # 每批的文件一起堆叠编码；批数至少是进程数的几倍,便于负载均衡
+    batch_size = max(1, min(batch_size, -(-len(items) // (max(1, workers) * 4))))
+    batches = [(items[i:i + batch_size], codec) for i in range(0, len(items), batch_size)]
+
+    summary = {
+        "folder": str(folder),
+        "codec": codec,
+        "total": len(wav_files),
+        "success": 0,
+        "failed": 0,
+        "errors": [],
+        "bytes_before": 0,
+        "bytes_after": 0,
+        "bytes_saved": 0,
+        "ratio": 0.0,
+        "seconds": 0.0,
+        "snr_db_mean": None,
+        "snr_db_min": None,
+        "sd_read_seconds_saved": 0.0,
+    }
+
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = [result for batch in executor.map(_encode_batch, batches) for result in batch]
+    else:
+        results = [result for batch in batches for result in _encode_batch(batch)]
+
+    snrs = []
+    for wav_file, (ok, info) in zip(wav_files, results):
+        if not ok:
+            summary["failed"] += 1
+            summary["errors"].append({"file": str(wav_file), "error": info})
+            continue
+        summary["success"] += 1
+        summary["bytes_before"] += info["bytes_before"]
+        summary["bytes_after"] += info["bytes_after"]
+        summary["seconds"] += info["seconds"]
+        if np.isfinite(info["snr_db"]):
+            snrs.append(info["snr_db"])
+
+    summary["bytes_saved"] = summary["bytes_before"] - summary["bytes_after"]
+    if summary["bytes_after"]:
+        summary["ratio"] = round(summary["bytes_before"] / summary["bytes_after"], 2)
+    summary["seconds"] = round(summary["seconds"], 3)
+    if snrs:
+        summary["snr_db_mean"] = round(float(np.mean(snrs)), 2)
+        summary["snr_db_min"] = round(float(np.min(snrs)), 2)
+    summary["sd_read_seconds_saved"] = round(summary["bytes_saved"] / sd_read_bytes_per_sec, 3)
+
+    elapsed = time.perf_counter() - start_time
+    summary["elapsed"] = round(elapsed, 3)
+    summary["files_per_sec"] = round(len(items) / elapsed, 1) if elapsed > 0 else 0.0
+    return summary
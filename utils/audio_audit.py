@@ -0,0 +1,192 @@
+import os
+import json
+import unicodedata
+from typing import Dict, List, Tuple
+from pathlib import Path
+
+from .db_builder import LANG_SCHEMAS
+from .db_package import _open_readonly, detect_lang
+from .audio import validate_device_wav
+
+
+AUDIO_MANIFEST_NAME = ".audit_manifest.json"
+
+
+def _near_key(name: str) -> str:
+    # 大小写、首尾空白、Unicode 组合形式（如 macOS 的 NFD 文件名）不同都视为"近似匹配"
+    return unicodedata.normalize("NFC", name.strip()).casefold()
+
+
+def _load_manifest(manifest_path: Path) -> dict:
+    if not manifest_path.exists():
+        return {}
+    try:
+        return json.loads(manifest_path.read_text(encoding="utf-8")).get("files", {})
+    except Exception as e:
+        print(f"读取清单 {manifest_path} 失败,将重新检查全部文件: {e}")
+        return {}
+
+
+def scan_audio_dir(
+    audio_dir: str | Path,
+    manifest_path: str | Path | None = None,
+) -> Tuple[Dict[str, Tuple[int, str | None]], dict]:
+    """
+    用 os.scandir 扫描音频目录,返回 {文件名: (大小, 文件头问题)}。
+
+    文件头检查结果按 (size, mtime_ns) 缓存在清单中,未变化的文件不会重新打开。
+
+    :param audio_dir: 音频目录
+    :param manifest_path: 清单路径,默认 audio_dir/.audit_manifest.json
+    :return: (文件表, {"scanned", "checked", "cached"})
+    """
+    audio_dir = Path(audio_dir)
+    manifest_path = Path(manifest_path) if manifest_path else audio_dir / AUDIO_MANIFEST_NAME
+    cached = _load_manifest(manifest_path)
+
+    files: Dict[str, Tuple[int, str | None]] = {}
+    entries: dict = {}
+    stats = {"scanned": 0, "checked": 0, "cached": 0}
+    with os.scandir(audio_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(".wav") or not entry.is_file():
+                continue
+            st = entry.stat()
+            stats["scanned"] += 1
+            record = cached.get(entry.name)
+            if record is not None and record[0] == st.st_size and record[1] == st.st_mtime_ns:
+                problem = record[2]
+                stats["cached"] += 1
+            else:
+                problem = None
+                if st.st_size:
+                    ok, msg = validate_device_wav(entry.path)
+                    problem = None if ok else msg
+                stats["checked"] += 1
+            files[entry.name] = (st.st_size, problem)
+            entries[entry.name] = [st.st_size, st.st_mtime_ns, problem]
+
+    tmp_path = manifest_path.with_suffix(manifest_path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps({"files": entries}, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
+    return files, stats
+
+
+def load_audio_words(db_path: str | Path, lang: str | None = None) -> Tuple[str, List[str]]:
+    """
+    读取词库中需要音频的全部单词（jp / en 字段原样,不做 strip）,按首次出现的 id 排序去重。
+
+    :return: (lang, 单词列表)
+    """
+    conn = _open_readonly(db_path)
+    try:
+        lang = lang or detect_lang(conn)
+        schema = LANG_SCHEMAS[lang]
+        key = schema["key"][0]
+        rows = conn.execute(
+            f"SELECT {key} FROM {schema['words']} WHERE {key} IS NOT NULL AND {key} != '' "
+            f"GROUP BY {key} ORDER BY MIN(id)"
+        ).fetchall()
+    finally:
+        conn.close()
+    return lang, [row[0] for row in rows]
+
+
+def audit_audio_coverage(
+    db_path: str | Path,
+    audio_dir: str | Path,
+    lang: str | None = None,
+    manifest_path: str | Path | None = None,
+) -> dict:
+    """
+    一次扫描检查词库与音频目录的对应关系,匹配方式与固件 playAudioForWord 一致:
+    查找 <audio_dir>/<单词>.wav,单词原样拼接,不做大小写或空白处理。
+
+    报告分类:
+      - missing: 没有任何对应文件的单词
+      - mismatched: 只有大小写、首尾空白或 Unicode 组合形式不同的文件 [{"word", "file"}]。
+        FAT 卡上 ASCII 大小写不同可能仍能打开,但空白和假名组合形式不同一定找不到
+      - orphaned: 不对应任何单词的文件
+      - empty: 长度为 0 的文件
+      - bad_header: 固件无法播放的文件 [{"file", "error"}]
+
+    :param db_path: 词库数据库路径
+    :param audio_dir: 音频目录
+    :param lang: "jp" / "en",默认根据数据库表名判断
+    :param manifest_path: 扫描缓存清单路径
+    :return: 报告 dict
+    """
+    lang, words = load_audio_words(db_path, lang)
+    files, scan = scan_audio_dir(audio_dir, manifest_path)
+
+    near_files: Dict[str, List[str]] = {}
+    for name in files:
+        near_files.setdefault(_near_key(name[:-4]), []).append(name)
+
+    report = {
+        "lang": lang,
+        "db": str(db_path),
+        "audio_dir": str(audio_dir),
+        "words": len(words),
+        "files": len(files),
+        "ok": 0,
+        "missing": [],
+        "mismatched": [],
+        "orphaned": [],
+        "empty": [],
+        "bad_header": [],
+        "scan": scan,
+    }
+
+    used = set()
+    for word in words:
+        name = f"{word}.wav"
+        if name in files:
+            used.add(name)
+            size, problem = files[name]
+            if size and problem is None:
+                report["ok"] += 1
+            continue
+        candidates = near_files.get(_near_key(word), [])
+        if candidates:
+            used.update(candidates)
+            for candidate in candidates:
+                report["mismatched"].append({"word": word, "file": candidate})
+        else:
+            report["missing"].append(word)
+
+    for name in sorted(files):
+        size, problem = files[name]
+        if name not in used:
+            report["orphaned"].append(name)
+        if not size:
+            report["empty"].append(name)
+        elif problem is not None:
+            report["bad_header"].append({"file": name, "error": problem})
+
+    print(
+        f"[{lang}] 单词 {report['words']}, 音频 {report['files']}, 可播放 {report['ok']}, "
+        f"缺失 {len(report['missing'])}, 名称不一致 {len(report['mismatched'])}, "
+        f"多余 {len(report['orphaned'])}, 空文件 {len(report['empty'])}, "
+        f"文件头异常 {len(report['bad_header'])}"
+    )
+    return report
+
+
+def audit_audio_library(root: str | Path = "words_study") -> Dict[str, dict]:
+    """
+    按固件的目录布局（<root>/<lang>/<lang>_words.db 与 <root>/<lang>/audio）
+    检查全部语言,缺少数据库或音频目录的语言跳过。
+
+    :return: {lang: 报告}
+    """
+    root = Path(root)
+    reports = {}
+    for lang in LANG_SCHEMAS:
+        db_path = root / lang / f"{lang}_words.db"
+        audio_dir = root / lang / "audio"
+        if not db_path.exists() or not audio_dir.is_dir():
+            print(f"[{lang}] 跳过: 缺少 {db_path} 或 {audio_dir}")
+            continue
+        reports[lang] = audit_audio_coverage(db_path, audio_dir, lang=lang)
+    return reports
@@ -0,0 +1,293 @@
+import os
+import struct
+import sqlite3
+from typing import Dict, List, Tuple
+from pathlib import Path
+
+from .db_builder import LANG_SCHEMAS
+from .db_package import SD_SECTOR_SIZE, _open_readonly, detect_lang
+from .audio import validate_device_wav
+
+
+# 包文件头: magic, 版本, 代数, 对齐字节数。头部占满第一个对齐块,
+# 代数在每次整体重打包时加一,并同时写入数据库的 meta 表,
+# 固件可以比较两者判断包文件与索引是否匹配。
+BUNDLE_MAGIC = b"WCAB"
+BUNDLE_VERSION = 1
+_BUNDLE_HEADER = struct.Struct("<4sHHII")
+
+
+def _align_up(value: int, align: int) -> int:
+    return (value + align - 1) // align * align
+
+
+def audio_index_table(lang: str) -> str:
+    return f"{lang}_audio"
+
+
+def audio_meta_table(lang: str) -> str:
+    return f"{lang}_audio_meta"
+
+
+def _ensure_tables(conn: sqlite3.Connection, lang: str) -> None:
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {audio_index_table(lang)} (
+            word_id INTEGER PRIMARY KEY,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {audio_meta_table(lang)} (key TEXT PRIMARY KEY, value)"
+    )
+
+
+def _read_meta(conn: sqlite3.Connection, lang: str) -> dict:
+    return dict(conn.execute(f"SELECT key, value FROM {audio_meta_table(lang)}"))
+
+
+def read_bundle_header(bundle_path: str | Path) -> dict | None:
+    """
+    读取包文件头,文件不存在或不是音频包时返回 None。
+
+    :return: {"version", "generation", "align"}
+    """
+    try:
+        with open(bundle_path, "rb") as f:
+            raw = f.read(_BUNDLE_HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(raw) < _BUNDLE_HEADER.size:
+        return None
+    magic, version, _, generation, align = _BUNDLE_HEADER.unpack(raw)
+    if magic != BUNDLE_MAGIC:
+        return None
+    return {"version": version, "generation": generation, "align": align}
+
+
+def _write_header(f, generation: int, align: int) -> None:
+    header = _BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, 0, generation, align)
+    f.write(header.ljust(align, b"\0"))
+
+
+def _write_clip(f, clip_path: str, align: int) -> int:
+    """
+    在当前位置写入一个音频文件并补零到对齐边界,返回原始长度。
+    """
+    with open(clip_path, "rb") as src:
+        data = src.read()
+    f.write(data)
+    f.write(b"\0" * (_align_up(len(data), align) - len(data)))
+    return len(data)
+
+
+def pack_audio_bundle(
+    db_path: str | Path,
+    audio_dir: str | Path,
+    bundle_path: str | Path | None = None,
+    lang: str | None = None,
+    align: int = SD_SECTOR_SIZE,
+    incremental: bool = True,
+    max_garbage: float = 0.25,
+) -> dict:
+    """
+    把音频目录中的全部 <单词>.wav 拼接成一个按扇区对齐的包文件,
+    并在词库数据库中写入 <lang>_audio(word_id, offset, length, mtime_ns) 索引表。
+
+    固件据此只需一次主键查询和一次 seek 即可定位音频,不必在数千个文件的
+    FAT 目录中线性查找。每段音频是完整的 WAV 文件,从对齐的 offset 开始。
+
+    增量模式下未变化（大小与 mtime 相同）的音频保持原位置；新增或修改的音频
+    追加到包末尾,先写包再提交索引,中途失败时旧索引仍然有效。不再被引用的
+    空间超过 max_garbage 比例时自动整体重打包。
+
+    :param db_path: 词库数据库路径（索引表写入该库）
+    :param audio_dir: 音频目录,文件名与固件一致为 <单词>.wav
+    :param bundle_path: 包文件路径,默认 <audio_dir>.pack
+    :param lang: "jp" / "en",默认根据数据库表名判断
+    :param align: 对齐字节数,默认 SD 扇区 512
+    :param incremental: False 时总是整体重打包
+    :param max_garbage: 允许的无效空间比例
+    :return: 统计信息 dict
+    """
+    audio_dir = Path(audio_dir)
+    bundle_path = Path(bundle_path) if bundle_path else audio_dir.with_name(audio_dir.name + ".pack")
+
+    summary = {
+        "bundle": str(bundle_path),
+        "words": 0,
+        "packed": 0,
+        "reused": 0,
+        "written": 0,
+        "missing": 0,
+        "invalid": [],
+        "repacked": False,
+        "bytes_written": 0,
+        "bundle_bytes": 0,
+        "garbage_bytes": 0,
+    }
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        lang = lang or detect_lang(conn)
+        schema = LANG_SCHEMAS[lang]
+        key = schema["key"][0]
+        index_table = audio_index_table(lang)
+        _ensure_tables(conn, lang)
+
+        words = conn.execute(
+            f"SELECT id, {key} FROM {schema['words']} WHERE {key} IS NOT NULL AND {key} != '' ORDER BY id"
+        ).fetchall()
+        summary["words"] = len(words)
+
+        with os.scandir(audio_dir) as it:
+            clips = {entry.name: entry.stat() for entry in it if entry.name.endswith(".wav") and entry.is_file()}
+
+        # 旧索引只有在包文件头的代数、对齐方式与 meta 一致时才可复用
+        meta = _read_meta(conn, lang)
+        header = read_bundle_header(bundle_path)
+        old: Dict[int, Tuple[int, int, int]] = {}
+        end = 0
+        if (
+            incremental
+            and header is not None
+            and header["generation"] == meta.get("generation")
+            and header["align"] == align == meta.get("align")
+            and bundle_path.stat().st_size >= (meta.get("size") or 0)
+        ):
+            old = {
+                word_id: (offset, length, mtime_ns)
+                for word_id, offset, length, mtime_ns in conn.execute(
+                    f"SELECT word_id, offset, length, mtime_ns FROM {index_table}"
+                )
+            }
+            end = meta["size"]
+
+        keep: Dict[int, Tuple[int, int, int]] = {}
+        changed: List[Tuple[int, str, int]] = []
+        for word_id, word in words:
+            st = clips.get(f"{word}.wav")
+            if st is None or st.st_size == 0:
+                summary["missing"] += 1
+                continue
+            previous = old.get(word_id)
+            if previous is not None and previous[1] == st.st_size and previous[2] == st.st_mtime_ns:
+                keep[word_id] = previous
+                continue
+            clip_path = str(audio_dir / f"{word}.wav")
+            ok, msg = validate_device_wav(clip_path)
+            if not ok:
+                summary["invalid"].append({"word": word, "error": msg})
+                continue
+            changed.append((word_id, clip_path, st.st_mtime_ns))
+
+        appended = sum(_align_up(os.path.getsize(clip_path), align) for _, clip_path, _ in changed)
+        live = align + sum(_align_up(length, align) for _, length, _ in keep.values()) + appended
+        projected = end + appended
+        full = not old or (projected - live) > max_garbage * projected
+
+        rows: Dict[int, Tuple[int, int, int]] = {}
+        if full:
+            # 整体重打包: 按 word_id 顺序写入临时文件,索引提交后再替换包文件
+            generation = (meta.get("generation") or 0) + 1
+            tmp_path = bundle_path.with_suffix(bundle_path.suffix + ".tmp")
+            word_by_id = dict(words)
+            todo = sorted(
+                [(word_id, str(audio_dir / f"{word_by_id[word_id]}.wav"), mtime_ns) for word_id, (_, _, mtime_ns) in keep.items()]
+                + changed
+            )
+            try:
+                with open(tmp_path, "wb") as f:
+                    _write_header(f, generation, align)
+                    for word_id, clip_path, mtime_ns in todo:
+                        offset = f.tell()
+                        rows[word_id] = (offset, _write_clip(f, clip_path, align), mtime_ns)
+                    end = f.tell()
+                    f.flush()
+                    os.fsync(f.fileno())
+                with conn:
+                    conn.execute(f"DELETE FROM {index_table}")
+                    _insert_rows(conn, lang, rows, generation, align, end, bundle_path)
+                os.replace(tmp_path, bundle_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+            summary["repacked"] = True
+            summary["written"] = len(rows)
+            summary["bytes_written"] = end
+        else:
+            # 增量: 追加到上次记录的末尾（覆盖上次未提交的残留）,再提交索引
+            rows.update(keep)
+            start = end
+            with open(bundle_path, "r+b") as f:
+                f.seek(end)
+                for word_id, clip_path, mtime_ns in changed:
+                    offset = f.tell()
+                    rows[word_id] = (offset, _write_clip(f, clip_path, align), mtime_ns)
+                end = f.tell()
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+            with conn:
+                stale = [(word_id,) for word_id in old if word_id not in rows]
+                conn.executemany(f"DELETE FROM {index_table} WHERE word_id = ?", stale)
+                changed_rows = {word_id: rows[word_id] for word_id, _, _ in changed}
+                _insert_rows(conn, lang, changed_rows, meta["generation"], align, end, bundle_path)
+            summary["reused"] = len(keep)
+            summary["written"] = len(changed)
+            summary["bytes_written"] = end - start
+
+        summary["packed"] = len(rows)
+        summary["bundle_bytes"] = end
+        summary["garbage_bytes"] = end - align - sum(_align_up(length, align) for _, length, _ in rows.values())
+    finally:
+        conn.close()
+
+    print(
+        f"[{lang}] 音频包 {bundle_path.name}: {summary['packed']}/{summary['words']} 个单词, "
+        f"{'整体重打包' if summary['repacked'] else '增量追加'} {summary['written']} 个, "
+        f"包大小 {summary['bundle_bytes'] / 1e6:.1f} MB, 无效空间 {summary['garbage_bytes'] / 1e6:.2f} MB"
+    )
+    return summary
+
+
+def _insert_rows(
+    conn: sqlite3.Connection,
+    lang: str,
+    rows: Dict[int, Tuple[int, int, int]],
+    generation: int,
+    align: int,
+    size: int,
+    bundle_path: Path,
+) -> None:
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {audio_index_table(lang)} (word_id, offset, length, mtime_ns) VALUES (?, ?, ?, ?)",
+        ((word_id, offset, length, mtime_ns) for word_id, (offset, length, mtime_ns) in rows.items()),
+    )
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {audio_meta_table(lang)} (key, value) VALUES (?, ?)",
+        [("bundle", bundle_path.name), ("generation", generation), ("align", align), ("size", size)],
+    )
+
+
+def read_bundle_clip(db_path: str | Path, bundle_path: str | Path, word_id: int, lang: str | None = None) -> bytes | None:
+    """
+    按固件将来的方式读取一段音频: 主键查询 offset/length,再一次 seek 读取。
+
+    :return: WAV 文件内容,单词没有音频时返回 None
+    """
+    conn = _open_readonly(db_path)
+    try:
+        lang = lang or detect_lang(conn)
+        row = conn.execute(
+            f"SELECT offset, length FROM {audio_index_table(lang)} WHERE word_id = ?", (word_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    with open(bundle_path, "rb") as f:
+        f.seek(row[0])
+        return f.read(row[1])
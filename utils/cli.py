@@ -0,0 +1,298 @@
+"""
+wordcardputer 命令行入口。
+
+用法:
+    wordcardputer merge words_study/jp/json --key jp
+    wordcardputer dedupe words_study/en/json --key en --corpus --priority core
+    wordcardputer split words_study/jp/json --max-per-file 60
+    wordcardputer trim words_study/jp/audio --workers 4
+    wordcardputer tts --db words_study/en/en_words.db --audio-dir words_study/en/audio
+    wordcardputer stats words_study/jp/jp_words.db
+    wordcardputer sync words_study/en/en_words.db pulled/en_words.db
+    wordcardputer upload words_study/en/word --device http://192.168.1.50 --workers 2
+    wordcardputer serve-device tmp/en_words.db --lang en --port 8080
+
+未安装脚本入口时可用 python -m utils 代替 wordcardputer。
+加 --metrics report.json（放在子命令之前）可得到各阶段耗时报告,--profile 另存 cProfile 统计。
+每个子命令只在执行时导入自己需要的模块,结果以 JSON 打印到标准输出；
+各函数打印的进度信息转到标准错误,可直接用管道处理结果（如 | jq）。
+"""
+import sys
+import json
+import argparse
+import contextlib
+from pathlib import Path
+
+# 执行子命令时 sys.stdout 被转到标准错误,结果写到进入 main 时的标准输出
+_result_stream = None
+
+
+def _print_result(result) -> None:
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str), file=_result_stream or sys.stdout)
+
+
+def _cmd_merge(args) -> int:
+    from .json_utils import apply_merge_and_rewrite_by_key
+
+    entries = apply_merge_and_rewrite_by_key(
+        args.folder,
+        key_field=args.key,
+        score_field=args.score_field,
+        tone_field=args.tone_field or None,
+        workers=args.workers,
+    )
+    _print_result({"entries": len(entries)})
+    return 0
+
+
+def _cmd_dedupe(args) -> int:
+    if args.corpus:
+        from .key_index import dedupe_corpus_by_key
+
+        _print_result(
+            dedupe_corpus_by_key(
+                args.folder,
+                key_field=args.key,
+                priority=args.priority,
+                workers=args.workers,
+                dry_run=args.dry_run,
+            )
+        )
+    else:
+        if args.dry_run or args.priority:
+            print("--dry-run / --priority 只在 --corpus 模式下有效", file=sys.stderr)
+            return 2
+        from .json_utils import dedupe_json_by_key
+
+        dedupe_json_by_key(args.folder, key_field=args.key)
+    return 0
+
+
+def _cmd_split(args) -> int:
+    from .json_utils import process_folder, split_json_file
+
+    if Path(args.path).is_file():
+        result = split_json_file(args.path, max_per_file=args.max_per_file, balance_key=args.balance_key)
+    else:
+        result = process_folder(
+            args.path,
+            max_per_file=args.max_per_file,
+            workers=args.workers,
+            balance_key=args.balance_key,
+            force=args.force,
+        )
+    if result is None:
+        return 1
+    _print_result(result)
+    return 1 if result.get("errors") else 0
+
+
+def _cmd_trim(args) -> int:
+    from .audio import trim_leading_silence_in_folder
+
+    summary = trim_leading_silence_in_folder(
+        args.folder,
+        recursive=not args.no_recursive,
+        threshold_ratio=args.threshold_ratio,
+        keep_ms=args.keep_ms,
+        max_trim_ms=args.max_trim_ms,
+        workers=args.workers,
+        incremental=not args.force,
+        streaming=args.streaming,
+    )
+    _print_result(summary)
+    return 1 if summary.get("failed") else 0
+
+
+def _cmd_tts(args) -> int:
+    from .tts import fill_missing_audio_concurrent
+
+    success, fail = fill_missing_audio_concurrent(
+        db_path=args.db,
+        audio_dir=args.audio_dir,
+        rate=args.rate,
+        fetch_workers=args.fetch_workers,
+        transcode_workers=args.transcode_workers,
+        max_retries=args.max_retries,
+        retry_failed=args.retry_failed,
+    )
+    _print_result({"success": success, "fail": fail})
+    return 1 if fail else 0
+
+
+def _cmd_stats(args) -> int:
+    from .stats import analyze_vocab_mastery, analyze_vocab_mastery_db
+
+    if Path(args.path).suffix == ".json":
+        result = analyze_vocab_mastery(args.path)
+    else:
+        result = analyze_vocab_mastery_db(args.path, lang=args.lang)
+        if not args.detail:
+            result = {key: value for key, value in result.items() if key != "chapters"}
+    _print_result(result)
+    return 0
+
+
+def _cmd_sync(args) -> int:
+    from .score_sync import sync_scores
+
+    summary = sync_scores(
+        args.master,
+        args.device,
+        lang=args.lang,
+        prefer=args.prefer,
+        full=args.full,
+        dry_run=args.dry_run,
+    )
+    _print_result(summary)
+    return 0
+
+
+def _cmd_upload(args) -> int:
+    from .device_client import DeviceClient, upload_vocab_tree
+
+    with DeviceClient(args.device, pool_maxsize=max(args.workers, 1)) as client:
+        summary = upload_vocab_tree(
+            client,
+            args.word_root,
+            lang=args.lang,
+            workers=args.workers,
+            memory_budget=args.memory_budget,
+        )
+    _print_result(summary)
+    return 1 if summary["errors"] else 0
+
+
+def _cmd_serve_device(args) -> int:
+    from .device_standin import DeviceStandIn
+
+    standin = DeviceStandIn(
+        args.db,
+        lang=args.lang,
+        host=args.host,
+        port=args.port,
+        free_heap=args.free_heap,
+        latency=args.latency_ms / 1000,
+        verbose=True,
+    )
+    print(f"模拟设备已启动: {standin.url}（Ctrl+C 结束）")
+    try:
+        standin.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.httpd.server_close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="wordcardputer",
+        description="WordCardputer 词库与音频工具",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="记录各阶段耗时、计数与单项耗时直方图,结束时写出报告（.json / .csv 或目录）,"
+        "也可用环境变量 WORDCARDPUTER_METRICS 开启",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="同时用 cProfile 记录主线程并写出 pstats 文件（环境变量 WORDCARDPUTER_PROFILE）",
+    )
+    sub = parser.add_subparsers(dest="command", required=True, metavar="<command>")
+
+    p = sub.add_parser("merge", help="按键合并全部 JSON 中的同一词条并写回")
+    p.add_argument("folder", help="JSON 目录（递归）")
+    p.add_argument("--key", default="jp", help="键字段,jp / en")
+    p.add_argument("--score-field", default="score")
+    p.add_argument("--tone-field", default="tone", help="为空字符串时不合并声调")
+    p.add_argument("--workers", type=int, default=1)
+    p.set_defaults(func=_cmd_merge)
+
+    p = sub.add_parser("dedupe", help="按键去重")
+    p.add_argument("folder", help="JSON 目录")
+    p.add_argument("--key", default="jp", help="键字段,jp / en")
+    p.add_argument("--corpus", action="store_true", help="整个目录范围去重（递归,使用全局键索引）,默认只在单个文件内去重")
+    p.add_argument("--priority", nargs="*", default=[], help="--corpus: 优先保留的来源（相对路径或子目录）")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--dry-run", action="store_true", help="--corpus: 只统计,不写回")
+    p.set_defaults(func=_cmd_dedupe)
+
+    p = sub.add_parser("split", help="把 JSON 拆分为 _partN 分片")
+    p.add_argument("path", help="JSON 文件或目录")
+    p.add_argument("--max-per-file", type=int, default=60)
+    p.add_argument("--balance-key", help="按该字段排序后均衡分配到各分片")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--force", action="store_true", help="忽略拆分清单,全部重新拆分")
+    p.set_defaults(func=_cmd_split)
+
+    p = sub.add_parser("trim", help="裁剪 WAV 前导静音")
+    p.add_argument("folder", help="音频目录")
+    p.add_argument("--no-recursive", action="store_true", help="不处理子目录")
+    p.add_argument("--threshold-ratio", type=float, default=0.015)
+    p.add_argument("--keep-ms", type=int, default=40)
+    p.add_argument("--max-trim-ms", type=int, default=800)
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--streaming", action="store_true", help="只读取文件开头检测起音点")
+    p.add_argument("--force", action="store_true", help="忽略裁剪清单,全部重新处理")
+    p.set_defaults(func=_cmd_trim)
+
+    p = sub.add_parser("tts", help="为缺少音频的英语单词下载有道发音")
+    p.add_argument("--db", default="words_study/en/en_words.db")
+    p.add_argument("--audio-dir", default="words_study/en/audio")
+    p.add_argument("--rate", type=float, default=2.0, help="每秒最多发起的下载请求数")
+    p.add_argument("--fetch-workers", type=int, default=4)
+    p.add_argument("--transcode-workers", type=int, default=None)
+    p.add_argument("--max-retries", type=int, default=3)
+    p.add_argument("--retry-failed", action="store_true", help="重新尝试上次永久失败的单词")
+    p.set_defaults(func=_cmd_tts)
+
+    p = sub.add_parser("stats", help="统计掌握程度")
+    p.add_argument("path", help="词库数据库或 JSON 文件")
+    p.add_argument("--lang", choices=("jp", "en"), help="默认根据数据库表名判断")
+    p.add_argument("--detail", action="store_true", help="数据库: 同时输出每个章节的结果")
+    p.set_defaults(func=_cmd_stats)
+
+    p = sub.add_parser("sync", help="双向同步设备数据库与 PC 主词库的分数、错题与 source 归属")
+    p.add_argument("master", help="PC 主词库数据库")
+    p.add_argument("device", help="设备数据库或从设备拉取的副本")
+    p.add_argument("--lang", choices=("jp", "en"), help="默认根据数据库表名判断")
+    p.add_argument("--prefer", choices=("device", "master"), default="device", help="全量比对时分数冲突以哪一方为准")
+    p.add_argument("--full", action="store_true", help="忽略变更日志,全量比对")
+    p.add_argument("--dry-run", action="store_true", help="只输出变更集,不写入")
+    p.set_defaults(func=_cmd_sync)
+
+    p = sub.add_parser("upload", help="通过 Web 控制面板把词库 JSON 目录批量导入设备")
+    p.add_argument("word_root", help="词库 JSON 目录（<source>.json 或 <source>/<chapter>.json）")
+    p.add_argument("--device", required=True, help="设备地址,如 http://192.168.1.50")
+    p.add_argument("--lang", choices=("jp", "en"), help="默认取设备当前语言")
+    p.add_argument("--workers", type=int, default=2, help="并行上传的文件数")
+    p.add_argument("--memory-budget", type=int, help="单次导入占用的设备内存上限（字节）,默认为空闲堆的一半")
+    p.set_defaults(func=_cmd_upload)
+
+    p = sub.add_parser("serve-device", help="在本机模拟设备 Web 控制面板 API")
+    p.add_argument("db", help="词库数据库,不存在时新建（需要 --lang）")
+    p.add_argument("--lang", choices=("jp", "en"), help="默认根据数据库表名判断")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--free-heap", type=int, default=150_000, help="模拟的空闲堆（字节）,也是单次导入的内存上限")
+    p.add_argument("--latency-ms", type=float, default=0.0, help="每个请求额外等待的毫秒数")
+    p.set_defaults(func=_cmd_serve_device)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    from .metrics import metrics_run
+
+    global _result_stream
+    args = build_parser().parse_args(argv)
+    _result_stream = sys.stdout
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            with metrics_run(args.command, report_path=args.metrics, profile_path=args.profile):
+                return args.func(args)
+    finally:
+        _result_stream = None
@@ -0,0 +1,548 @@
+import os
+import sqlite3
+import time
+from typing import Iterator, List, Tuple
+from pathlib import Path
+
+from .json_utils import iter_json_list
+
+
+# 与固件 (src/UtilsDb.cpp) 使用的数据库结构保持一致
+LANG_SCHEMAS = {
+    "jp": {
+        "words": "jp_words",
+        "source": "jp_source",
+        "errors": "jp_errors",
+        "key": ("jp", "tone"),
+        "columns": ("jp", "zh", "kanji", "romaji", "tone", "score", "sentence", "sentence_zh"),
+        "tables": [
+            """CREATE TABLE IF NOT EXISTS jp_words (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                jp TEXT NOT NULL,
+                zh TEXT NOT NULL,
+                kanji TEXT NOT NULL DEFAULT '',
+                romaji TEXT NOT NULL DEFAULT '',
+                tone INTEGER NOT NULL,
+                score INTEGER NOT NULL DEFAULT 3,
+                sentence TEXT NOT NULL DEFAULT '',
+                sentence_zh TEXT NOT NULL DEFAULT '',
+                UNIQUE(jp, tone)
+            )""",
+        ],
+        "upsert": (
+            "INSERT INTO jp_words (jp, zh, kanji, romaji, tone, score, sentence, sentence_zh) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(jp, tone) DO UPDATE SET "
+            "zh = excluded.zh, "
+            "kanji = excluded.kanji, "
+            "romaji = excluded.romaji, "
+            "score = MAX(jp_words.score, excluded.score), "
+            "sentence = CASE WHEN excluded.sentence <> '' THEN excluded.sentence ELSE jp_words.sentence END, "
+            "sentence_zh = CASE WHEN excluded.sentence_zh <> '' THEN excluded.sentence_zh ELSE jp_words.sentence_zh END"
+        ),
+    },
+    "en": {
+        "words": "en_words",
+        "source": "en_source",
+        "errors": "en_errors",
+        "key": ("en",),
+        "columns": ("en", "zh", "pos", "phonetic", "score", "sentence", "sentence_zh"),
+        "tables": [
+            """CREATE TABLE IF NOT EXISTS en_words (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                en TEXT NOT NULL,
+                zh TEXT NOT NULL,
+                pos TEXT NOT NULL DEFAULT '',
+                phonetic TEXT NOT NULL DEFAULT '',
+                score INTEGER NOT NULL DEFAULT 3,
+                sentence TEXT NOT NULL DEFAULT '',
+                sentence_zh TEXT NOT NULL DEFAULT '',
+                UNIQUE(en)
+            )""",
+            """CREATE TABLE IF NOT EXISTS en_roots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                root TEXT NOT NULL UNIQUE,
+                meaning TEXT NOT NULL,
+                origin TEXT NOT NULL DEFAULT ''
+            )""",
+            """CREATE TABLE IF NOT EXISTS en_affixes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                affix TEXT NOT NULL UNIQUE,
+                type TEXT NOT NULL,
+                meaning TEXT NOT NULL,
+                origin TEXT NOT NULL DEFAULT ''
+            )""",
+            """CREATE TABLE IF NOT EXISTS en_word_roots (
+                word_id INTEGER NOT NULL,
+                root_id INTEGER NOT NULL,
+                PRIMARY KEY (word_id, root_id),
+                FOREIGN KEY (word_id) REFERENCES en_words(id) ON DELETE CASCADE,
+                FOREIGN KEY (root_id) REFERENCES en_roots(id) ON DELETE CASCADE
+            )""",
+            """CREATE TABLE IF NOT EXISTS en_word_affixes (
+                word_id INTEGER NOT NULL,
+                affix_id INTEGER NOT NULL,
+                PRIMARY KEY (word_id, affix_id),
+                FOREIGN KEY (word_id) REFERENCES en_words(id) ON DELETE CASCADE,
+                FOREIGN KEY (affix_id) REFERENCES en_affixes(id) ON DELETE CASCADE
+            )""",
+        ],
+        "upsert": (
+            "INSERT INTO en_words (en, zh, pos, phonetic, score, sentence, sentence_zh) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(en) DO UPDATE SET "
+            "zh = excluded.zh, "
+            "pos = excluded.pos, "
+            "phonetic = excluded.phonetic, "
+            "score = MAX(en_words.score, excluded.score), "
+            "sentence = CASE WHEN excluded.sentence <> '' THEN excluded.sentence ELSE en_words.sentence END, "
+            "sentence_zh = CASE WHEN excluded.sentence_zh <> '' THEN excluded.sentence_zh ELSE en_words.sentence_zh END"
+        ),
+    },
+}
+
+for _lang, _schema in LANG_SCHEMAS.items():
+    _schema["tables"] += [
+        f"""CREATE TABLE IF NOT EXISTS {_lang}_source (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                word_id INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                chapter TEXT NOT NULL DEFAULT '',
+                UNIQUE(word_id, source, chapter),
+                FOREIGN KEY(word_id) REFERENCES {_lang}_words(id) ON DELETE CASCADE
+            )""",
+        f"""CREATE TABLE IF NOT EXISTS {_lang}_errors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                word_id INTEGER NOT NULL,
+                wrong_text TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY(word_id) REFERENCES {_lang}_words(id) ON DELETE CASCADE
+            )""",
+    ]
+    # 二级索引在批量写入完成后再创建
+    _schema["indexes"] = [
+        f"CREATE INDEX IF NOT EXISTS idx_{_lang}_source_word_id ON {_lang}_source(word_id)",
+        f"CREATE INDEX IF NOT EXISTS idx_{_lang}_source_source_chapter ON {_lang}_source(source, chapter)",
+        f"CREATE INDEX IF NOT EXISTS idx_{_lang}_errors_word_id ON {_lang}_errors(word_id)",
+    ]
+
+
+def _text(value) -> str:
+    return value if isinstance(value, str) else ""
+
+
+def _int(value, default: int) -> int:
+    return value if isinstance(value, int) and not isinstance(value, bool) else default
+
+
+def _name_list(value) -> List[str]:
+    """
+    词条中的 roots / affixes 字段: 列表或以 "; " 拼接的字符串。
+    """
+    if isinstance(value, list):
+        return [v for v in value if isinstance(v, str) and v]
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(";") if v.strip()]
+    return []
+
+
+def word_row_from_entry(entry: dict, lang: str) -> tuple | None:
+    """
+    按固件 importJsonFileToDb 的规则把 JSON 词条转换为一行数据。
+
+    缺少 jp/en 的词条返回 None；score 缺省为 3 并截断到 1..5,
+    日语 tone 缺省为 -1；非字符串的文本字段按空字符串处理。
+    """
+    if not isinstance(entry, dict):
+        return None
+    score = min(5, max(1, _int(entry.get("score"), 3)))
+    if lang == "jp":
+        jp = _text(entry.get("jp"))
+        if not jp:
+            return None
+        return (
+            jp,
+            _text(entry.get("zh")),
+            _text(entry.get("kanji")),
+            _text(entry.get("romaji")),
+            _int(entry.get("tone"), -1),
+            score,
+            _text(entry.get("sentence")),
+            _text(entry.get("sentence_zh")),
+        )
+    en = _text(entry.get("en"))
+    if not en:
+        return None
+    return (
+        en,
+        _text(entry.get("zh")),
+        _text(entry.get("pos")),
+        _text(entry.get("phonetic")),
+        score,
+        _text(entry.get("sentence")),
+        _text(entry.get("sentence_zh")),
+    )
+
+
+def iter_vocab_files(word_root: Path) -> Iterator[Tuple[Path, str, str]]:
+    """
+    按设备上传规则把词库目录映射为 (文件, source, chapter)。
+
+    - word_root/<source>.json: chapter 为空
+    - word_root/<source>/<chapter>.json: 文件名作为 chapter
+    更深层的文件设备无法表示,打印提示后跳过。文件按路径排序。
+    """
+    word_root = Path(word_root)
+    for json_file in sorted(word_root.rglob("*.json")):
+        parts = json_file.relative_to(word_root).parts
+        if len(parts) == 1:
+            yield json_file, json_file.stem, ""
+        elif len(parts) == 2:
+            yield json_file, parts[0], json_file.stem
+        else:
+            print(f"跳过层级过深的文件: {json_file}")
+
+
+def _merge_row(old: tuple, new: tuple, lang: str) -> tuple:
+    """
+    在内存中复现固件 upsert 规则: 文本字段以新值为准,score 取最大值,
+    例句只在新值非空时覆盖。
+    """
+    score_idx = 5 if lang == "jp" else 4
+    row = list(new)
+    row[score_idx] = max(old[score_idx], new[score_idx])
+    for idx in (score_idx + 1, score_idx + 2):
+        if not new[idx]:
+            row[idx] = old[idx]
+    return tuple(row)
+
+
+def _create_schema(conn: sqlite3.Connection, lang: str, with_indexes: bool) -> None:
+    schema = LANG_SCHEMAS[lang]
+    for sql in schema["tables"]:
+        conn.execute(sql)
+    if with_indexes:
+        for sql in schema["indexes"]:
+            conn.execute(sql)
+
+
+def _load_definitions(conn: sqlite3.Connection, roots_path, affixes_path) -> Tuple[int, int]:
+    """
+    从 JSON 导入词根 / 词缀定义（仅英语）,已存在的按名称更新。
+    """
+    roots = []
+    if roots_path is not None:
+        for item in iter_json_list(roots_path):
+            if isinstance(item, dict) and _text(item.get("root")):
+                roots.append((item["root"], _text(item.get("meaning")), _text(item.get("origin"))))
+        conn.executemany(
+            "INSERT INTO en_roots (root, meaning, origin) VALUES (?, ?, ?) "
+            "ON CONFLICT(root) DO UPDATE SET meaning = excluded.meaning, origin = excluded.origin",
+            roots,
+        )
+    affixes = []
+    if affixes_path is not None:
+        for item in iter_json_list(affixes_path):
+            if isinstance(item, dict) and _text(item.get("affix")):
+                affixes.append((
+                    item["affix"],
+                    _text(item.get("type")),
+                    _text(item.get("meaning")),
+                    _text(item.get("origin")),
+                ))
+        conn.executemany(
+            "INSERT INTO en_affixes (affix, type, meaning, origin) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(affix) DO UPDATE SET type = excluded.type, "
+            "meaning = excluded.meaning, origin = excluded.origin",
+            affixes,
+        )
+    return len(roots), len(affixes)
+
+
+def _collect_rows(word_root: Path, lang: str, summary: dict):
+    """
+    读取词库目录,返回按首次出现顺序排列的词条、来源映射及词根 / 词缀引用。
+    """
+    key_len = len(LANG_SCHEMAS[lang]["key"])
+    rows = {}
+    sources = {}
+    links = {"roots": {}, "affixes": {}}
+
+    for json_file, source, chapter in iter_vocab_files(word_root):
+        summary["files"] += 1
+        try:
+            for entry in iter_json_list(json_file):
+                row = word_row_from_entry(entry, lang)
+                if row is None:
+                    summary["skipped_entries"] += 1
+                    continue
+                summary["entries"] += 1
+                key = row[:key_len] if lang == "en" else (row[0], row[4])
+                old = rows.get(key)
+                rows[key] = row if old is None else _merge_row(old, row, lang)
+                sources.setdefault((key, source, chapter), None)
+                if lang == "en":
+                    for field in links:
+                        names = _name_list(entry.get(field))
+                        if names:
+                            links[field].setdefault(key, {}).update(dict.fromkeys(names))
+        except Exception as e:
+            summary["errors"].append({"file": str(json_file), "error": str(e)})
+            print(f"读取 {json_file} 失败: {e}")
+
+    return rows, sources, links
+
+
+def _insert_links(conn: sqlite3.Connection, links: dict, key_to_id: dict, summary: dict) -> None:
+    for field, table, name_table, name_col, id_col in (
+        ("roots", "en_word_roots", "en_roots", "root", "root_id"),
+        ("affixes", "en_word_affixes", "en_affixes", "affix", "affix_id"),
+    ):
+        name_to_id = {name: id_ for id_, name in conn.execute(f"SELECT id, {name_col} FROM {name_table}")}
+        pairs = []
+        for key, names in links[field].items():
+            for name in names:
+                target = name_to_id.get(name)
+                if target is None:
+                    summary["unknown_" + field].add(name)
+                    continue
+                pairs.append((key_to_id[key], target))
+        conn.executemany(f"INSERT OR IGNORE INTO {table} (word_id, {id_col}) VALUES (?, ?)", pairs)
+
+
+def _word_key_map(conn: sqlite3.Connection, lang: str) -> dict:
+    key_cols = ", ".join(LANG_SCHEMAS[lang]["key"])
+    return {
+        tuple(row[1:]): row[0]
+        for row in conn.execute(f"SELECT id, {key_cols} FROM {LANG_SCHEMAS[lang]['words']}")
+    }
+
+
+def _carry_over(conn: sqlite3.Connection, old_db: Path, lang: str, key_to_id: dict, summary: dict) -> None:
+    """
+    全量重建时从旧数据库带过来 JSON 无法表达的数据: 听写错误记录、
+    词根 / 词缀定义及关联。旧 word_id 按词条键重新映射到新 id,
+    已不存在的词条对应的记录被丢弃。
+    """
+    schema = LANG_SCHEMAS[lang]
+    conn.execute("ATTACH DATABASE ? AS old", (str(old_db),))
+    try:
+        old_tables = {r[0] for r in conn.execute("SELECT name FROM old.sqlite_master WHERE type = 'table'")}
+        if schema["words"] not in old_tables:
+            return
+        key_cols = ", ".join(schema["key"])
+        old_to_new = {}
+        for row in conn.execute(f"SELECT id, {key_cols} FROM old.{schema['words']}"):
+            new_id = key_to_id.get(tuple(row[1:]))
+            if new_id is not None:
+                old_to_new[row[0]] = new_id
+
+        if schema["errors"] in old_tables:
+            errors = [
+                (old_to_new[word_id], wrong_text, created_at)
+                for word_id, wrong_text, created_at in conn.execute(
+                    f"SELECT word_id, wrong_text, created_at FROM old.{schema['errors']} ORDER BY id"
+                )
+                if word_id in old_to_new
+            ]
+            conn.executemany(
+                f"INSERT INTO {schema['errors']} (word_id, wrong_text, created_at) VALUES (?, ?, ?)",
+                errors,
+            )
+            summary["carried_errors"] = len(errors)
+
+        if lang != "en":
+            return
+        for table in ("en_roots", "en_affixes"):
+            if table in old_tables:
+                conn.execute(f"INSERT OR IGNORE INTO {table} SELECT * FROM old.{table}")
+        for table, id_col in (("en_word_roots", "root_id"), ("en_word_affixes", "affix_id")):
+            if table in old_tables:
+                pairs = [
+                    (old_to_new[word_id], target)
+                    for word_id, target in conn.execute(f"SELECT word_id, {id_col} FROM old.{table}")
+                    if word_id in old_to_new
+                ]
+                conn.executemany(f"INSERT OR IGNORE INTO {table} (word_id, {id_col}) VALUES (?, ?)", pairs)
+    finally:
+        conn.commit()
+        conn.execute("DETACH DATABASE old")
+
+
+def build_vocab_db(
+    word_root,
+    db_path,
+    lang: str = "en",
+    incremental: bool = False,
+    roots_path=None,
+    affixes_path=None,
+    carry_over: bool = True,
+) -> dict:
+    """
+    在 PC 端由词库 JSON 目录批量生成设备使用的 SQLite 数据库。
+
+    目录结构与设备上传规则一致: 根目录下的 <source>.json 对应整个来源,
+    <source>/<chapter>.json 对应章节。同一词条出现多次时按固件 upsert
+    规则合并（文本取后者,score 取最大值）。
+
+    全量模式（默认）: 先在内存中合并,再在临时文件中用 executemany
+    单事务写入,写完后才创建二级索引,最后原子替换 db_path；旧库中的
+    听写错误与词根 / 词缀数据在 carry_over=True 时按词条键迁移过来。
+
+    增量模式: 直接在已有数据库上执行与固件相同的 upsert,
+    不删除任何已有词条。
+
+    :param word_root: 词库 JSON 目录
+    :param db_path: 输出数据库路径（jp_words.db / en_words.db）
+    :param lang: "jp" 或 "en"
+    :param incremental: 是否以 upsert 方式写入已有数据库
+    :param roots_path: 词根定义 JSON（仅英语,元素含 root/meaning/origin）
+    :param affixes_path: 词缀定义 JSON（仅英语,元素含 affix/type/meaning/origin）
+    :param carry_over: 全量模式下是否迁移旧库中的错误记录与词根 / 词缀
+    :return: 统计结果 dict
+    """
+    if lang not in LANG_SCHEMAS:
+        raise ValueError(f"未知语言: {lang}, 可选 {list(LANG_SCHEMAS)}")
+    if lang != "en" and (roots_path is not None or affixes_path is not None):
+        raise ValueError("只有英语词库支持词根 / 词缀")
+
+    start = time.perf_counter()
+    schema = LANG_SCHEMAS[lang]
+    db_path = Path(db_path)
+    summary = {
+        "db_path": str(db_path),
+        "mode": "incremental" if incremental else "full",
+        "files": 0,
+        "entries": 0,
+        "skipped_entries": 0,
+        "words": 0,
+        "sources": 0,
+        "roots": 0,
+        "affixes": 0,
+        "carried_errors": 0,
+        "unknown_roots": set(),
+        "unknown_affixes": set(),
+        "errors": [],
+    }
+
+    rows, sources, links = _collect_rows(word_root, lang, summary)
+
+    if incremental:
+        conn = sqlite3.connect(str(db_path))
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            _create_schema(conn, lang, with_indexes=True)
+            with conn:
+                summary["roots"], summary["affixes"] = _load_definitions(conn, roots_path, affixes_path)
+                conn.executemany(schema["upsert"], rows.values())
+                key_to_id = _word_key_map(conn, lang)
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO {schema['source']} (word_id, source, chapter) VALUES (?, ?, ?)",
+                    ((key_to_id[key], source, chapter) for key, source, chapter in sources),
+                )
+                if lang == "en":
+                    _insert_links(conn, links, key_to_id, summary)
+        finally:
+            conn.close()
+    else:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = db_path.with_suffix(db_path.suffix + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+        conn = sqlite3.connect(str(tmp_path))
+        try:
+            # 临时文件构建完成后才替换目标,中途失败不影响原数据库
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            _create_schema(conn, lang, with_indexes=False)
+
+            columns = schema["columns"]
+            key_to_id = {key: i for i, key in enumerate(rows, start=1)}
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO {schema['words']} (id, {', '.join(columns)}) "
+                    f"VALUES (?, {', '.join('?' * len(columns))})",
+                    ((key_to_id[key],) + row for key, row in rows.items()),
+                )
+                conn.executemany(
+                    f"INSERT INTO {schema['source']} (word_id, source, chapter) VALUES (?, ?, ?)",
+                    ((key_to_id[key], source, chapter) for key, source, chapter in sources),
+                )
+            if carry_over and db_path.exists():
+                _carry_over(conn, db_path, lang, key_to_id, summary)
+            with conn:
+                summary["roots"], summary["affixes"] = _load_definitions(conn, roots_path, affixes_path)
+                if lang == "en":
+                    _insert_links(conn, links, key_to_id, summary)
+                for sql in schema["indexes"]:
+                    conn.execute(sql)
+            conn.close()
+            os.replace(tmp_path, db_path)
+        finally:
+            conn.close()
+            tmp_path.unlink(missing_ok=True)
+
+    summary["words"] = len(rows)
+    summary["sources"] = len(sources)
+    summary["unknown_roots"] = sorted(summary["unknown_roots"])
+    summary["unknown_affixes"] = sorted(summary["unknown_affixes"])
+    summary["elapsed"] = time.perf_counter() - start
+    return summary
+
+
+def _word_link_names(conn: sqlite3.Connection, word_id: int) -> dict:
+    return {
+        "roots": [r[0] for r in conn.execute(
+            "SELECT r.root FROM en_word_roots wr JOIN en_roots r ON r.id = wr.root_id "
+            "WHERE wr.word_id = ? ORDER BY r.id", (word_id,)
+        )],
+        "affixes": [r[0] for r in conn.execute(
+            "SELECT a.affix FROM en_word_affixes wa JOIN en_affixes a ON a.id = wa.affix_id "
+            "WHERE wa.word_id = ? ORDER BY a.id", (word_id,)
+        )],
+    }
+
+
+def export_vocab_db(db_path, word_root, lang: str = "en") -> dict:
+    """
+    把设备数据库按 source / chapter 导出为 JSON 目录,是 build_vocab_db 的逆操作。
+
+    导出的目录可以直接作为 build_vocab_db 的输入,也可以交给
+    utils/json_utils.py 的合并、去重、拆分工具处理。
+
+    :return: {"files": 文件数, "entries": 词条数}
+    """
+    from .json_utils import write_json_atomic
+
+    schema = LANG_SCHEMAS[lang]
+    word_root = Path(word_root)
+    columns = schema["columns"]
+    summary = {"files": 0, "entries": 0}
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        chapters = conn.execute(
+            f"SELECT DISTINCT source, chapter FROM {schema['source']} ORDER BY source, chapter"
+        ).fetchall()
+        for source, chapter in chapters:
+            cur = conn.execute(
+                f"SELECT DISTINCT {', '.join('w.' + c for c in columns)}, w.id "
+                f"FROM {schema['words']} w INNER JOIN {schema['source']} s ON s.word_id = w.id "
+                f"WHERE s.source = ? AND s.chapter = ? ORDER BY w.id",
+                (source, chapter),
+            )
+            entries = []
+            for row in cur:
+                entry = dict(zip(columns, row[:-1]))
+                if lang == "en":
+                    for field, names in _word_link_names(conn, row[-1]).items():
+                        if names:
+                            entry[field] = names
+                entries.append(entry)
+            out = word_root / f"{source}.json" if not chapter else word_root / source / f"{chapter}.json"
+            out.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(out, entries, indent=4)
+            summary["files"] += 1
+            summary["entries"] += len(entries)
+    finally:
+        conn.close()
+    return summary
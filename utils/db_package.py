@@ -0,0 +1,352 @@
+import os
+import sys
+import sqlite3
+from typing import List, Tuple
+from pathlib import Path
+
+from .db_builder import LANG_SCHEMAS
+
+
+SD_SECTOR_SIZE = 512
+PAGE_SIZE_CANDIDATES = (512, 1024, 2048, 4096)
+
+_WORD_COLUMNS = {
+    "jp": "w.id, w.jp, w.zh, w.kanji, w.romaji, w.tone, w.score, w.sentence, w.sentence_zh",
+    "en": "w.id, w.en, w.zh, w.pos, w.phonetic, w.score, w.sentence, w.sentence_zh",
+}
+
+
+def firmware_queries(lang: str) -> dict:
+    """
+    固件 (src/UtilsDb.cpp、src/UtilsWebServer.cpp) 实际执行的 SQL。
+
+    参数沿用固件的 ?1 / ?2 写法,执行时以 {"1": ..., "2": ...} 绑定；
+    固件拼接 IN 列表的语句以 {ids} 占位,使用前先 format。
+    """
+    words = f"{lang}_words"
+    source = f"{lang}_source"
+    columns = _WORD_COLUMNS[lang]
+    plain_columns = columns.replace("w.", "")
+    queries = {
+        "load_chapter": (
+            f"SELECT DISTINCT {columns} FROM {words} w "
+            f"INNER JOIN {source} s ON s.word_id = w.id "
+            "WHERE s.source = ?1 AND s.chapter = ?2 ORDER BY w.id"
+        ),
+        "load_source": (
+            f"SELECT DISTINCT {columns} FROM {words} w "
+            f"INNER JOIN {source} s ON s.word_id = w.id "
+            "WHERE s.source = ?1 ORDER BY w.id"
+        ),
+        "score_stats": f"SELECT score, COUNT(*) FROM {words} WHERE score BETWEEN 1 AND 5 GROUP BY score",
+        "score_page": f"SELECT {plain_columns} FROM {words} WHERE score = ?1 ORDER BY id LIMIT 50 OFFSET ?2",
+        "source_list": f"SELECT DISTINCT source FROM {source} ORDER BY source COLLATE NOCASE",
+        "chapter_list": (
+            f"SELECT DISTINCT chapter FROM {source} "
+            "WHERE source = ?1 AND chapter <> '' ORDER BY chapter COLLATE NOCASE"
+        ),
+        "has_chapter": f"SELECT 1 FROM {source} WHERE source = ?1 AND chapter <> '' LIMIT 1",
+        "web_sources": (
+            f"SELECT source, COUNT(*), COUNT(DISTINCT NULLIF(chapter, '')) FROM {source} "
+            "GROUP BY source ORDER BY source COLLATE NOCASE"
+        ),
+        "web_source_total": f"SELECT COUNT(*) FROM {source} WHERE source = ?1",
+        "web_chapters": (
+            f"SELECT chapter, COUNT(*) FROM {source} WHERE source = ?1 AND chapter <> '' "
+            "GROUP BY chapter ORDER BY chapter COLLATE NOCASE"
+        ),
+        "errors": (
+            f"SELECT e.id, e.word_id, e.wrong_text, e.created_at, w.{lang} FROM {lang}_errors e "
+            f"LEFT JOIN {words} w ON w.id = e.word_id ORDER BY e.rowid DESC"
+        ),
+        "load_by_ids": f"SELECT {plain_columns} FROM {words} WHERE id IN ({{ids}}) ORDER BY id",
+        "update_score": f"UPDATE {words} SET score = ?1 WHERE id = ?2",
+        "insert_error": f"INSERT INTO {lang}_errors (word_id, wrong_text, created_at) VALUES (?1, ?2, ?3)",
+    }
+    if lang == "en":
+        queries.update({
+            "word_roots_in": "SELECT word_id, root_id FROM en_word_roots WHERE word_id IN ({ids})",
+            "word_affixes_in": "SELECT word_id, affix_id FROM en_word_affixes WHERE word_id IN ({ids})",
+            "root_meanings": "SELECT root, meaning FROM en_roots WHERE id IN ({ids})",
+            "affix_meanings": "SELECT affix, meaning FROM en_affixes WHERE id IN ({ids})",
+        })
+    return queries
+
+
+def covering_index_sql(lang: str) -> List[str]:
+    """
+    根据固件查询选出的覆盖索引。
+
+    - (source, chapter, word_id): 章节加载只需扫描索引即可拿到 word_id,
+      来源 / 章节列表与网页统计也只读索引,不再回表
+    - (score): 分数统计与按分数分页只扫描索引
+    """
+    return [
+        f"CREATE INDEX IF NOT EXISTS idx_{lang}_source_source_chapter_word "
+        f"ON {lang}_source(source, chapter, word_id)",
+        f"CREATE INDEX IF NOT EXISTS idx_{lang}_words_score ON {lang}_words(score)",
+    ]
+
+
+def redundant_index_names(lang: str) -> List[str]:
+    """
+    被覆盖索引取代的旧索引（其列是新索引的前缀）,打包时删除以减少写放大和文件大小。
+    """
+    return [f"idx_{lang}_source_source_chapter"]
+
+
+def detect_lang(conn: sqlite3.Connection) -> str:
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for lang, schema in LANG_SCHEMAS.items():
+        if schema["words"] in tables:
+            return lang
+    raise ValueError("数据库中没有 jp_words / en_words 表")
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, params: dict | None = None) -> List[str]:
+    """
+    返回 EXPLAIN QUERY PLAN 的各行描述。
+    """
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params or {})]
+
+
+def _process_read_bytes() -> int | None:
+    """
+    当前进程累计通过 read 系统调用读取的字节数,无法获取时返回 None。
+
+    SQLite 每次读取一个页,用前后差值除以页大小即可得到实际读页数。
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/io", "r") as f:
+                for line in f:
+                    if line.startswith("rchar:"):
+                        return int(line.split()[1])
+        except OSError:
+            return None
+    elif sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class IO_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("ReadOperationCount", ctypes.c_ulonglong),
+                ("WriteOperationCount", ctypes.c_ulonglong),
+                ("OtherOperationCount", ctypes.c_ulonglong),
+                ("ReadTransferCount", ctypes.c_ulonglong),
+                ("WriteTransferCount", ctypes.c_ulonglong),
+                ("OtherTransferCount", ctypes.c_ulonglong),
+            ]
+
+        counters = IO_COUNTERS()
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        if kernel32.GetProcessIoCounters(kernel32.GetCurrentProcess(), ctypes.byref(counters)):
+            return counters.ReadTransferCount
+    return None
+
+
+def _open_readonly(db_path) -> sqlite3.Connection:
+    return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def _load_chapter(conn: sqlite3.Connection, lang: str, source: str, chapter: str) -> int:
+    """
+    复现固件 loadWordsBySource: 加载章节词条,英语再补查词根 / 词缀关联。
+    """
+    queries = firmware_queries(lang)
+    if chapter:
+        rows = conn.execute(queries["load_chapter"], {"1": source, "2": chapter}).fetchall()
+    else:
+        rows = conn.execute(queries["load_source"], {"1": source}).fetchall()
+    if lang == "en" and rows:
+        id_list = ",".join(str(row[0]) for row in rows)
+        conn.execute(queries["word_roots_in"].format(ids=id_list)).fetchall()
+        conn.execute(queries["word_affixes_in"].format(ids=id_list)).fetchall()
+    return len(rows)
+
+
+def measure_chapter_loads(db_path, lang: str | None = None) -> dict:
+    """
+    逐个章节模拟设备的一次加载（打开数据库 + 章节查询）,统计实际读取的页数。
+
+    每次加载都使用新连接,与固件每次操作都重新打开数据库一致,
+    因此打开时读取 schema / sqlite_stat1 的开销也计算在内。
+
+    :return: 页大小、章节数、平均 / 最大读页数、平均读扇区数等
+    """
+    conn = _open_readonly(db_path)
+    try:
+        lang = lang or detect_lang(conn)
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        chapters = conn.execute(
+            f"SELECT DISTINCT source, chapter FROM {lang}_source ORDER BY source, chapter"
+        ).fetchall()
+        # 整个来源（chapter 为空）的加载也是设备上的常见操作
+        chapters += sorted({(source, "") for source, chapter in chapters if chapter})
+    finally:
+        conn.close()
+
+    result = {
+        "db_path": str(db_path),
+        "page_size": page_size,
+        "file_bytes": os.path.getsize(db_path),
+        "chapters": len(chapters),
+        "avg_pages": None,
+        "max_pages": None,
+        "avg_sectors": None,
+        "total_pages": None,
+    }
+    if _process_read_bytes() is None or not chapters:
+        return result
+
+    pages = []
+    for source, chapter in chapters:
+        before = _process_read_bytes()
+        conn = _open_readonly(db_path)
+        try:
+            _load_chapter(conn, lang, source, chapter)
+        finally:
+            conn.close()
+        pages.append(-(-(_process_read_bytes() - before) // page_size))
+
+    result["total_pages"] = sum(pages)
+    result["avg_pages"] = sum(pages) / len(pages)
+    result["max_pages"] = max(pages)
+    result["avg_sectors"] = result["avg_pages"] * page_size / SD_SECTOR_SIZE
+    return result
+
+
+def _read_cost(measure: dict, command_cost_sectors: float) -> float:
+    """
+    SD 卡读取代价的粗略模型: 每个读页命令的固定开销折算为若干扇区,
+    再加上实际传输的扇区数。
+    """
+    if measure["avg_pages"] is None:
+        return float(measure["file_bytes"])
+    return measure["avg_pages"] * command_cost_sectors + measure["avg_sectors"]
+
+
+def _vacuum_into(src_path, dst_path, page_size: int | None = None) -> None:
+    Path(dst_path).unlink(missing_ok=True)
+    conn = sqlite3.connect(str(src_path))
+    try:
+        if page_size is not None:
+            # 对已有数据库只是登记新的页大小,由 VACUUM INTO 在输出文件中生效
+            conn.execute(f"PRAGMA page_size = {int(page_size)}")
+        conn.execute("VACUUM INTO ?", (str(dst_path),))
+    finally:
+        conn.close()
+
+
+def _check_plans(conn: sqlite3.Connection, lang: str) -> Tuple[dict, bool]:
+    queries = firmware_queries(lang)
+    params = {"1": "", "2": ""}
+    plans = {}
+    for name in ("load_chapter", "load_source", "score_stats", "score_page", "chapter_list", "web_sources"):
+        sql = queries[name]
+        plans[name] = explain_query_plan(conn, sql, {k: v for k, v in params.items() if f"?{k}" in sql})
+    covered = all(
+        any("COVERING INDEX" in step for step in plans[name])
+        for name in ("load_chapter", "load_source", "score_stats")
+    )
+    return plans, covered
+
+
+def package_db_for_device(
+    db_path,
+    output_path,
+    lang: str | None = None,
+    page_size: int | None = None,
+    covering_indexes: bool = True,
+    analyze: bool = True,
+    command_cost_sectors: float = 4.0,
+) -> dict:
+    """
+    生成适合放到 SD 卡上的数据库副本。
+
+    流程: VACUUM INTO 指定页大小的新文件 → 建覆盖索引并删除被取代的旧索引
+    → ANALYZE → 再次 VACUUM INTO 去除碎片。page_size 为 None 时依次尝试
+    PAGE_SIZE_CANDIDATES,按实测章节加载读页数和简单的 SD 代价模型选出最优。
+    原数据库不会被修改。
+
+    :param db_path: 源数据库
+    :param output_path: 输出数据库
+    :param lang: "jp" / "en",None 时根据表名自动判断
+    :param page_size: 固定页大小,None 表示自动选择
+    :param covering_indexes: 是否添加覆盖索引
+    :param analyze: 是否执行 ANALYZE 生成统计信息
+    :param command_cost_sectors: 每次读页命令的固定开销折合的扇区数（代价模型参数）
+    :return: 统计结果 dict,包含打包前后的读页估计与查询计划
+    """
+    db_path = Path(db_path)
+    output_path = Path(output_path)
+    if db_path.resolve() == output_path.resolve():
+        raise ValueError("输出路径不能与源数据库相同")
+
+    conn = _open_readonly(db_path)
+    try:
+        lang = lang or detect_lang(conn)
+        plans_before, _ = _check_plans(conn, lang)
+    finally:
+        conn.close()
+
+    summary = {
+        "lang": lang,
+        "before": measure_chapter_loads(db_path, lang),
+        "after": None,
+        "candidates": [],
+        "page_size": None,
+        "plans_before": plans_before,
+        "plans_after": None,
+        "covering_ok": None,
+    }
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    sizes = [page_size] if page_size is not None else list(PAGE_SIZE_CANDIDATES)
+    best = None
+    staged = []
+    try:
+        for size in sizes:
+            work = output_path.with_name(f"{output_path.name}.{size}.work")
+            final = output_path.with_name(f"{output_path.name}.{size}.tmp")
+            staged += [work, final]
+
+            _vacuum_into(db_path, work, size)
+            conn = sqlite3.connect(str(work))
+            try:
+                if covering_indexes:
+                    for sql in covering_index_sql(lang):
+                        conn.execute(sql)
+                    for name in redundant_index_names(lang):
+                        conn.execute(f"DROP INDEX IF EXISTS {name}")
+                if analyze:
+                    conn.execute("ANALYZE")
+                    # 来源大小极不均匀（几个词到几千词）,单一平均值会让规划器对
+                    # 小来源也选择全表扫描；去掉来源表统计,保留索引等值查找
+                    conn.execute("DELETE FROM sqlite_stat1 WHERE tbl = ?", (f"{lang}_source",))
+                conn.commit()
+            finally:
+                conn.close()
+            _vacuum_into(work, final)
+            work.unlink()
+
+            measure = measure_chapter_loads(final, lang)
+            measure["cost"] = _read_cost(measure, command_cost_sectors)
+            summary["candidates"].append(measure)
+            if best is None or measure["cost"] < best[1]["cost"]:
+                best = (final, measure)
+
+        os.replace(best[0], output_path)
+    finally:
+        for path in staged:
+            path.unlink(missing_ok=True)
+
+    summary["page_size"] = best[1]["page_size"]
+    summary["after"] = measure_chapter_loads(output_path, lang)
+    conn = _open_readonly(output_path)
+    try:
+        summary["plans_after"], summary["covering_ok"] = _check_plans(conn, lang)
+    finally:
+        conn.close()
+    return summary
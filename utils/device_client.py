@@ -0,0 +1,363 @@
+import os
+import json
+import time
+import random
+import binascii
+import threading
+from typing import Iterable, Iterator, List, Tuple
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .json_utils import iter_json_list
+from .db_builder import iter_vocab_files
+
+
+# importJsonFileToDb 实际读取的字段,其余字段（例句、词根等）设备导入时会丢弃,
+# 上传前去掉可以减少传输量和设备端 JsonDocument 的内存占用
+DEVICE_IMPORT_FIELDS = {
+    "jp": ("jp", "zh", "kanji", "romaji", "tone", "score"),
+    "en": ("en", "zh", "pos", "phonetic", "score"),
+}
+
+# 设备导入一个文件时 JsonDocument 与 std::vector<Word> 同时驻留内存:
+# 文档中的字符串约等于文件大小,每个词条另有 ArduinoJson 槽位（每个字段键值各一个）
+# 和一个 Word 结构体（十余个 String 对象及各自的堆分配）。以下为保守估计值。
+_DOC_SLOT_BYTES = 8
+_WORD_STRUCT_BYTES = 256
+_IMPORT_BASE_BYTES = 4096
+
+# /api/device 不可用时假设的空闲堆大小
+DEFAULT_FREE_HEAP = 100_000
+
+
+class DeviceError(Exception):
+    """
+    设备返回错误（{"ok": false, "error": ...}）或多次重试后仍无法连接。
+    """
+
+    def __init__(self, message: str, status: int | None = None, retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+def estimate_import_memory(payload_bytes: int, entries: int, fields: int = 6) -> int:
+    """
+    估算设备导入一个 JSON 文件时的峰值堆内存（字节）。
+
+    :param payload_bytes: 上传文件大小
+    :param entries: 词条数
+    :param fields: 每个词条的字段数
+    """
+    per_entry = _DOC_SLOT_BYTES * (2 * fields + 1) + _WORD_STRUCT_BYTES
+    return 2 * payload_bytes + entries * per_entry + _IMPORT_BASE_BYTES
+
+
+def device_entry(entry, lang: str) -> dict | None:
+    """
+    只保留设备导入会读取的字段,缺少 jp/en 的词条（设备会跳过）返回 None。
+    """
+    if not isinstance(entry, dict) or not entry.get(lang):
+        return None
+    return {field: entry[field] for field in DEVICE_IMPORT_FIELDS[lang] if field in entry}
+
+
+def split_payloads(entries: Iterable[dict], lang: str, memory_budget: int) -> Iterator[Tuple[bytes, int]]:
+    """
+    把词条按设备内存预算切分为若干紧凑 JSON 数组,顺序不变。
+
+    单个词条本身超出预算时独占一份（设备可能仍无法导入,由服务端返回错误）。
+
+    :param entries: 词条
+    :param lang: "jp" / "en"
+    :param memory_budget: 单次导入允许占用的设备内存（字节）
+    :return: 逐个产生 (JSON 字节, 词条数)
+    """
+    fields = len(DEVICE_IMPORT_FIELDS[lang])
+    chunk: List[bytes] = []
+    size = 2  # "[" 与 "]"
+    for entry in entries:
+        item = device_entry(entry, lang)
+        if item is None:
+            continue
+        encoded = json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        added = len(encoded) + (1 if chunk else 0)
+        if chunk and estimate_import_memory(size + added, len(chunk) + 1, fields) > memory_budget:
+            yield b"[" + b",".join(chunk) + b"]", len(chunk)
+            chunk, size = [], 2
+            added = len(encoded)
+        chunk.append(encoded)
+        size += added
+    if chunk:
+        yield b"[" + b",".join(chunk) + b"]", len(chunk)
+
+
+def _multipart_body(filename: str, payload: bytes) -> Tuple[bytes, str]:
+    """
+    构造 multipart/form-data 请求体。
+
+    文件名按浏览器的方式原样写入 UTF-8（设备端 WebServer 只解析 filename="..."）,
+    不使用 RFC 2231 的 filename*= 编码,否则中文章节名无法识别。
+    """
+    boundary = "----WordCardputer" + binascii.hexlify(os.urandom(12)).decode()
+    name = filename.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{name}"\r\n'
+        "Content-Type: application/json\r\n\r\n"
+    ).encode("utf-8")
+    tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+    return head + payload + tail, f"multipart/form-data; boundary={boundary}"
+
+
+class DeviceClient:
+    """
+    设备 Web 控制面板 API 客户端（src/UtilsWebServer.cpp）。
+
+    所有请求共享一个 requests.Session 连接池；连接失败、超时和 5xx 按
+    指数退避（带抖动）重试,4xx 直接抛出 DeviceError。上传导入是幂等的
+    （词条 upsert、来源映射 INSERT OR IGNORE）,因此重试不会产生重复数据。
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        pool_maxsize: int = 4,
+    ):
+        if "://" not in base_url:
+            base_url = "http://" + base_url
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "DeviceClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(
+                    method, self.base_url + endpoint, timeout=self.timeout, **kwargs
+                )
+                if response.status_code < 400:
+                    return response
+                try:
+                    message = response.json().get("error") or response.reason
+                except ValueError:
+                    message = response.text or response.reason
+                error = DeviceError(
+                    f"{method} {endpoint}: {message} (status: {response.status_code})",
+                    status=response.status_code,
+                    retryable=response.status_code >= 500,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = DeviceError(f"{method} {endpoint}: {e}", retryable=True)
+
+            if not error.retryable or attempt >= self.max_retries:
+                raise error
+            time.sleep(self.backoff * (2 ** attempt) * (1 + random.random()))
+            attempt += 1
+
+    def list_files(self, path: str | None = None) -> dict:
+        """
+        GET /api/files: 列出根层的 source 或某个 source 下的 chapter。
+
+        :param path: 虚拟路径,None 表示当前语言的词库根目录
+        :return: {"path", "root", "language", "items": [...]}
+        """
+        params = {"path": path} if path else None
+        return self._request("GET", "/api/files", params=params).json()
+
+    def upload_json(self, path: str, filename: str, payload: bytes) -> dict:
+        """
+        POST /api/files/upload: 上传一个 JSON 数组并导入设备数据库。
+
+        在根目录上传时文件名（不含扩展名）作为 source,在 <root>/<source>
+        上传时作为 chapter。
+
+        :return: {"ok", "source", "chapter", "imported"}
+        """
+        body, content_type = _multipart_body(filename, payload)
+        return self._request(
+            "POST",
+            "/api/files/upload",
+            params={"path": path},
+            data=body,
+            headers={"Content-Type": content_type},
+        ).json()
+
+    def delete(self, path: str) -> dict:
+        """
+        DELETE /api/files: 删除 source 或 chapter,返回 {"ok", "deleted"}。
+        """
+        return self._request("DELETE", "/api/files", params={"path": path}).json()
+
+    def download(self, path: str, output_path: str | Path | None = None) -> list | Path:
+        """
+        GET /api/files/download: 导出 source / chapter 为 JSON。
+
+        :param output_path: 指定时流式写入该文件（临时文件 + 原子替换）并返回路径,
+                            否则返回解析后的列表
+        """
+        response = self._request("GET", "/api/files/download", params={"path": path}, stream=output_path is not None)
+        if output_path is None:
+            return response.json()
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+        try:
+            with response, tmp_path.open("wb") as f:
+                for block in response.iter_content(chunk_size=64 * 1024):
+                    f.write(block)
+            os.replace(tmp_path, output_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return output_path
+
+    def stats(self) -> dict:
+        """
+        GET /api/stats: 设备当前已加载词库的掌握程度统计。
+        """
+        return self._request("GET", "/api/stats").json()
+
+    def settings(self) -> dict:
+        """
+        GET /api/settings
+        """
+        return self._request("GET", "/api/settings").json()
+
+    def update_settings(self, **values) -> dict:
+        """
+        POST /api/settings: 支持 volume (0~255)、brightness (10~255)、autoSaveThreshold (>=1),
+        设备会裁剪到合法范围并返回修改后的值。
+        """
+        return self._request("POST", "/api/settings", data=json.dumps(values)).json()
+
+    def device(self) -> dict:
+        """
+        GET /api/device: {"ip", "freeHeap", "uptime"}
+        """
+        return self._request("GET", "/api/device").json()
+
+    def import_budget(self, heap_fraction: float = 0.5) -> int:
+        """
+        根据设备当前空闲堆估算单次导入可用的内存,其余留给 WebServer 与 SQLite。
+        """
+        try:
+            free_heap = int(self.device().get("freeHeap") or DEFAULT_FREE_HEAP)
+        except DeviceError as e:
+            print(f"读取设备内存失败,按 {DEFAULT_FREE_HEAP} 字节估算: {e}")
+            free_heap = DEFAULT_FREE_HEAP
+        return int(free_heap * heap_fraction)
+
+
+def upload_vocab_tree(
+    client: DeviceClient,
+    word_root: str | Path,
+    lang: str | None = None,
+    workers: int = 1,
+    memory_budget: int | None = None,
+    heap_fraction: float = 0.5,
+) -> dict:
+    """
+    把本地词库目录批量导入设备,目录结构与 build_vocab_db 相同:
+    <source>.json 导入为整个来源,<source>/<chapter>.json 导入为章节。
+
+    每个文件按设备内存预算切分为多次上传（同名文件会合并到同一 source / chapter,
+    顺序不变,设备上的词条顺序与文件一致）,只上传设备读取的字段。
+    文件边读边切分,不整体载入内存；workers > 1 时多个文件并行上传
+    （同一文件的各份始终按顺序上传,workers 不应超过 client 的 pool_maxsize）。
+    设备端 WebServer 逐个处理请求,并行主要用于隐藏网络往返与本地准备时间。
+
+    :param client: DeviceClient
+    :param word_root: 词库 JSON 目录
+    :param lang: "jp" / "en",默认取设备当前语言；与设备当前语言不一致时报错
+    :param workers: 并行上传的文件数
+    :param memory_budget: 单次导入允许占用的设备内存,None 时按 /api/device 的空闲堆 × heap_fraction
+    :param heap_fraction: 见 memory_budget
+    :return: 统计结果 dict
+    """
+    start = time.perf_counter()
+    root_info = client.list_files()
+    root = root_info["root"]
+    device_lang = root_info.get("language")
+    lang = lang or device_lang
+    if lang != device_lang:
+        raise ValueError(f"设备当前语言为 {device_lang},与要导入的 {lang} 不一致,请先在设备上切换语言")
+    if memory_budget is None:
+        memory_budget = client.import_budget(heap_fraction)
+
+    files = list(iter_vocab_files(Path(word_root)))
+    summary = {
+        "root": root,
+        "lang": lang,
+        "memory_budget": memory_budget,
+        "files": len(files),
+        "uploaded": 0,
+        "requests": 0,
+        "entries": 0,
+        "imported": 0,
+        "bytes": 0,
+        "errors": [],
+    }
+    lock = threading.Lock()
+
+    def upload_file(task: Tuple[Path, str, str]) -> None:
+        json_file, source, chapter = task
+        if chapter:
+            path, filename = f"{root}/{source}", f"{chapter}.json"
+        else:
+            path, filename = root, f"{source}.json"
+        label = f"{source}/{chapter}" if chapter else source
+        try:
+            imported = 0
+            for payload, count in split_payloads(iter_json_list(json_file), lang, memory_budget):
+                result = client.upload_json(path, filename, payload)
+                imported += result.get("imported", 0)
+                with lock:
+                    summary["requests"] += 1
+                    summary["entries"] += count
+                    summary["bytes"] += len(payload)
+            with lock:
+                summary["uploaded"] += 1
+                summary["imported"] += imported
+            print(f"✅ {label}: {imported} 个词")
+        except Exception as e:
+            with lock:
+                summary["errors"].append({"file": str(json_file), "error": str(e)})
+            print(f"❌ {label}: {e}")
+
+    if workers > 1 and len(files) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(upload_file, files))
+    else:
+        for task in files:
+            upload_file(task)
+
+    elapsed = time.perf_counter() - start
+    summary["elapsed"] = round(elapsed, 3)
+    summary["entries_per_sec"] = round(summary["entries"] / elapsed, 1) if elapsed > 0 else 0.0
+    print(
+        f"导入完成: {summary['uploaded']}/{summary['files']} 个文件, {summary['requests']} 次上传, "
+        f"{summary['imported']} 个词, {summary['bytes'] / 1e3:.0f} KB, 用时 {elapsed:.1f} s"
+    )
+    return summary
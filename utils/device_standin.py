@@ -0,0 +1,472 @@
+import re
+import json
+import time
+import socket
+import sqlite3
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from .db_builder import LANG_SCHEMAS, _create_schema, word_row_from_entry
+from .db_package import detect_lang
+from .device_client import DEVICE_IMPORT_FIELDS, estimate_import_memory
+from .stats import _mastery_level, median_from_histogram
+
+
+_FILENAME_RE = re.compile(rb'filename="([^"]*)"')
+
+
+def _parse_vocab_path(root: str, path: str) -> tuple | None:
+    """
+    复现固件 parseVocabPath: 返回 (is_root, source, chapter),非法路径返回 None。
+    """
+    target = path or root
+    if ".." in target or not (target == root or target.startswith(root + "/")):
+        return None
+    relative = target[len(root):].lstrip("/")
+    if not relative:
+        return True, "", ""
+    source, slash, chapter = relative.partition("/")
+    if not slash:
+        return False, source, ""
+    if "/" in chapter or not source:
+        return None
+    return False, source, "" if chapter == "全部" else chapter
+
+
+def _upload_target(root: str, path: str, filename: str) -> tuple | None:
+    """
+    复现固件 deriveUploadTarget: 根层上传时文件名为 source,source 层上传时为 chapter。
+    """
+    parsed = _parse_vocab_path(root, path)
+    if parsed is None:
+        return None
+    is_root, source, chapter = parsed
+    stem = filename.rsplit("/", 1)[-1]
+    dot = stem.rfind(".")
+    if dot > 0:
+        stem = stem[:dot]
+    if not stem:
+        return None
+    if is_root:
+        return stem, ""
+    if not chapter:
+        return source, stem
+    return None
+
+
+def _multipart_file(body: bytes, content_type: str) -> tuple | None:
+    """
+    取出 multipart 请求中的第一个文件: (文件名, 内容)。
+    与设备端 WebServer 一样只识别 filename="..."。
+    """
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if match is None:
+        return None
+    delimiter = b"--" + match.group(1).encode("latin-1")
+    for part in body.split(delimiter)[1:]:
+        if part.startswith(b"--"):
+            break
+        head, sep, content = part.partition(b"\r\n\r\n")
+        name = _FILENAME_RE.search(head)
+        if sep and name is not None:
+            if content.endswith(b"\r\n"):
+                content = content[:-2]
+            return name.group(1).decode("utf-8", errors="replace"), content
+    return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_StandInHTTPServer"
+
+    def setup(self) -> None:
+        # 每个连接只执行一次,模拟设备接受新连接的开销
+        if self.server.standin.handshake:
+            time.sleep(self.server.standin.handshake)
+        super().setup()
+        # 关闭 Nagle,避免 keep-alive 下头部与正文分包触发延迟 ACK
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args) -> None:
+        if self.server.standin.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, code: int, body: bytes = b"", content_type: str = "application/json", headers: dict | None = None):
+        self.send_response(code)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET,POST,DELETE,OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if code != 204:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _json(self, doc: dict, code: int = 200) -> None:
+        self._send(code, json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    def _error(self, code: int, message: str) -> None:
+        self._json({"ok": False, "error": message}, code)
+
+    def _dispatch(self, method: str) -> None:
+        standin = self.server.standin
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if standin.latency:
+            time.sleep(standin.latency)
+
+        if method == "OPTIONS":
+            self._send(204)
+            return
+        route = standin.routes.get((method, url.path))
+        if route is None:
+            self._error(404, "Not found")
+            return
+        with standin.lock:
+            route(self, query, body)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def do_OPTIONS(self):
+        self._dispatch("OPTIONS")
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    # 每个 keep-alive 连接一个线程,请求的实际处理由 DeviceStandIn.lock 串行化
+    daemon_threads = True
+    standin: "DeviceStandIn"
+
+
+class DeviceStandIn:
+    """
+    在 PC 上模拟设备 Web 控制面板 API 的本地服务器,不需要硬件即可测试上传与基准。
+
+    路由、请求参数、响应结构、虚拟路径规则和导入逻辑与 src/UtilsWebServer.cpp /
+    src/UtilsDb.cpp 一致,数据写入使用真实表结构的 SQLite 数据库。与设备相同,
+    一次只处理一个请求；导入时按 estimate_import_memory 检查 free_heap,
+    超出时与 ArduinoJson 内存不足一样返回 "JSON 解析失败"。
+
+    /api/stats 统计 loaded 指定的词库（设备上当前加载的 source / chapter）,
+    None 表示整个数据库。设置只保存在内存中。
+
+    用法:
+        with DeviceStandIn("tmp/en_words.db", lang="en") as standin:
+            client = DeviceClient(standin.url)
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        lang: str | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        free_heap: int = 150_000,
+        latency: float = 0.0,
+        handshake: float = 0.0,
+        loaded: tuple | None = None,
+        verbose: bool = False,
+    ):
+        """
+        :param db_path: 数据库路径,不存在时按 lang 新建
+        :param lang: "jp" / "en",默认根据数据库表名判断
+        :param port: 0 表示自动分配
+        :param free_heap: /api/device 报告的空闲堆,同时作为导入内存上限
+        :param latency: 每个请求在处理前额外等待的秒数,模拟 WiFi 往返（不占用串行处理）
+        :param handshake: 每个新连接额外等待的秒数,模拟建立 TCP 连接的开销
+        :param loaded: (source, chapter),/api/stats 统计的词库
+        """
+        self.db_path = Path(db_path)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if lang is None:
+                lang = detect_lang(conn)
+            _create_schema(conn, lang, True)
+            conn.commit()
+        finally:
+            conn.close()
+        self.lang = lang
+        self.root = f"/words_study/{lang}/word"
+        self.free_heap = free_heap
+        self.latency = latency
+        self.handshake = handshake
+        self.loaded = loaded
+        self.verbose = verbose
+        self.settings = {"volume": 128, "brightness": 128, "autoSaveThreshold": 10}
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.counters = Counter()
+        self.routes = {
+            ("GET", "/api/files"): self._files,
+            ("POST", "/api/files/upload"): self._upload,
+            ("DELETE", "/api/files"): self._delete,
+            ("GET", "/api/files/download"): self._download,
+            ("GET", "/api/stats"): self._stats,
+            ("GET", "/api/settings"): self._settings_get,
+            ("POST", "/api/settings"): self._settings_post,
+            ("GET", "/api/device"): self._device,
+        }
+
+        self.httpd = _StandInHTTPServer((host, port), _Handler)
+        self.httpd.standin = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "DeviceStandIn":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> "DeviceStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    # ---- /api/files ----
+
+    def _files(self, handler: _Handler, query: dict, body: bytes) -> None:
+        path = query.get("path") or self.root
+        if ".." in path or not (path == self.root or path.startswith(self.root + "/")):
+            path = self.root
+        parsed = _parse_vocab_path(self.root, path)
+        if parsed is None:
+            handler._error(400, "Invalid path")
+            return
+        is_root, source, chapter = parsed
+        table = LANG_SCHEMAS[self.lang]["source"]
+        items = []
+        conn = self._connect()
+        try:
+            if is_root:
+                for name, count, chapters in conn.execute(
+                    f"SELECT source, COUNT(*), COUNT(DISTINCT NULLIF(chapter, '')) FROM {table} "
+                    "GROUP BY source ORDER BY source COLLATE NOCASE"
+                ):
+                    items.append({
+                        "name": name, "kind": "source", "isDir": chapters > 0,
+                        "wordCount": count, "chapterCount": chapters,
+                    })
+            elif not chapter:
+                total = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE source = ?", (source,)).fetchone()[0]
+                items.append({"name": "全部", "kind": "chapter", "isDir": False, "wordCount": total})
+                for name, count in conn.execute(
+                    f"SELECT chapter, COUNT(*) FROM {table} WHERE source = ? AND chapter <> '' "
+                    "GROUP BY chapter ORDER BY chapter COLLATE NOCASE",
+                    (source,),
+                ):
+                    items.append({"name": name, "kind": "chapter", "isDir": False, "wordCount": count})
+        finally:
+            conn.close()
+        handler._json({"path": path, "root": self.root, "language": self.lang, "items": items})
+
+    def _upload(self, handler: _Handler, query: dict, body: bytes) -> None:
+        found = _multipart_file(body, handler.headers.get("Content-Type", ""))
+        if found is None:
+            handler._error(400, "无效导入位置")
+            return
+        filename, content = found
+        target = _upload_target(self.root, query.get("path") or self.root, filename)
+        if target is None:
+            handler._error(400, "无效导入位置")
+            return
+        source, chapter = target
+        imported, error = self._import(content, source, chapter)
+        if error:
+            handler._error(400, error)
+            return
+        self.counters["uploads"] += 1
+        self.counters["upload_bytes"] += len(content)
+        handler._json({"ok": True, "source": source, "chapter": chapter, "imported": imported})
+
+    def _import(self, content: bytes, source: str, chapter: str) -> tuple:
+        """
+        复现 importJsonFileToDb + saveWordListToDB,返回 (导入词条数, 错误信息)。
+        """
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return 0, "JSON 解析失败"
+        if not isinstance(data, list):
+            return 0, "JSON 顶层必须是数组"
+        fields = len(DEVICE_IMPORT_FIELDS[self.lang])
+        if estimate_import_memory(len(content), len(data), fields) > self.free_heap:
+            self.counters["out_of_memory"] += 1
+            return 0, "JSON 解析失败"
+
+        rows = []
+        for entry in data:
+            row = word_row_from_entry(entry, self.lang)
+            if row is not None:
+                # 设备导入不读取例句,也不会覆盖已有例句
+                rows.append(row[:-2] + ("", ""))
+        if not rows:
+            return 0, "JSON 中没有可导入词条"
+
+        schema = LANG_SCHEMAS[self.lang]
+        key_cols = " AND ".join(f"{col} = ?" for col in schema["key"])
+        key_idx = (0, 4) if self.lang == "jp" else (0,)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(schema["upsert"], rows)
+                for row in rows:
+                    word_id = conn.execute(
+                        f"SELECT id FROM {schema['words']} WHERE {key_cols}", [row[i] for i in key_idx]
+                    ).fetchone()[0]
+                    conn.execute(
+                        f"INSERT OR IGNORE INTO {schema['source']} (word_id, source, chapter) VALUES (?, ?, ?)",
+                        (word_id, source, chapter),
+                    )
+        except sqlite3.Error:
+            return len(rows), "写入数据库失败"
+        finally:
+            conn.close()
+        return len(rows), None
+
+    def _delete(self, handler: _Handler, query: dict, body: bytes) -> None:
+        parsed = _parse_vocab_path(self.root, query.get("path", ""))
+        if parsed is None or parsed[0] or not parsed[1]:
+            handler._error(400, "Invalid path")
+            return
+        _, source, chapter = parsed
+        schema = LANG_SCHEMAS[self.lang]
+        conn = self._connect()
+        try:
+            with conn:
+                deleted = conn.execute(
+                    f"DELETE FROM {schema['source']} WHERE source = ? AND (? = '' OR chapter = ?)",
+                    (source, chapter, chapter),
+                ).rowcount
+                conn.execute(
+                    f"DELETE FROM {schema['words']} WHERE id IN (SELECT w.id FROM {schema['words']} w "
+                    f"LEFT JOIN {schema['source']} s ON s.word_id = w.id WHERE s.word_id IS NULL)"
+                )
+        except sqlite3.Error:
+            handler._error(500, "Delete failed")
+            return
+        finally:
+            conn.close()
+        handler._json({"ok": True, "deleted": deleted})
+
+    def _download(self, handler: _Handler, query: dict, body: bytes) -> None:
+        parsed = _parse_vocab_path(self.root, query.get("path", ""))
+        if parsed is None or parsed[0] or not parsed[1]:
+            handler._error(400, "Invalid path")
+            return
+        _, source, chapter = parsed
+        fields = DEVICE_IMPORT_FIELDS[self.lang]
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {', '.join('w.' + f for f in fields)} FROM {self.lang}_words w "
+                f"INNER JOIN {self.lang}_source s ON s.word_id = w.id "
+                "WHERE s.source = ?1 AND (?2 = '' OR s.chapter = ?2) ORDER BY w.id",
+                {"1": source, "2": chapter},
+            ).fetchall()
+        finally:
+            conn.close()
+        items = []
+        for row in rows:
+            item = dict(zip(fields, row))
+            item["score"] = min(5, max(1, item["score"]))
+            items.append(item)
+        name = source + (f"_{chapter}" if chapter else "") + ".json"
+        handler._send(
+            200,
+            json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            headers={"Content-Disposition": f'attachment; filename="{name}"'.encode("utf-8").decode("latin-1")},
+        )
+
+    # ---- /api/stats, /api/settings, /api/device ----
+
+    def _stats(self, handler: _Handler, query: dict, body: bytes) -> None:
+        schema = LANG_SCHEMAS[self.lang]
+        if self.loaded is None:
+            sql = f"SELECT MIN(MAX(score, 1), 5), COUNT(*) FROM {schema['words']} GROUP BY 1"
+            params: tuple = ()
+            label = ""
+        else:
+            source, chapter = self.loaded
+            sql = (
+                f"SELECT MIN(MAX(score, 1), 5), COUNT(*) FROM {schema['words']} WHERE id IN "
+                f"(SELECT word_id FROM {schema['source']} WHERE source = ? AND (? = '' OR chapter = ?)) GROUP BY 1"
+            )
+            params = (source, chapter, chapter)
+            label = f"{source}/{chapter}" if chapter else source
+        conn = self._connect()
+        try:
+            histogram = dict(conn.execute(sql, params).fetchall())
+        finally:
+            conn.close()
+        total = sum(histogram.values())
+        avg = sum(score * count for score, count in histogram.items()) / total if total else 0.0
+        handler._json({
+            "vocabLabel": label,
+            "total": total,
+            "avg": round(avg, 2),
+            "median": round(median_from_histogram(histogram, total), 2) if total else 0,
+            "level": _mastery_level(avg) if total else "词库为空",
+            "counts": {str(score): histogram.get(score, 0) for score in range(1, 6)},
+        })
+
+    def _settings_get(self, handler: _Handler, query: dict, body: bytes) -> None:
+        handler._json({
+            **self.settings,
+            "language": self.lang,
+            "vocabLabel": "/".join(filter(None, self.loaded or ())),
+            "wifi": True,
+        })
+
+    def _settings_post(self, handler: _Handler, query: dict, body: bytes) -> None:
+        try:
+            doc = json.loads(body or b"null")
+        except ValueError:
+            doc = None
+        if not isinstance(doc, dict):
+            handler._error(400, "Invalid JSON")
+            return
+        if doc.get("volume") is not None:
+            self.settings["volume"] = min(255, max(0, int(doc["volume"])))
+        if doc.get("brightness") is not None:
+            self.settings["brightness"] = min(255, max(10, int(doc["brightness"])))
+        if doc.get("autoSaveThreshold") is not None:
+            self.settings["autoSaveThreshold"] = max(1, int(doc["autoSaveThreshold"]))
+        handler._json({"ok": True, **self.settings})
+
+    def _device(self, handler: _Handler, query: dict, body: bytes) -> None:
+        handler._json({
+            "ip": self.httpd.server_address[0],
+            "freeHeap": self.free_heap,
+            "uptime": int(time.monotonic() - self.started_at),
+        })
@@ -1,7 +1,14 @@
+import os
+import re
 import json
 import math
-from typing import List
+import itertools
+from glob import escape as glob_escape
+from typing import Iterable, Iterator, List, Tuple
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from .metrics import collect_worker_result, get_metrics, metrics_run, worker_task
 
 
 def load_json_list(json_path: Path) -> List[dict]:
@@ -12,6 +19,163 @@ def load_json_list(json_path: Path) -> List[dict]:
     return data
 
 
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_NUMBER_CHARS = "0123456789.eE+-"
+
+
+def iter_json_list(
+    json_path: Path,
+    fields: Iterable[str] | None = None,
+    chunk_size: int = 1 << 16,
+) -> Iterator:
+    """
+    逐条读取顶层为列表的 JSON 文件,每次只解析并返回一个元素。
+
+    按块读取文本并用 JSONDecoder.raw_decode 解析当前元素,已消费的内容
+    随即丢弃,内存占用只与单个词条的大小有关,与文件大小无关。
+
+    :param json_path: JSON 文件路径
+    :param fields: 只保留的字段名（如 ("jp",)）,None 表示返回完整元素；
+                   非 dict 元素原样返回
+    :param chunk_size: 每次读取的字符数
+    :return: 逐个产出列表元素的生成器
+    """
+    fields = tuple(fields) if fields is not None else None
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def next_char() -> str:
+            # 跳过空白并返回下一个非空白字符,文件结束返回 ""
+            nonlocal pos
+            while True:
+                pos = _JSON_WHITESPACE.match(buf, pos).end()
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    return ""
+
+        if next_char() != "[":
+            raise ValueError("JSON 文件的顶层结构必须是列表。")
+        pos += 1
+
+        if next_char() == "]":
+            pos += 1
+        else:
+            while True:
+                if not next_char():
+                    raise ValueError(f"{json_path}: JSON 列表未正常结束")
+                while True:
+                    try:
+                        item, end = _JSON_DECODER.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        # 元素跨越了块边界,读入更多内容后重新解析
+                        if fill():
+                            continue
+                        raise
+                    # 数字可能在块边界处被截断（如 "1." 之后的部分还未读入）,
+                    # 其后只剩数字字符时先读入更多内容再确认
+                    if end == len(buf) or buf[end] in _JSON_NUMBER_CHARS:
+                        if not buf[end:].lstrip(_JSON_NUMBER_CHARS) and fill():
+                            continue
+                    break
+                pos = end
+
+                if fields is not None and isinstance(item, dict):
+                    item = {k: item[k] for k in fields if k in item}
+                yield item
+
+                sep = next_char()
+                pos += 1
+                if sep == "]":
+                    break
+                if not sep:
+                    raise ValueError(f"{json_path}: JSON 列表未正常结束")
+                if sep != ",":
+                    raise ValueError(f"{json_path}: 列表元素之间缺少逗号")
+
+        if next_char():
+            raise ValueError(f"{json_path}: 列表结束后存在多余内容")
+
+
+class _JsonListWriter:
+    """
+    逐条写出 JSON 列表到同目录临时文件,格式与 json.dump(indent=indent) 一致；
+    commit() 时原子替换目标文件,abort() 丢弃临时文件。
+    """
+
+    def __init__(self, json_path: Path, indent: int = 4):
+        self.json_path = Path(json_path)
+        self.tmp_path = self.json_path.with_suffix(self.json_path.suffix + ".tmp")
+        self.indent = indent
+        self.pad = " " * indent
+        self.count = 0
+        self._f = open(self.tmp_path, "w", encoding="utf-8")
+
+    def write(self, item) -> None:
+        text = json.dumps(item, ensure_ascii=False, indent=self.indent)
+        self._f.write(("[\n" if self.count == 0 else ",\n") + self.pad + text.replace("\n", "\n" + self.pad))
+        self.count += 1
+
+    def commit(self) -> None:
+        self._f.write("\n]" if self.count else "[]")
+        self._f.close()
+        os.replace(self.tmp_path, self.json_path)
+
+    def abort(self) -> None:
+        self._f.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+def write_json_list_stream(json_path: Path, items: Iterable, indent: int = 4) -> int:
+    """
+    逐条写出 JSON 列表,输出与 json.dump(list(items), indent=indent) 完全一致。
+
+    写入同目录临时文件后原子替换,因此 items 可以是正在读取
+    json_path 本身的生成器（如 iter_json_list 的结果）。
+
+    :return: 写出的元素个数
+    """
+    writer = _JsonListWriter(json_path, indent=indent)
+    try:
+        for item in items:
+            writer.write(item)
+        writer.commit()
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.count
+
+
+def write_json_atomic(json_path: Path, data, indent: int = 4) -> None:
+    """
+    先写入同目录临时文件再替换,中途失败不会留下半个 JSON。
+    """
+    json_path = Path(json_path)
+    tmp_path = json_path.with_suffix(json_path.suffix + ".tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp_path, json_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
 def extract_field_values(json_path: Path, field: str) -> List[str]:
     """
     从指定 JSON 文件中提取指定字段,返回字符串列表。
@@ -20,9 +184,11 @@ def extract_field_values(json_path: Path, field: str) -> List[str]:
     :param field (str): 目标字段名
     :return List[str]: 字段值列表
     """
-    data = load_json_list(json_path)
-    values = [item[field] for item in data if isinstance(item, dict) and field in item]
-    return values
+    return [
+        item[field]
+        for item in iter_json_list(json_path, fields=(field,))
+        if isinstance(item, dict) and field in item
+    ]
 
 
 def extract_jp_fields(json_path: Path) -> List[str]:
@@ -47,17 +213,18 @@ def extract_all_values_from_folder(folder_path: Path, field: str) -> List[str]:
     if not folder_path.is_dir():
         raise NotADirectoryError(f"{folder_path} 不是有效的文件夹路径。")
 
-    all_values = []
+    all_values = set()
 
     for json_file in folder_path.rglob("*.json"):
         try:
-            values = extract_field_values(json_file, field)
-            all_values.extend(values)
+            for item in iter_json_list(json_file, fields=(field,)):
+                if isinstance(item, dict) and field in item:
+                    all_values.add(item[field])
         except Exception as e:
             print(f"读取文件 {json_file} 时出错: {e}")
 
     # 去重并排序（可选）
-    return sorted(set(all_values))
+    return sorted(all_values)
 
 
 def extract_all_jp_from_folder(folder_path: Path) -> List[str]:
@@ -86,26 +253,112 @@ def list_wav_filenames(folder_path: Path) -> List[str]:
     return [wav_file.stem for wav_file in folder_path.glob("*.wav")]
 
 
-def collect_merged_entries_by_key(
-    folder_path,
-    key_field: str = "jp",
-    score_field: str = "score",
-    tone_field: str | None = "tone",
-):
+class _JoinedField:
     """
-    扫描文件夹所有 JSON 文件,并构建合并后的大词典。
-    返回 all_entries（dict）,键为指定字段。
+    合并过程中的 "; " 拼接字段累加器。
+
+    以有序列表保存各来源的值、以集合保存已出现的片段,判断去重为 O(1),
+    全部合并完成后才拼接一次字符串,避免重复 split/拼接带来的平方复杂度。
     """
-    folder = Path(folder_path)
-    all_entries = {}
 
-    for json_file in folder.rglob("*.json"):
+    __slots__ = ("parts", "tokens", "dirty")
+
+    def __init__(self, old):
+        old_str = str(old) if old is not None else ""
+        self.parts = [old_str]
+        self.tokens = set(old_str.split("; "))
+        self.dirty = False
+
+    def add(self, val) -> None:
+        val_str = str(val) if val is not None else ""
+        if val_str in self.tokens:
+            return
+        # 只有含分隔符的值才可能与整串相等（整串未被拆成片段）
+        if "; " in val_str and val_str == "; ".join(self.parts):
+            return
+
+        if self.parts == [""]:
+            self.parts = [val_str]
+            self.tokens = set(val_str.split("; "))
+        else:
+            self.parts.append(val_str)
+            self.tokens.update(val_str.split("; "))
+        self.dirty = True
+
+    def value(self) -> str:
+        return "; ".join(self.parts)
+
+
+def _load_json_list_safe(json_path: Path) -> Tuple[List[dict] | None, str | None]:
+    """
+    进程池任务: 读取 JSON 列表,失败时返回错误信息而不是抛出。
+    """
+    metrics = get_metrics()
+    try:
+        with metrics.stage("parse"):
+            data = load_json_list(json_path)
+    except Exception as e:
+        return None, str(e)
+    metrics.count("bytes_read", os.path.getsize(json_path))
+    metrics.count("items", len(data))
+    return data, None
+
+
+def _load_json_documents(
+    json_files: List[Path],
+    workers: int = 1,
+) -> List[Tuple[Path, List[dict]]]:
+    """
+    按给定顺序读取多个 JSON 文件,workers > 1 时在进程池中并行解析。
+
+    返回顺序与输入一致,读取失败的文件打印错误并跳过。
+    """
+    if workers > 1 and len(json_files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(json_files) // (workers * 8))
+            results = executor.map(worker_task(_load_json_list_safe), json_files, chunksize=chunksize)
+            results = list(map(collect_worker_result, results))
+    else:
+        results = [_load_json_list_safe(f) for f in json_files]
+
+    documents = []
+    for json_file, (data, error) in zip(json_files, results):
+        if error is not None:
+            print(f"Error reading {json_file}: {error}")
+            continue
+        documents.append((json_file, data))
+    return documents
+
+
+def _stream_json_documents(json_files: List[Path]) -> Iterator[Tuple[Path, Iterator]]:
+    """
+    依次流式读取多个 JSON 文件,不把整个文件载入内存。
+
+    文件中途解析失败时打印错误并转到下一个文件,出错位置之前的词条保留。
+    """
+    def entries(json_file: Path) -> Iterator:
         try:
-            data = load_json_list(json_file)
+            yield from iter_json_list(json_file)
         except Exception as e:
             print(f"Error reading {json_file}: {e}")
-            continue
 
+    for json_file in json_files:
+        yield json_file, entries(json_file)
+
+
+def _merge_documents(
+    documents: Iterable[Tuple[Path, Iterable[dict]]],
+    key_field: str,
+    score_field: str,
+    tone_field: str | None,
+) -> dict:
+    """
+    单趟合并多个文档中的词条,规则见 collect_merged_entries_by_key。
+    """
+    all_entries = {}
+    joined = {}
+
+    for _, data in documents:
         for entry in data:
             key_value = entry.get(key_field)
             if not key_value:
@@ -143,20 +396,48 @@ def collect_merged_entries_by_key(
                             merged[field] = -1
 
                 else:
-                    old_str = str(old) if old is not None else ""
-                    val_str = str(val) if val is not None else ""
+                    acc = joined.get((key_value, field))
+                    if acc is None:
+                        acc = joined[(key_value, field)] = _JoinedField(old)
+                    acc.add(val)
 
-                    if old_str != val_str and val_str not in old_str.split("; "):
-                        if old_str:
-                            merged[field] = f"{old_str}; {val_str}"
-                        else:
-                            merged[field] = val_str
-
-            all_entries[key_value] = merged
+    for (key_value, field), acc in joined.items():
+        if acc.dirty:
+            all_entries[key_value][field] = acc.value()
 
     return all_entries
 
 
+def collect_merged_entries_by_key(
+    folder_path,
+    key_field: str = "jp",
+    score_field: str = "score",
+    tone_field: str | None = "tone",
+    workers: int = 1,
+):
+    """
+    扫描文件夹所有 JSON 文件,并构建合并后的大词典。
+    返回 all_entries（dict）,键为指定字段。
+
+    文件按路径排序后依次合并,结果与文件系统遍历顺序无关；
+    workers == 1 时逐条流式读取,workers > 1 时在进程池中并行解析文件,
+    合并顺序不变。
+    """
+    with metrics_run("collect_merged_entries_by_key") as metrics:
+        folder = Path(folder_path)
+        json_files = sorted(folder.rglob("*.json"))
+        if workers > 1:
+            documents = _load_json_documents(json_files, workers=workers)
+        else:
+            documents = _stream_json_documents(json_files)
+        # 串行模式下边读边合并,解析耗时计入 merge
+        with metrics.stage("merge"):
+            all_entries = _merge_documents(documents, key_field, score_field, tone_field)
+        metrics.count("files", len(json_files))
+        metrics.count("entries", len(all_entries))
+        return all_entries
+
+
 def collect_merged_entries(folder_path):
     """
     扫描文件夹所有 JSON 文件,并构建合并后的大词典。
@@ -178,45 +459,55 @@ def apply_merge_and_rewrite_by_key(
     key_field: str = "jp",
     score_field: str = "score",
     tone_field: str | None = "tone",
+    workers: int = 1,
 ):
     """
     调用 collect_merged_entries_by_key,然后把结果写回每个 JSON。
-    """
-    folder = Path(folder_path)
-    all_entries = collect_merged_entries_by_key(
-        folder_path,
-        key_field=key_field,
-        score_field=score_field,
-        tone_field=tone_field,
-    )
 
-    for json_file in folder.rglob("*.json"):
-        data = load_json_list(json_file)
+    合并时解析过的文档会被复用,不再重新读取；只有词条内容确实发生
+    变化的文件才会写回,且写回为临时文件 + 原子替换。
+    """
+    with metrics_run("apply_merge_and_rewrite_by_key") as metrics:
+        folder = Path(folder_path)
+        json_files = sorted(folder.rglob("*.json"))
+        documents = _load_json_documents(json_files, workers=workers)
+        with metrics.stage("merge"):
+            all_entries = _merge_documents(documents, key_field, score_field, tone_field)
+        metrics.count("files", len(json_files))
+        metrics.count("entries", len(all_entries))
+
+        rewritten = 0
+        for json_file, data in documents:
+            new_list = []
+            for entry in data:
+                key_value = entry.get(key_field)
+                if not key_value:
+                    new_list.append(entry)
+                    continue
 
-        new_list = []
-        for entry in data:
-            key_value = entry.get(key_field)
-            if not key_value:
-                new_list.append(entry)
-                continue
+                merged = all_entries.get(key_value, {})
+                new_entry = {}
 
-            merged = all_entries.get(key_value, {})
-            new_entry = {}
+                for key in entry.keys():
+                    if key in merged:
+                        new_entry[key] = merged[key]
 
-            for key in entry.keys():
-                if key in merged:
-                    new_entry[key] = merged[key]
+                for key, val in merged.items():
+                    if key not in new_entry:
+                        new_entry[key] = val
 
-            for key, val in merged.items():
-                if key not in new_entry:
-                    new_entry[key] = val
+                new_list.append(new_entry)
 
-            new_list.append(new_entry)
+            if new_list == data:
+                continue
 
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(new_list, f, ensure_ascii=False, indent=4)
+            with metrics.stage("write"):
+                write_json_atomic(json_file, new_list, indent=4)
+            rewritten += 1
 
-    return all_entries
+        metrics.count("files_rewritten", rewritten)
+        print(f"合并完成: {len(all_entries)} 个词条,写回 {rewritten}/{len(documents)} 个文件")
+        return all_entries
 
 
 def apply_merge_and_rewrite(folder_path):
@@ -236,22 +527,26 @@ def apply_merge_and_rewrite_en(folder_path):
 def filter_json_by_key_difference(path_a, path_b, key_field: str = "jp"):
     """
     path_a: 第一个 json 文件路径
-    path_b: 第二个 json 文件路径
+    path_b: 第二个 json 文件路径,也可以是多个路径的列表（N 路差集）
+
+    path_a 只流式读取一遍,边过滤边写回临时文件再原子替换。
     """
     path_a = Path(path_a)
-    path_b = Path(path_b)
-
-    key_a = set(extract_field_values(path_a, key_field))
-    key_b = set(extract_field_values(path_b, key_field))
+    paths_b = [path_b] if isinstance(path_b, (str, os.PathLike)) else list(path_b)
 
-    unique_keys = key_a - key_b
+    key_b = set()
+    for other in paths_b:
+        key_b.update(extract_field_values(Path(other), key_field))
 
-    data_a = load_json_list(path_a)
+    unique_keys = set()
 
-    filtered = [entry for entry in data_a if entry.get(key_field) in unique_keys]
+    def filtered() -> Iterator:
+        for entry in iter_json_list(path_a):
+            if isinstance(entry, dict) and key_field in entry and entry[key_field] not in key_b:
+                unique_keys.add(entry[key_field])
+                yield entry
 
-    with open(path_a, "w", encoding="utf-8") as f:
-        json.dump(filtered, f, ensure_ascii=False, indent=4)
+    write_json_list_stream(path_a, filtered(), indent=4)
 
     return unique_keys
 
@@ -275,33 +570,24 @@ def filter_json_by_en_difference(path_a, path_b):
 def dedupe_json_by_key(folder_path, key_field: str = "jp"):
     folder = Path(folder_path)
 
-    for json_file in folder.glob("*.json"):
-        try:
-            data = load_json_list(json_file)
-        except Exception as e:
-            print(f"无法读取 {json_file}: {e}")
-            continue
-
+    def deduped(json_file: Path) -> Iterator:
         seen = set()
-        deduped = []
-
-        for item in data:
+        for item in iter_json_list(json_file):
             key_value = item.get(key_field)
             if not key_value:
-                deduped.append(item)
+                yield item
                 continue
             if key_value not in seen:
                 seen.add(key_value)
-                deduped.append(item)
+                yield item
 
+    for json_file in folder.glob("*.json"):
+        # 边读边写临时文件,读取或写入失败时原文件保持不变
         try:
-            json_file.write_text(
-                json.dumps(deduped, ensure_ascii=False, indent=4),
-                encoding="utf-8"
-            )
+            write_json_list_stream(json_file, deduped(json_file), indent=4)
             print(f"已去重并写回：{json_file}")
         except Exception as e:
-            print(f"写入失败 {json_file}: {e}")
+            print(f"去重失败 {json_file}: {e}")
 
 
 def dedupe_json_by_jp(folder_path):
@@ -312,16 +598,87 @@ def dedupe_json_by_en(folder_path):
     return dedupe_json_by_key(folder_path, key_field="en")
 
 
-def split_json_file(file_path: Path, max_per_file=60):
-    """读取一个 JSON 文件,如果数量 > max_per_file,则进行均匀拆分。"""
+_PART_STEM = re.compile(r"^(?P<base>.+)_part(?P<index>\d+)$")
+
+# 按平衡键拆分时同时打开的分片文件上限,超出时分组多次读取源文件
+_MAX_OPEN_PARTS = 256
+
+
+def _remove_stale_parts(file_path: Path, parts: int, recorded: int) -> None:
+    """
+    删除上次拆分写入、这次不再需要的分片 _partN.json（parts < N <= recorded）。
+
+    只删除清单中记录过的分片,目录里手工创建的同名 _partN.json 不受影响。
+    """
+    for i in range(parts, recorded):
+        stale = file_path.parent / f"{file_path.stem}_part{i+1}.json"
+        if stale.exists():
+            stale.unlink()
+            print(f"  × 删除过期分片 {stale.name}")
+
+
+def _balance_sort_key(value) -> tuple:
+    """
+    平衡拆分的排序键: 缺少平衡键的词条排在最前,其次是数值（数字字符串按数值,
+    3 与 "3" 视为相同）,再次是其他字符串,其余类型按类型名和文本排序,
+    同一文件中混用类型时不会因无法比较而报错。
+    """
+    if value is None:
+        return (0,)
+    if isinstance(value, (int, float, str)):
+        number = value
+        if isinstance(value, str):
+            # 整数字符串按整数精确比较,超出 float 范围的大整数也不会溢出
+            try:
+                number = int(value)
+            except ValueError:
+                try:
+                    number = float(value)
+                except ValueError:
+                    number = math.nan
+        if isinstance(number, int) or math.isfinite(number):
+            return (1, number, "")
+        if isinstance(value, str):
+            return (2, 0.0, value)
+    return (3, 0.0, f"{type(value).__name__}:{value}")
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
 
-    total = len(data)
+def split_json_file(file_path: Path, max_per_file=60, balance_key: str | None = None) -> dict:
+    """
+    读取一个 JSON 文件,如果数量 > max_per_file,则进行均匀拆分。
+
+    词条流式写入各个分片,不会把整个列表载入内存。
+
+    :param file_path: JSON 文件路径
+    :param max_per_file: 每份最多词条数
+    :param balance_key: 平衡键（如 "score"）。指定时按该字段排序后轮流分配到各份,
+                        使每份包含均匀分布的高低值,份内保持原有顺序；None 表示按位置切分
+    :return: {"file", "total", "parts"}
+    """
+    file_path = Path(file_path)
+    summary = {"file": str(file_path), "total": 0, "parts": 0}
+    metrics = get_metrics()
+
+    with metrics.stage("parse"):
+        if balance_key is None:
+            total = sum(1 for _ in iter_json_list(file_path, fields=()))
+            order = None
+        else:
+            # 第一遍只取平衡键,记录每个词条的排序位置
+            values = [
+                item.get(balance_key) if isinstance(item, dict) else None
+                for item in iter_json_list(file_path, fields=(balance_key,))
+            ]
+            total = len(values)
+            order = sorted(range(total), key=lambda i: (_balance_sort_key(values[i]), i))
+            del values
+    metrics.count("bytes_read", file_path.stat().st_size)
+    metrics.count("items", total)
+
+    summary["total"] = total
     if total <= max_per_file:
         print(f"✔ {file_path.name}: {total} 个词,不需要拆分。")
-        return
+        return summary
 
     # 计算拆分份数,例如 220 -> 4 份
     parts = math.ceil(total / max_per_file)
@@ -333,36 +690,159 @@ def split_json_file(file_path: Path, max_per_file=60):
 
     parent = file_path.parent
     base_name = file_path.stem  # 去掉 .json 后缀
+    out_paths = [parent / f"{base_name}_part{i+1}.json" for i in range(parts)]
+    counts = [0] * parts
+
+    # 第二遍边读边写,读取与写入交错进行,一起计入 write
+    with metrics.stage("write"):
+        if order is None:
+            # 按位置切分: 顺序读取,写满一份再写下一份
+            items = iter_json_list(file_path)
+            for i, out_path in enumerate(out_paths):
+                counts[i] = write_json_list_stream(out_path, itertools.islice(items, per_file), indent=2)
+        else:
+            # 按排序名次轮流分配,第 r 名进入第 r % parts 份
+            assign = [0] * total
+            for rank, index in enumerate(order):
+                assign[index] = rank % parts
+            del order
+
+            for group_start in range(0, parts, _MAX_OPEN_PARTS):
+                group_end = min(group_start + _MAX_OPEN_PARTS, parts)
+                writers = {}
+                try:
+                    for index, item in enumerate(iter_json_list(file_path)):
+                        part = assign[index]
+                        if group_start <= part < group_end:
+                            if part not in writers:
+                                writers[part] = _JsonListWriter(out_paths[part], indent=2)
+                            writers[part].write(item)
+                    for part, writer in writers.items():
+                        writer.commit()
+                        counts[part] = writer.count
+                    writers.clear()
+                finally:
+                    for writer in writers.values():
+                        writer.abort()
+
+    for out_path, count in zip(out_paths, counts):
+        print(f"  → 写入 {out_path.name}: {count} 个词")
+
+    summary["parts"] = parts
+    print("完成。")
+    return summary
 
-    # 执行拆分
-    for i in range(parts):
-        start = i * per_file
-        end = start + per_file
-        chunk = data[start:end]
 
-        out_path = parent / f"{base_name}_part{i+1}.json"
-        with open(out_path, "w", encoding="utf-8") as out:
-            json.dump(chunk, out, ensure_ascii=False, indent=2)
+def _split_json_file_safe(args: tuple) -> dict:
+    """
+    进程池任务: 拆分单个文件,异常转为 error 字段返回。
+    """
+    file_path, max_per_file, balance_key = args
+    try:
+        with get_metrics().stage("item"):
+            return split_json_file(file_path, max_per_file, balance_key=balance_key)
+    except Exception as e:
+        return {"file": str(file_path), "total": 0, "parts": 0, "error": str(e)}
 
-        print(f"  → 写入 {out_path.name}: {len(chunk)} 个词")
 
-    print("完成。")
+# 不使用 .json 后缀,避免被按 *.json 遍历词库的函数当作词库读取
+_SPLIT_MANIFEST = ".split_manifest"
 
 
-def process_folder(folder_path: str, max_per_file=60):
-    """处理整个文件夹,拆分其中所有 json 文件。"""
-    folder = Path(folder_path)
+def process_folder(
+    folder_path: str,
+    max_per_file=60,
+    workers: int = 1,
+    balance_key: str | None = None,
+    force: bool = False,
+) -> dict | None:
+    """
+    处理整个文件夹,拆分其中所有 json 文件。
 
-    if not folder.exists():
-        print("路径不存在:", folder)
-        return
+    拆分结果记录在 <folder>/.split_manifest 中（源文件的 size、mtime_ns 与拆分参数）,
+    再次运行时源文件和参数都未变化、分片也都存在的文件直接跳过。
+    重新拆分成更少的份数时,删除清单记录的上次多出的分片；没有记录的 _partN.json 不会被删除。
+    已有的 _partN.json 分片本身不会再作为输入；workers > 1 时多进程并行拆分不同文件。
 
-    json_files = list(folder.glob("*.json"))
-    if not json_files:
-        print("没有找到 JSON 文件:", folder)
-        return
+    :param force: 忽略清单,全部重新拆分
+    :return: {"files", "split", "skipped", "errors"}
+    """
+    with metrics_run("process_folder") as metrics:
+        folder = Path(folder_path)
 
-    print(f"在 {folder} 中找到 {len(json_files)} 个 JSON 文件\n")
+        if not folder.exists():
+            print("路径不存在:", folder)
+            return
 
-    for file in json_files:
-        split_json_file(file, max_per_file=max_per_file)
+        json_files = []
+        for json_file in sorted(folder.glob("*.json")):
+            match = _PART_STEM.match(json_file.stem)
+            if match and (folder / f"{match['base']}.json").exists():
+                continue
+            json_files.append(json_file)
+        if not json_files:
+            print("没有找到 JSON 文件:", folder)
+            return
+
+        print(f"在 {folder} 中找到 {len(json_files)} 个 JSON 文件\n")
+
+        manifest_path = folder / _SPLIT_MANIFEST
+        params = {"max_per_file": max_per_file, "balance_key": balance_key}
+        manifest = {}
+        if manifest_path.exists():
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            except Exception as e:
+                print(f"读取清单 {manifest_path} 失败,将全部重新拆分: {e}")
+
+        summary = {"files": len(json_files), "split": 0, "skipped": 0, "errors": []}
+        tasks = []
+        for json_file in json_files:
+            st = json_file.stat()
+            entry = manifest.get(json_file.name)
+            if (
+                not force
+                and entry is not None
+                and entry.get("params") == params
+                and entry.get("size") == st.st_size
+                and entry.get("mtime_ns") == st.st_mtime_ns
+                and all((folder / f"{json_file.stem}_part{i+1}.json").exists() for i in range(entry.get("parts", 0)))
+            ):
+                summary["skipped"] += 1
+                print(f"✔ {json_file.name}: 未变化,跳过。")
+                continue
+            tasks.append((json_file, max_per_file, balance_key))
+        metrics.count("cache_hits", summary["skipped"])
+
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(worker_task(_split_json_file_safe), tasks)
+                results = list(map(collect_worker_result, results))
+        else:
+            results = [_split_json_file_safe(task) for task in tasks]
+
+        for (json_file, _, _), result in zip(tasks, results):
+            recorded = manifest.get(json_file.name, {}).get("parts", 0)
+            if "error" in result:
+                # 保留分片数,下次拆分成功后仍能清理上次的分片
+                manifest[json_file.name] = {"parts": recorded}
+                summary["errors"].append({"file": result["file"], "error": result["error"]})
+                print(f"拆分失败 {result['file']}: {result['error']}")
+                continue
+            _remove_stale_parts(json_file, result["parts"], recorded)
+            st = json_file.stat()
+            manifest[json_file.name] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "params": params,
+                "parts": result["parts"],
+            }
+            if result["parts"]:
+                summary["split"] += 1
+
+        # 清单只保留当前仍存在的源文件
+        manifest = {name: manifest[name] for name in sorted(manifest) if (folder / name).exists()}
+        tmp_path = manifest_path.with_suffix(manifest_path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, manifest_path)
+        return summary
@@ -0,0 +1,245 @@
+import sqlite3
+from typing import Iterable, List, Set, Tuple
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from .json_utils import iter_json_list, write_json_list_stream
+
+
+def _scan_keys(args: Tuple[str, str]) -> Tuple[str, List[Tuple[str, int]] | None, str | None]:
+    """
+    进程池任务: 流式读取一个 JSON 文件,返回 [(键, 元素位置)]。
+
+    只投影键字段,非字符串或空的键不建索引。
+    """
+    json_path, key_field = args
+    try:
+        keys = []
+        for position, item in enumerate(iter_json_list(json_path, fields=(key_field,))):
+            if isinstance(item, dict):
+                key_value = item.get(key_field)
+                if isinstance(key_value, str) and key_value:
+                    keys.append((key_value, position))
+        return json_path, keys, None
+    except Exception as e:
+        return json_path, None, str(e)
+
+
+class KeyIndex:
+    """
+    词库目录的全局键索引: 键 → (文件, 元素位置)。
+
+    索引保存在 SQLite 中（默认 <folder>/.key_index.db）,按文件的
+    (size, mtime_ns) 增量更新,未变化的章节不会重新解析。文件路径以
+    相对 folder 的 POSIX 形式保存,"来源"可以是某个文件或某个子目录前缀。
+
+    :param folder: 词库根目录
+    :param key_field: 键字段（"jp" / "en"）
+    :param index_path: 索引数据库路径
+    """
+
+    def __init__(self, folder: str | Path, key_field: str = "jp", index_path: str | Path | None = None):
+        self.folder = Path(folder)
+        self.key_field = key_field
+        self.index_path = Path(index_path) if index_path else self.folder / ".key_index.db"
+        self._conn = sqlite3.connect(str(self.index_path))
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                key_field TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS keys (
+                key TEXT NOT NULL,
+                path TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                PRIMARY KEY (path, position)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_keys_key ON keys(key);
+            """
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "KeyIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _rel(self, json_file: Path) -> str:
+        return json_file.relative_to(self.folder).as_posix()
+
+    def update(self, workers: int = 1) -> dict:
+        """
+        扫描目录并增量更新索引: 新增或 (size, mtime_ns) 变化的文件重新解析,
+        已删除的文件从索引移除。workers > 1 时在进程池中并行解析。
+
+        :return: {"files", "parsed", "removed", "keys", "errors"}
+        """
+        conn = self._conn
+        known = {
+            path: (key_field, size, mtime_ns)
+            for path, key_field, size, mtime_ns in conn.execute("SELECT path, key_field, size, mtime_ns FROM files")
+        }
+
+        current = {}
+        for json_file in sorted(self.folder.rglob("*.json")):
+            st = json_file.stat()
+            current[self._rel(json_file)] = (self.key_field, st.st_size, st.st_mtime_ns)
+
+        stale = [path for path, state in current.items() if known.get(path) != state]
+        removed = [path for path in known if path not in current]
+
+        tasks = [(str(self.folder / path), self.key_field) for path in stale]
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunksize = max(1, len(tasks) // (workers * 8))
+                results = list(executor.map(_scan_keys, tasks, chunksize=chunksize))
+        else:
+            results = [_scan_keys(task) for task in tasks]
+
+        summary = {"files": len(current), "parsed": len(stale), "removed": len(removed), "keys": 0, "errors": []}
+        with conn:
+            for path in removed:
+                conn.execute("DELETE FROM keys WHERE path = ?", (path,))
+                conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            for path, (json_path, keys, error) in zip(stale, results):
+                conn.execute("DELETE FROM keys WHERE path = ?", (path,))
+                if error is not None:
+                    # 解析失败的文件不记录状态,下次运行会重试
+                    conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                    summary["errors"].append({"file": json_path, "error": error})
+                    print(f"读取文件 {json_path} 时出错: {error}")
+                    continue
+                conn.executemany(
+                    "INSERT INTO keys (key, path, position) VALUES (?, ?, ?)",
+                    ((key, path, position) for key, position in keys),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, key_field, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                    (path, *current[path]),
+                )
+        summary["keys"] = conn.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
+        return summary
+
+    def lookup(self, key: str) -> List[Tuple[str, int]]:
+        """
+        返回键出现的全部位置 [(相对路径, 元素位置)],按路径和位置排序。
+        """
+        return self._conn.execute(
+            "SELECT path, position FROM keys WHERE key = ? ORDER BY path, position", (key,)
+        ).fetchall()
+
+    @staticmethod
+    def _scope_sql(source: str) -> Tuple[str, tuple]:
+        # source 可以是单个文件,也可以是子目录前缀
+        source = source.strip("/")
+        return "(path = ? OR substr(path, 1, ?) = ?)", (source, len(source) + 1, source + "/")
+
+    def keys(self, source: str = "") -> Set[str]:
+        """
+        某个来源（文件或子目录,"" 表示整个目录）中出现过的全部键。
+        """
+        if not source:
+            return {row[0] for row in self._conn.execute("SELECT DISTINCT key FROM keys")}
+        where, params = self._scope_sql(source)
+        return {row[0] for row in self._conn.execute(f"SELECT DISTINCT key FROM keys WHERE {where}", params)}
+
+    def difference(self, source: str, others: Iterable[str]) -> Set[str]:
+        """
+        N 路差集: 出现在 source 中、但不出现在 others 任何一个来源中的键。
+        """
+        result = self.keys(source)
+        for other in others:
+            if not result:
+                break
+            result -= self.keys(other)
+        return result
+
+    def duplicates(self, priority: Iterable[str] = ()) -> dict:
+        """
+        找出在整个目录中出现多次的键,按"先出现的来源优先"决定保留哪一处。
+
+        先按 priority 中来源（文件或子目录前缀）的顺序,再按相对路径、元素位置排序,
+        排在最前的一处保留,其余为待删除的重复。
+
+        :return: {相对路径: [待删除的元素位置]}
+        """
+        priority = [p.strip("/") for p in priority]
+
+        def rank(path: str) -> int:
+            for i, prefix in enumerate(priority):
+                if path == prefix or path.startswith(prefix + "/"):
+                    return i
+            return len(priority)
+
+        drops: dict = {}
+        rows = self._conn.execute(
+            "SELECT key, path, position FROM keys WHERE key IN "
+            "(SELECT key FROM keys GROUP BY key HAVING COUNT(*) > 1) ORDER BY key"
+        )
+        current_key = None
+        occurrences: list = []
+
+        def flush():
+            if len(occurrences) > 1:
+                occurrences.sort(key=lambda o: (rank(o[0]), o[0], o[1]))
+                for path, position in occurrences[1:]:
+                    drops.setdefault(path, []).append(position)
+
+        for key, path, position in rows:
+            if key != current_key:
+                flush()
+                current_key, occurrences = key, []
+            occurrences.append((path, position))
+        flush()
+        return {path: sorted(positions) for path, positions in sorted(drops.items())}
+
+
+def dedupe_corpus_by_key(
+    folder_path,
+    key_field: str = "jp",
+    priority: Iterable[str] = (),
+    workers: int = 1,
+    dry_run: bool = False,
+    index_path: str | Path | None = None,
+) -> dict:
+    """
+    整个目录范围内按键去重（递归所有子目录）,同一键只保留最先出现的一处。
+
+    "最先"按 priority 中的来源顺序,再按相对路径和文件内位置决定。
+    只有含重复的文件会被流式重写（临时文件 + 原子替换）,重写后索引随之更新。
+
+    :param folder_path: 词库根目录
+    :param key_field: 键字段
+    :param priority: 优先保留的来源（文件或子目录前缀）列表
+    :param workers: 建索引时的并行进程数
+    :param dry_run: 只统计不写回
+    :param index_path: 索引数据库路径,默认 <folder>/.key_index.db
+    :return: {"files": {相对路径: 删除条数}, "removed": 总删除条数}
+    """
+    folder = Path(folder_path)
+    with KeyIndex(folder, key_field, index_path) as index:
+        index.update(workers=workers)
+        drops = index.duplicates(priority)
+
+        summary = {"files": {path: len(positions) for path, positions in drops.items()}, "removed": 0}
+        summary["removed"] = sum(summary["files"].values())
+        if dry_run:
+            return summary
+
+        for path, positions in drops.items():
+            json_file = folder / path
+            drop = set(positions)
+            items = (item for i, item in enumerate(iter_json_list(json_file)) if i not in drop)
+            write_json_list_stream(json_file, items, indent=4)
+            print(f"已去重并写回：{json_file}（删除 {len(drop)} 条）")
+
+        # 重写过的文件元素位置已变化,重新索引
+        if drops:
+            index.update(workers=workers)
+    return summary
@@ -0,0 +1,339 @@
+import os
+import csv
+import json
+import time
+import bisect
+import threading
+import contextlib
+from typing import Callable, Dict, Iterator, List
+from pathlib import Path
+
+
+# 设置后批量工具会记录耗时并在结束时写出报告:
+#   WORDCARDPUTER_METRICS=report.json   写到该文件（.csv 后缀写 CSV）
+#   WORDCARDPUTER_METRICS=reports/      目录（以 / 结尾或已存在）: 每次运行写 <名称>-<时间>.json
+#   WORDCARDPUTER_PROFILE=run.pstats    同时用 cProfile 记录主线程,结束时 dump_stats
+METRICS_ENV = "WORDCARDPUTER_METRICS"
+PROFILE_ENV = "WORDCARDPUTER_PROFILE"
+
+# 单项耗时直方图的桶上界（毫秒）,按 1-2-5 递增,长时间运行内存占用固定
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class Histogram:
+    """
+    固定分桶的耗时直方图,分位数按所在桶的上界估计。
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: dict) -> None:
+        for i, n in enumerate(other["buckets"]):
+            self.buckets[i] += n
+        self.count += other["count"]
+        self.total += other["total"]
+        self.max = max(self.max, other["max"])
+
+    def snapshot(self) -> dict:
+        return {"buckets": list(self.buckets), "count": self.count, "total": self.total, "max": self.max}
+
+    def percentile(self, q: float) -> float:
+        """
+        :return: 第 q 分位（0~1）所在桶的上界（毫秒）,不超过观测到的最大值
+        """
+        if not self.count:
+            return 0.0
+        max_ms = self.max * 1000
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(float(HISTOGRAM_BOUNDS_MS[i]), max_ms) if i < len(HISTOGRAM_BOUNDS_MS) else max_ms
+        return max_ms
+
+    def summary(self) -> dict:
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p90_ms": round(self.percentile(0.9), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max * 1000, 3),
+            "buckets": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class Metrics:
+    """
+    一次批处理运行的计量数据,线程安全。
+
+    - stage(name): 计时上下文,累计该阶段总耗时并把每次耗时记入同名直方图；
+    - count(name, n): 计数器（字节数、条目数、缓存命中等）；
+    - observe(name, seconds): 只记直方图（如单个条目的端到端耗时）。
+
+    多个线程同时处于同一阶段时各自计时,阶段总耗时可能超过墙钟时间,
+    报告中的 share 是相对墙钟时间的比例,用于比较各阶段谁占主导。
+    """
+
+    enabled = True
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self.stages: Dict[str, List] = {}
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            self.histograms.setdefault(name, Histogram()).observe(seconds)
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.histograms.setdefault(name, Histogram()).observe(seconds)
+
+    def snapshot(self) -> dict:
+        """
+        可 pickle 的原始数据,用于把工作进程中的记录合并回主进程。
+        """
+        with self._lock:
+            return {
+                "stages": {name: list(entry) for name, entry in self.stages.items()},
+                "counters": dict(self.counters),
+                "histograms": {name: hist.snapshot() for name, hist in self.histograms.items()},
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        with self._lock:
+            for name, (count, seconds) in snapshot["stages"].items():
+                entry = self.stages.setdefault(name, [0, 0.0])
+                entry[0] += count
+                entry[1] += seconds
+            for name, n in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + n
+            for name, hist in snapshot["histograms"].items():
+                self.histograms.setdefault(name, Histogram()).merge(hist)
+
+    def report(self) -> dict:
+        wall = time.perf_counter() - self._start
+        with self._lock:
+            stages = {
+                name: {
+                    "count": count,
+                    "seconds": round(seconds, 3),
+                    "share": round(seconds / wall, 3) if wall > 0 else 0.0,
+                }
+                for name, (count, seconds) in sorted(self.stages.items(), key=lambda kv: -kv[1][1])
+            }
+            return {
+                "name": self.name,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "wall_seconds": round(wall, 3),
+                "stages": stages,
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: hist.summary() for name, hist in sorted(self.histograms.items())},
+            }
+
+    def write_report(self, path: str | Path) -> dict:
+        """
+        写出报告（临时文件 + 原子替换）,.csv 后缀写成每个阶段/计数器/直方图一行的表格,
+        其他后缀写 JSON。
+
+        :return: 报告 dict
+        """
+        path = Path(path)
+        report = self.report()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        if path.suffix == ".csv":
+            with tmp_path.open("w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["kind", "name", "count", "seconds", "share", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"])
+                writer.writerow(["run", report["name"], "", report["wall_seconds"], 1, "", "", "", "", ""])
+                for name, stage in report["stages"].items():
+                    writer.writerow(["stage", name, stage["count"], stage["seconds"], stage["share"], "", "", "", "", ""])
+                for name, value in report["counters"].items():
+                    writer.writerow(["counter", name, value, "", "", "", "", "", "", ""])
+                for name, hist in report["histograms"].items():
+                    writer.writerow(
+                        ["histogram", name, hist["count"], "", "", hist["mean_ms"],
+                         hist["p50_ms"], hist["p90_ms"], hist["p99_ms"], hist["max_ms"]]
+                    )
+        else:
+            tmp_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return report
+
+
+class _NullMetrics:
+    """
+    未开启计量时使用,所有记录操作为空操作。
+    """
+
+    enabled = False
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        yield
+
+    def add_time(self, name: str, seconds: float) -> None:
+        pass
+
+    def count(self, name: str, n: float = 1) -> None:
+        pass
+
+    def observe(self, name: str, seconds: float) -> None:
+        pass
+
+
+NULL_METRICS = _NullMetrics()
+_current: Metrics | _NullMetrics = NULL_METRICS
+
+
+def get_metrics() -> Metrics | _NullMetrics:
+    """
+    当前运行的计量对象,未开启时返回空实现,调用方无需判断。
+    """
+    return _current
+
+
+def _report_path(name: str, target: str) -> Path:
+    path = Path(target)
+    if target.endswith(("/", os.sep)) or path.is_dir():
+        return path / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    return path
+
+
+@contextlib.contextmanager
+def metrics_run(
+    name: str,
+    report_path: str | Path | None = None,
+    profile_path: str | Path | None = None,
+) -> Iterator[Metrics | _NullMetrics]:
+    """
+    开启一次计量运行,结束（包括异常或中断）时写出报告。
+
+    report_path / profile_path 未指定时读取环境变量 WORDCARDPUTER_METRICS /
+    WORDCARDPUTER_PROFILE,两者都没有时不记录。已经处在某次运行中时
+    （例如命令行入口已开启）直接复用外层运行,由外层统一写报告。
+
+    :param name: 运行名称,写入报告并用于目录模式下的文件名
+    :param report_path: 报告路径（.json / .csv）或目录
+    :param profile_path: cProfile 统计输出路径（pstats 格式,只记录主线程）
+    """
+    global _current
+    if _current.enabled:
+        yield _current
+        return
+
+    report_path = report_path or os.environ.get(METRICS_ENV) or None
+    profile_path = profile_path or os.environ.get(PROFILE_ENV) or None
+    if report_path is None and profile_path is None:
+        yield NULL_METRICS
+        return
+
+    metrics = Metrics(name)
+    profiler = None
+    if profile_path is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    _current = metrics
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        _current = NULL_METRICS
+        if report_path is not None:
+            path = _report_path(name, str(report_path))
+            report = metrics.write_report(path)
+            top = ", ".join(f"{stage} {info['share']:.0%}" for stage, info in list(report["stages"].items())[:3])
+            print(f"计量报告已写入 {path}（{report['wall_seconds']:.1f} s{'; ' + top if top else ''}）")
+        if profiler is not None:
+            Path(profile_path).parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(profile_path))
+            print(f"cProfile 统计已写入 {profile_path}（python -m pstats {profile_path} 查看）")
+
+
+class _WorkerResult:
+    __slots__ = ("value", "snapshot")
+
+    def __init__(self, value, snapshot: dict):
+        self.value = value
+        self.snapshot = snapshot
+
+
+class _WorkerTask:
+    """
+    进程池任务包装: 在工作进程中用独立的 Metrics 记录,连同结果一起返回给主进程。
+    """
+
+    def __init__(self, fn: Callable):
+        self.fn = fn
+        self.owner_pid = os.getpid()
+
+    def __call__(self, *args, **kwargs):
+        global _current
+        if os.getpid() == self.owner_pid:
+            # 串行模式下就在主进程执行,直接记到当前运行
+            return self.fn(*args, **kwargs)
+        # fork 出的进程继承了主进程的 _current 副本,这里换成新的再记录
+        previous = _current
+        _current = Metrics(previous.name if previous.enabled else "worker")
+        try:
+            value = self.fn(*args, **kwargs)
+            return _WorkerResult(value, _current.snapshot())
+        finally:
+            _current = previous
+
+
+def worker_task(fn: Callable) -> Callable:
+    """
+    包装要提交给 ProcessPoolExecutor 的函数,使工作进程中的记录能合并回主进程。
+    未开启计量时原样返回 fn。结果需经 collect_worker_result 取出。
+    """
+    return _WorkerTask(fn) if _current.enabled else fn
+
+
+def collect_worker_result(result):
+    """
+    取出 worker_task 的返回值,并把工作进程的记录合并到当前运行。
+    """
+    if isinstance(result, _WorkerResult):
+        if _current.enabled:
+            _current.merge(result.snapshot)
+        return result.value
+    return result
@@ -0,0 +1,295 @@
+import sqlite3
+import time
+from typing import Dict, List, Set, Tuple
+from pathlib import Path
+
+from .db_package import _open_readonly
+from .stats import _summary_from_histogram
+
+
+# 聚合粒度: 整库 / 单个 source（同一词条只计一次）/ 单个章节
+LEVELS = ("all", "source", "chapter")
+
+
+def _word_key_sql(lang: str) -> str:
+    # 数据库重建后 id 可能变化,历史记录以词条键关联
+    return "w.jp || char(9) || w.tone" if lang == "jp" else "w.en"
+
+
+def _read_vocab_state(vocab_db: Path, lang: str | None) -> Tuple[str, Dict[str, int], Dict[str, Set[Tuple[str, str]]]]:
+    """
+    读取一次设备数据库: 返回 (语言, {词条键: score}, {词条键: {(source, chapter)}})。
+    """
+    conn = _open_readonly(vocab_db)
+    try:
+        if lang is None:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            lang = "jp" if "jp_words" in tables else "en"
+        key = _word_key_sql(lang)
+        scores = dict(conn.execute(f"SELECT {key}, w.score FROM {lang}_words w"))
+        members: Dict[str, Set[Tuple[str, str]]] = {}
+        for word_key, source, chapter in conn.execute(
+            f"SELECT {key}, s.source, s.chapter FROM {lang}_source s JOIN {lang}_words w ON w.id = s.word_id"
+        ):
+            members.setdefault(word_key, set()).add((source, chapter))
+    finally:
+        conn.close()
+    return lang, scores, members
+
+
+def _contributions(score: int | None, members: Set[Tuple[str, str]]) -> List[Tuple[str, str, str, int]]:
+    """
+    一个词条对各聚合范围直方图的贡献: [(level, source, chapter, score)]。
+    """
+    if score is None:
+        return []
+    result = [("all", "", "", score)]
+    result += [("source", source, "", score) for source in {source for source, _ in members}]
+    result += [("chapter", source, chapter, score) for source, chapter in members]
+    return result
+
+
+class ScoreHistory:
+    """
+    分数历史快照库（PC 端）。
+
+    每次从设备拉取数据库后调用 record_snapshot,只把与上次相比发生变化的
+    词条写入只追加的 score_deltas 表,并用这些变化增量更新各范围的分数直方图
+    （agg_scores）；每个范围的直方图变化量另存于 agg_deltas,趋势查询只需读取
+    该范围发生过的变化,与词库大小无关。
+
+    一个历史库只记录一种语言。
+
+    :param path: 历史数据库路径
+    """
+
+    def __init__(self, path: str | Path = "score_history.db"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                taken_at TEXT NOT NULL,
+                lang TEXT NOT NULL,
+                vocab_db TEXT NOT NULL,
+                changed INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS score_deltas (
+                snapshot_id INTEGER NOT NULL,
+                word_key TEXT NOT NULL,
+                old_score INTEGER,
+                new_score INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS current_scores (
+                word_key TEXT PRIMARY KEY,
+                score INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS memberships (
+                word_key TEXT NOT NULL,
+                source TEXT NOT NULL,
+                chapter TEXT NOT NULL,
+                PRIMARY KEY (word_key, source, chapter)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS agg_scores (
+                level TEXT NOT NULL,
+                source TEXT NOT NULL,
+                chapter TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (level, source, chapter, score)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS agg_deltas (
+                level TEXT NOT NULL,
+                source TEXT NOT NULL,
+                chapter TEXT NOT NULL,
+                snapshot_id INTEGER NOT NULL,
+                score INTEGER NOT NULL,
+                delta INTEGER NOT NULL,
+                PRIMARY KEY (level, source, chapter, snapshot_id, score)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_score_deltas_word ON score_deltas(word_key, snapshot_id);
+            CREATE INDEX IF NOT EXISTS idx_score_deltas_snapshot ON score_deltas(snapshot_id);
+            """
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ScoreHistory":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def lang(self) -> str | None:
+        row = self._conn.execute("SELECT lang FROM snapshots ORDER BY id LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def record_snapshot(self, vocab_db: str | Path, taken_at: str | None = None, lang: str | None = None) -> dict:
+        """
+        对比设备数据库与上一次快照,记录变化并增量更新聚合。
+
+        :param vocab_db: 从设备拉取的 jp_words.db / en_words.db
+        :param taken_at: 快照时间（ISO 字符串）,默认当前时间
+        :param lang: "jp" / "en",None 时自动判断
+        :return: {"snapshot_id", "changed", "new_words", "removed_words", "score_changes", "elapsed"}
+        """
+        start = time.perf_counter()
+        lang, new_scores, new_members = _read_vocab_state(Path(vocab_db), lang)
+        known_lang = self.lang()
+        if known_lang is not None and known_lang != lang:
+            raise ValueError(f"历史库记录的是 {known_lang} 词库,不能混入 {lang}")
+
+        conn = self._conn
+        old_scores = dict(conn.execute("SELECT word_key, score FROM current_scores"))
+        old_members: Dict[str, Set[Tuple[str, str]]] = {}
+        for word_key, source, chapter in conn.execute("SELECT word_key, source, chapter FROM memberships"):
+            old_members.setdefault(word_key, set()).add((source, chapter))
+
+        summary = {"snapshot_id": None, "changed": 0, "new_words": 0, "removed_words": 0, "score_changes": 0}
+        score_rows = []
+        agg: Dict[Tuple[str, str, str, int], int] = {}
+        member_adds = []
+        member_removes = []
+
+        for word_key in new_scores.keys() | old_scores.keys():
+            old_score = old_scores.get(word_key)
+            new_score = new_scores.get(word_key)
+            before = old_members.get(word_key, set())
+            after = new_members.get(word_key, set())
+            if old_score == new_score and before == after:
+                continue
+
+            summary["changed"] += 1
+            if old_score is None:
+                summary["new_words"] += 1
+            elif new_score is None:
+                summary["removed_words"] += 1
+            elif old_score != new_score:
+                summary["score_changes"] += 1
+            if old_score != new_score:
+                score_rows.append((word_key, old_score, new_score))
+
+            for scope in _contributions(old_score, before):
+                agg[scope] = agg.get(scope, 0) - 1
+            for scope in _contributions(new_score, after):
+                agg[scope] = agg.get(scope, 0) + 1
+            member_adds += [(word_key, source, chapter) for source, chapter in after - before]
+            member_removes += [(word_key, source, chapter) for source, chapter in before - after]
+
+        agg = {scope: delta for scope, delta in agg.items() if delta}
+
+        with conn:
+            snapshot_id = conn.execute(
+                "INSERT INTO snapshots (taken_at, lang, vocab_db, changed) VALUES (?, ?, ?, ?)",
+                (taken_at or time.strftime("%Y-%m-%dT%H:%M:%S"), lang, str(vocab_db), summary["changed"]),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO score_deltas (snapshot_id, word_key, old_score, new_score) VALUES (?, ?, ?, ?)",
+                ((snapshot_id, *row) for row in score_rows),
+            )
+            conn.executemany(
+                "INSERT INTO agg_deltas (level, source, chapter, snapshot_id, score, delta) VALUES (?, ?, ?, ?, ?, ?)",
+                ((level, source, chapter, snapshot_id, score, delta)
+                 for (level, source, chapter, score), delta in agg.items()),
+            )
+            conn.executemany(
+                "INSERT INTO agg_scores (level, source, chapter, score, count) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(level, source, chapter, score) DO UPDATE SET count = count + excluded.count",
+                ((*scope, delta) for scope, delta in agg.items()),
+            )
+            conn.execute("DELETE FROM agg_scores WHERE count = 0")
+
+            conn.executemany(
+                "DELETE FROM current_scores WHERE word_key = ?",
+                ((word_key,) for word_key, _, new_score in score_rows if new_score is None),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO current_scores (word_key, score) VALUES (?, ?)",
+                ((word_key, new_score) for word_key, _, new_score in score_rows if new_score is not None),
+            )
+            conn.executemany("DELETE FROM memberships WHERE word_key = ? AND source = ? AND chapter = ?", member_removes)
+            conn.executemany("INSERT INTO memberships (word_key, source, chapter) VALUES (?, ?, ?)", member_adds)
+
+        summary["snapshot_id"] = snapshot_id
+        summary["elapsed"] = time.perf_counter() - start
+        return summary
+
+    def snapshots(self) -> List[dict]:
+        return [
+            {"id": row[0], "taken_at": row[1], "vocab_db": row[2], "changed": row[3]}
+            for row in self._conn.execute("SELECT id, taken_at, vocab_db, changed FROM snapshots ORDER BY id")
+        ]
+
+    def current(self, level: str = "all", source: str | None = None) -> dict:
+        """
+        读取当前（最近一次快照）的掌握程度,结果结构与 analyze_vocab_mastery 相同。
+
+        :param level: "all" 返回单个结果；"source" 返回 {source: 结果}；
+                      "chapter" 返回 {source: {chapter: 结果}}
+        :param source: 只返回指定 source 的结果（level 为 source / chapter 时）
+        """
+        if level not in LEVELS:
+            raise ValueError(f"未知聚合粒度: {level}, 可选 {LEVELS}")
+        sql = "SELECT source, chapter, score, count FROM agg_scores WHERE level = ?"
+        params = [level]
+        if source is not None:
+            sql += " AND source = ?"
+            params.append(source)
+
+        histograms: Dict[Tuple[str, str], Dict[int, int]] = {}
+        for src, chapter, score, count in self._conn.execute(sql, params):
+            histograms.setdefault((src, chapter), {})[score] = count
+
+        if level == "all":
+            return _summary_from_histogram(histograms.get(("", ""), {}))
+        if level == "source":
+            return {
+                src: {"source": src, **_summary_from_histogram(hist)}
+                for (src, _), hist in sorted(histograms.items())
+            }
+        result: Dict[str, dict] = {}
+        for (src, chapter), hist in sorted(histograms.items()):
+            result.setdefault(src, {})[chapter] = {"source": src, "chapter": chapter, **_summary_from_histogram(hist)}
+        return result
+
+    def trend(self, level: str = "all", source: str = "", chapter: str = "") -> List[dict]:
+        """
+        某个范围在每次发生变化的快照之后的掌握程度。
+
+        只读取该范围的 agg_deltas 并依次累加,耗时与该范围的变化次数成正比。
+
+        :return: [{"snapshot_id", "taken_at", 以及 analyze_vocab_mastery 的各字段}]
+        """
+        if level not in LEVELS:
+            raise ValueError(f"未知聚合粒度: {level}, 可选 {LEVELS}")
+        rows = self._conn.execute(
+            "SELECT d.snapshot_id, s.taken_at, d.score, d.delta FROM agg_deltas d "
+            "JOIN snapshots s ON s.id = d.snapshot_id "
+            "WHERE d.level = ? AND d.source = ? AND d.chapter = ? ORDER BY d.snapshot_id",
+            (level, source, chapter),
+        ).fetchall()
+
+        points = []
+        histogram: Dict[int, int] = {}
+        for i, (snapshot_id, taken_at, score, delta) in enumerate(rows):
+            histogram[score] = histogram.get(score, 0) + delta
+            if i + 1 == len(rows) or rows[i + 1][0] != snapshot_id:
+                current = {s: c for s, c in histogram.items() if c}
+                points.append({"snapshot_id": snapshot_id, "taken_at": taken_at, **_summary_from_histogram(current)})
+        return points
+
+    def word_history(self, word_key: str) -> List[dict]:
+        """
+        单个词条的分数变化记录（日语词条键为 "jp\\ttone"）。
+        """
+        return [
+            {"snapshot_id": row[0], "taken_at": row[1], "old_score": row[2], "new_score": row[3]}
+            for row in self._conn.execute(
+                "SELECT d.snapshot_id, s.taken_at, d.old_score, d.new_score FROM score_deltas d "
+                "JOIN snapshots s ON s.id = d.snapshot_id WHERE d.word_key = ? ORDER BY d.snapshot_id",
+                (word_key,),
+            )
+        ]
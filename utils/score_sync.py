@@ -0,0 +1,396 @@
+import os
+import sqlite3
+import time
+from typing import Dict, List, Tuple
+from pathlib import Path
+
+from .db_builder import LANG_SCHEMAS
+from .db_package import detect_lang
+from .metrics import metrics_run
+
+
+# 设备未联网校时时 SQLite 的 'now' 停留在 1970 年附近,早于 2020-01-01 的时间戳视为无效
+_MIN_VALID_TIME = 1_577_836_800
+
+# 同步时设备数据库 ATTACH 的名称,主库为 main
+_DEVICE = "device"
+_SIDES = ("main", _DEVICE)
+
+
+def change_log_sql(lang: str, schema: str = "main") -> List[str]:
+    """
+    变更日志表与触发器。
+
+    触发器随数据库文件保存,设备固件执行 UPDATE score / 导入 / 记录错题时
+    由设备上的 SQLite 自动写入 {lang}_changes,不需要修改固件。分数触发器只在
+    分数确实变化时记录（固件自动保存会把当前词库全部 UPDATE 一遍）。
+    删除错题（固件 deleteDictationError）时行已不存在,内容另记入 {lang}_error_deletes。
+
+    :param schema: 建在哪个已 ATTACH 的数据库中
+    """
+    words = LANG_SCHEMAS[lang]["words"]
+    changes = f"{lang}_changes"
+    now = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+    def log(kind: str) -> str:
+        return f"BEGIN INSERT INTO {changes} (kind, row_id, changed_at) VALUES ('{kind}', NEW.id, {now}); END"
+
+    return [
+        f"""CREATE TABLE IF NOT EXISTS {schema}.{lang}_error_deletes (
+                seq INTEGER PRIMARY KEY,
+                word_id INTEGER NOT NULL,
+                wrong_text TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                deleted_at INTEGER NOT NULL
+            )""",
+        f"""CREATE TABLE IF NOT EXISTS {schema}.{changes} (
+                seq INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                changed_at INTEGER NOT NULL
+            )""",
+        f"""CREATE TABLE IF NOT EXISTS {schema}.{lang}_errors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                word_id INTEGER NOT NULL,
+                wrong_text TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY(word_id) REFERENCES {words}(id) ON DELETE CASCADE
+            )""",
+        f"CREATE TRIGGER IF NOT EXISTS {schema}.{lang}_log_score AFTER UPDATE OF score ON {words} "
+        f"WHEN OLD.score <> NEW.score {log('score')}",
+        f"CREATE TRIGGER IF NOT EXISTS {schema}.{lang}_log_source AFTER INSERT ON {lang}_source {log('source')}",
+        f"CREATE TRIGGER IF NOT EXISTS {schema}.{lang}_log_error AFTER INSERT ON {lang}_errors {log('error')}",
+        f"CREATE TRIGGER IF NOT EXISTS {schema}.{lang}_log_error_delete AFTER DELETE ON {lang}_errors "
+        f"BEGIN INSERT INTO {lang}_error_deletes (word_id, wrong_text, created_at, deleted_at) "
+        f"VALUES (OLD.word_id, OLD.wrong_text, OLD.created_at, {now}); END",
+    ]
+
+
+def _has_change_log(conn: sqlite3.Connection, schema: str, lang: str) -> bool:
+    return conn.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (f"{lang}_changes",)
+    ).fetchone() is not None
+
+
+class _Side:
+    """
+    同步中的一方（main 为主库,device 为设备库）: 读取变更与按键查找词条。
+    """
+
+    def __init__(self, conn: sqlite3.Connection, schema: str, lang: str):
+        self.conn = conn
+        self.schema = schema
+        self.lang = lang
+        self.words = f"{schema}.{LANG_SCHEMAS[lang]['words']}"
+        self.source = f"{schema}.{lang}_source"
+        self.errors = f"{schema}.{lang}_errors"
+        self.changes = f"{schema}.{lang}_changes"
+        self.error_deletes = f"{schema}.{lang}_error_deletes"
+        self.key_cols = LANG_SCHEMAS[lang]["key"]
+        self.key_sql = ", ".join(f"w.{col}" for col in self.key_cols)
+        self.key_where = " AND ".join(f"{col} = ?" for col in self.key_cols)
+
+    def lookup(self, key: tuple) -> tuple | None:
+        """
+        :return: (id, score),词条不存在时返回 None
+        """
+        return self.conn.execute(f"SELECT id, score FROM {self.words} WHERE {self.key_where}", key).fetchone()
+
+    def scores(self, full: bool) -> Dict[tuple, Tuple[int, int]]:
+        """
+        :return: {词条键: (当前 score, 最后修改时间)},full 时返回全部词条（时间为 0）
+        """
+        n = len(self.key_cols)
+        if full:
+            sql = f"SELECT {self.key_sql}, w.score, 0 FROM {self.words} w"
+        else:
+            sql = (
+                f"SELECT {self.key_sql}, w.score, MAX(c.changed_at) FROM {self.changes} c "
+                f"JOIN {self.words} w ON w.id = c.row_id WHERE c.kind = 'score' GROUP BY w.id"
+            )
+        return {tuple(row[:n]): (row[n], row[n + 1]) for row in self.conn.execute(sql)}
+
+    def memberships(self, full: bool) -> List[tuple]:
+        """
+        :return: [(词条键, source, chapter)]
+        """
+        n = len(self.key_cols)
+        sql = f"SELECT {self.key_sql}, s.source, s.chapter FROM {self.source} s JOIN {self.words} w ON w.id = s.word_id"
+        if not full:
+            sql += f" WHERE s.id IN (SELECT row_id FROM {self.changes} WHERE kind = 'source')"
+        return [(tuple(row[:n]), row[n], row[n + 1]) for row in self.conn.execute(sql)]
+
+    def error_rows(self, full: bool) -> List[tuple]:
+        """
+        :return: [(词条键, wrong_text, created_at)]
+        """
+        n = len(self.key_cols)
+        sql = (
+            f"SELECT {self.key_sql}, e.wrong_text, e.created_at FROM {self.errors} e "
+            f"JOIN {self.words} w ON w.id = e.word_id"
+        )
+        if not full:
+            sql += f" WHERE e.id IN (SELECT row_id FROM {self.changes} WHERE kind = 'error')"
+        sql += " ORDER BY e.id"
+        return [(tuple(row[:n]), row[n], row[n + 1]) for row in self.conn.execute(sql)]
+
+    def deleted_errors(self) -> List[tuple]:
+        """
+        上次同步以来删除的错题: [(词条键, wrong_text, created_at)],词条也已删除的跳过。
+        """
+        n = len(self.key_cols)
+        sql = (
+            f"SELECT {self.key_sql}, d.wrong_text, d.created_at FROM {self.error_deletes} d "
+            f"JOIN {self.words} w ON w.id = d.word_id ORDER BY d.seq"
+        )
+        return [(tuple(row[:n]), row[n], row[n + 1]) for row in self.conn.execute(sql)]
+
+    def log_size(self) -> int:
+        return (
+            self.conn.execute(f"SELECT COUNT(*) FROM {self.changes}").fetchone()[0]
+            + self.conn.execute(f"SELECT COUNT(*) FROM {self.error_deletes}").fetchone()[0]
+        )
+
+
+def _build_changeset(master: _Side, device: _Side, full: bool, prefer: str, device_time_fallback: int) -> dict:
+    """
+    根据双方的变更计算最小变更集,只包含对方确实缺少或不同的内容。
+
+    全量比对时错题只从设备复制到主库: 主库中有而设备没有的错题可能是在设备上删除的,
+    不能推回设备。
+
+    :return: {"scores": [(目标方, 键, 旧分, 新分)], "memberships": [(目标方, 键, source, chapter)],
+              "errors": [(目标方, 键, wrong_text, created_at)], "error_deletes": 结构同 errors,
+              "conflicts": 双方都修改过的词条数}
+    """
+    sides = {"main": master, _DEVICE: device}
+    other = {"main": _DEVICE, _DEVICE: "main"}
+    changeset = {"scores": [], "memberships": [], "errors": [], "error_deletes": [], "conflicts": 0}
+
+    # 新增的 source 归属: 对方没有该词条时连同词条一起复制
+    for origin, side in sides.items():
+        target = sides[other[origin]]
+        for key, source, chapter in side.memberships(full):
+            found = target.lookup(key)
+            if found is not None and target.conn.execute(
+                f"SELECT 1 FROM {target.source} WHERE word_id = ? AND source = ? AND chapter = ?",
+                (found[0], source, chapter),
+            ).fetchone():
+                continue
+            changeset["memberships"].append((target.schema, key, source, chapter))
+
+    # 分数: 只有一方修改时同步到另一方,双方都修改时以修改时间较晚者为准
+    master_scores = master.scores(full)
+    device_scores = device.scores(full)
+    if full:
+        # 全量比对没有修改时间,按 prefer 决定哪一方优先
+        winner_time = {"main": int(prefer == "master"), _DEVICE: int(prefer == "device")}
+        master_scores = {key: (score, winner_time["main"]) for key, (score, _) in master_scores.items()}
+        device_scores = {key: (score, winner_time[_DEVICE]) for key, (score, _) in device_scores.items()}
+    else:
+        device_scores = {
+            key: (score, changed_at if changed_at >= _MIN_VALID_TIME else device_time_fallback)
+            for key, (score, changed_at) in device_scores.items()
+        }
+    for key in sorted(master_scores.keys() | device_scores.keys()):
+        in_master = master_scores.get(key)
+        in_device = device_scores.get(key)
+        if in_master is not None and in_device is not None:
+            if in_master[0] == in_device[0]:
+                continue
+            if not full:
+                changeset["conflicts"] += 1
+            origin = _DEVICE if in_device[1] >= in_master[1] else "main"
+        else:
+            origin = _DEVICE if in_device is not None else "main"
+        score = (in_device if origin == _DEVICE else in_master)[0]
+        target = sides[other[origin]]
+        found = target.lookup(key)
+        if found is not None and found[1] != score:
+            changeset["scores"].append((target.schema, key, found[1], score))
+
+    # 错题记录: 以 (词条键, wrong_text, created_at) 判断对方是否已有
+    deleted = set()
+    for origin, side in sides.items():
+        target = sides[other[origin]]
+        for key, wrong_text, created_at in side.deleted_errors():
+            deleted.add((key, wrong_text, created_at))
+            found = target.lookup(key)
+            if found is not None and target.conn.execute(
+                f"SELECT 1 FROM {target.errors} WHERE word_id = ? AND wrong_text = ? AND created_at = ?",
+                (found[0], wrong_text, created_at),
+            ).fetchone():
+                changeset["error_deletes"].append((target.schema, key, wrong_text, created_at))
+    for origin, side in sides.items():
+        if full and origin == "main":
+            continue
+        target = sides[other[origin]]
+        for key, wrong_text, created_at in side.error_rows(full):
+            if (key, wrong_text, created_at) in deleted:
+                continue
+            found = target.lookup(key)
+            if found is not None and target.conn.execute(
+                f"SELECT 1 FROM {target.errors} WHERE word_id = ? AND wrong_text = ? AND created_at = ?",
+                (found[0], wrong_text, created_at),
+            ).fetchone():
+                continue
+            changeset["errors"].append((target.schema, key, wrong_text, created_at))
+    return changeset
+
+
+def _apply_changeset(master: _Side, device: _Side, changeset: dict) -> int:
+    """
+    在当前事务中写入变更集。
+
+    :return: 因对方缺少词条而跳过的错题数
+    """
+    sides = {"main": master, _DEVICE: device}
+    other = {"main": _DEVICE, _DEVICE: "main"}
+    columns = ", ".join(LANG_SCHEMAS[master.lang]["columns"])
+    skipped = 0
+    for schema, key, source, chapter in changeset["memberships"]:
+        target, origin = sides[schema], sides[other[schema]]
+        found = target.lookup(key)
+        if found is None:
+            target.conn.execute(
+                f"INSERT INTO {target.words} ({columns}) SELECT {columns} FROM {origin.words} WHERE {origin.key_where}",
+                key,
+            )
+            found = target.lookup(key)
+        target.conn.execute(
+            f"INSERT OR IGNORE INTO {target.source} (word_id, source, chapter) VALUES (?, ?, ?)",
+            (found[0], source, chapter),
+        )
+    for schema, key, _, score in changeset["scores"]:
+        target = sides[schema]
+        target.conn.execute(f"UPDATE {target.words} SET score = ? WHERE {target.key_where}", (score, *key))
+    for schema, key, wrong_text, created_at in changeset["error_deletes"]:
+        target = sides[schema]
+        target.conn.execute(
+            f"DELETE FROM {target.errors} WHERE word_id = (SELECT id FROM {target.words} WHERE {target.key_where}) "
+            "AND wrong_text = ? AND created_at = ?",
+            (*key, wrong_text, created_at),
+        )
+    for schema, key, wrong_text, created_at in changeset["errors"]:
+        target = sides[schema]
+        found = target.lookup(key)
+        if found is None:
+            skipped += 1
+            continue
+        target.conn.execute(
+            f"INSERT INTO {target.errors} (word_id, wrong_text, created_at) VALUES (?, ?, ?)",
+            (found[0], wrong_text, created_at),
+        )
+    return skipped
+
+
+def sync_scores(
+    master_db: str | Path,
+    device_db: str | Path,
+    lang: str | None = None,
+    prefer: str = "device",
+    full: bool = False,
+    device_time_fallback: float | None = None,
+    dry_run: bool = False,
+) -> dict:
+    """
+    双向同步设备数据库与 PC 主词库中的分数、错题记录和 source 归属。
+
+    两个数据库中各自维护由触发器写入的变更日志（见 change_log_sql）,
+    同步只读取上次同步以来的变更,按词条键对应到另一方,得到最小变更集:
+    - 分数: 只有一方修改时同步到另一方；双方都修改时以修改时间较晚者为准（last-writer-wins）,
+      不再像 collect_merged_entries_by_key 那样取最大值,分数下降也能保留；
+    - source 归属: 对方缺少时补上,对方没有该词条时连同词条一起复制；
+    - 错题记录: 对方没有相同记录时追加（对方缺少该词条时跳过）；一方删除的错题在另一方也删除。
+    两个数据库在同一个事务中写入并清空变更日志,中途失败时都不改变。
+
+    第一次同步（任一方还没有变更日志）或 full=True 时全量比对,分数不同时
+    以 prefer 指定的一方为准,错题只从设备补到主库（不会把设备上已删除的错题推回去）,
+    之后的同步耗时只与变更数量有关。
+    设备时钟未校准时记录的时间戳无效,以 device_time_fallback（默认为设备库文件的
+    修改时间）代替。同步后需把设备库拷回设备（或直接同步 SD 卡上的文件）。
+
+    :param master_db: PC 主词库数据库
+    :param device_db: 设备数据库或从设备拉取的副本
+    :param lang: "jp" / "en",默认根据主库表名判断
+    :param prefer: "device" / "master",全量比对时分数冲突以哪一方为准
+    :param full: 忽略变更日志,全量比对
+    :param device_time_fallback: 设备时间戳无效时使用的 Unix 时间
+    :param dry_run: 只计算变更集,不写入
+    :return: 统计结果 dict,dry_run 时另含 "changeset"
+    """
+    if prefer not in ("device", "master"):
+        raise ValueError(f"prefer 只能是 device / master: {prefer}")
+    for path in (master_db, device_db):
+        if not Path(path).is_file():
+            raise FileNotFoundError(f"数据库不存在: {path}")
+    start = time.perf_counter()
+    if device_time_fallback is None:
+        device_time_fallback = os.path.getmtime(device_db)
+
+    conn = sqlite3.connect(str(master_db), isolation_level=None)
+    try:
+        conn.execute(f"ATTACH DATABASE ? AS {_DEVICE}", (str(device_db),))
+        lang = lang or detect_lang(conn)
+        if not conn.execute(
+            f"SELECT 1 FROM {_DEVICE}.sqlite_master WHERE type = 'table' AND name = ?",
+            (LANG_SCHEMAS[lang]["words"],),
+        ).fetchone():
+            raise ValueError(f"设备数据库中没有 {LANG_SCHEMAS[lang]['words']} 表")
+
+        with metrics_run("sync_scores") as metrics:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                baseline = full or not all(_has_change_log(conn, schema, lang) for schema in _SIDES)
+                for schema in _SIDES:
+                    for sql in change_log_sql(lang, schema):
+                        conn.execute(sql)
+                master = _Side(conn, "main", lang)
+                device = _Side(conn, _DEVICE, lang)
+                log_entries = {"master": master.log_size(), "device": device.log_size()}
+
+                with metrics.stage("diff"):
+                    changeset = _build_changeset(
+                        master, device, baseline, prefer, int(device_time_fallback)
+                    )
+                if dry_run:
+                    conn.execute("ROLLBACK")
+                    skipped = 0
+                else:
+                    with metrics.stage("apply"):
+                        skipped = _apply_changeset(master, device, changeset)
+                        # 本次写入也会触发日志,同步完成后双方一致,一并清空
+                        for side in (master, device):
+                            conn.execute(f"DELETE FROM {side.changes}")
+                            conn.execute(f"DELETE FROM {side.error_deletes}")
+                    conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+    finally:
+        conn.close()
+
+    def count(kind: str, schema: str) -> int:
+        return sum(1 for item in changeset[kind] if item[0] == schema)
+
+    summary = {
+        "lang": lang,
+        "baseline": baseline,
+        "dry_run": dry_run,
+        "log_entries": log_entries,
+        "conflicts": changeset["conflicts"],
+    }
+    for kind in ("scores", "memberships", "errors", "error_deletes"):
+        summary[kind] = {"to_master": count(kind, "main"), "to_device": count(kind, _DEVICE)}
+    summary["skipped_errors"] = skipped
+    summary["elapsed"] = round(time.perf_counter() - start, 3)
+    if dry_run:
+        summary["changeset"] = changeset
+    print(
+        f"{'（预览）' if dry_run else ''}同步{'（全量比对）' if baseline else ''}: "
+        f"分数 → 主库 {summary['scores']['to_master']} / → 设备 {summary['scores']['to_device']}, "
+        f"归属 {len(changeset['memberships'])}, 错题 +{len(changeset['errors'])} / -{len(changeset['error_deletes'])}, "
+        f"冲突 {changeset['conflicts']}, 用时 {summary['elapsed']:.2f} s"
+    )
+    return summary
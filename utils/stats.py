@@ -1,8 +1,11 @@
 import json
+from typing import Mapping
 from pathlib import Path
 from collections import Counter
 from statistics import mean, median
 
+from .db_package import _open_readonly
+
 
 def analyze_vocab_mastery(json_path: str | Path) -> dict:
     """
@@ -33,9 +36,26 @@ def analyze_vocab_mastery(json_path: str | Path) -> dict:
 
     counter = Counter(scores)
 
-    avg_score = mean(scores)
-    med_score = median(scores)
+    return {
+        "file": str(json_path),
+        **_mastery_summary(counter, total, mean(scores), median(scores)),
+    }
+
+
+def _mastery_level(avg_score: float) -> str:
+    # 一个非常"直觉化"的总体评价
+    if avg_score >= 4.5:
+        return "非常熟练"
+    elif avg_score >= 3.8:
+        return "较为熟练"
+    elif avg_score >= 3.0:
+        return "掌握中"
+    elif avg_score >= 2.0:
+        return "不牢固"
+    return "需要重点复习"
+
 
+def _mastery_summary(counter: Mapping, total: int, avg_score: float, med_score) -> dict:
     # 各分值分布（1~5 都列出来,即使为 0）
     distribution = {
         s: {
@@ -44,24 +64,106 @@ def analyze_vocab_mastery(json_path: str | Path) -> dict:
         }
         for s in range(1, 6)
     }
-
-    # 一个非常"直觉化"的总体评价
-    if avg_score >= 4.5:
-        level = "非常熟练"
-    elif avg_score >= 3.8:
-        level = "较为熟练"
-    elif avg_score >= 3.0:
-        level = "掌握中"
-    elif avg_score >= 2.0:
-        level = "不牢固"
-    else:
-        level = "需要重点复习"
-
     return {
-        "file": str(json_path),
         "total_words": total,
         "average_score": round(avg_score, 3),
         "median_score": med_score,
         "distribution": distribution,
-        "mastery_level": level,
+        "mastery_level": _mastery_level(avg_score),
+    }
+
+
+def median_from_histogram(histogram: Mapping, total: int | None = None):
+    """
+    由分数直方图计算中位数,结果与对展开后的列表调用 statistics.median 相同。
+
+    :param histogram: {分数: 次数}
+    :param total: 总次数,None 时自动求和
+    :return: 中位数；偶数个时为中间两个值的平均
+    """
+    if total is None:
+        total = sum(histogram.values())
+    if total == 0:
+        raise ValueError("空直方图没有中位数")
+
+    # 需要第 lo、hi 个元素（从 0 计）,奇数个时二者相同
+    lo, hi = (total - 1) // 2, total // 2
+    low_value = None
+    seen = 0
+    for score in sorted(histogram):
+        seen += histogram[score]
+        if low_value is None and seen > lo:
+            low_value = score
+        if seen > hi:
+            if lo == hi:
+                return score
+            return (low_value + score) / 2
+
+
+def _summary_from_histogram(histogram: Mapping) -> dict:
+    total = sum(histogram.values())
+    if total == 0:
+        return {
+            "total_words": 0,
+            "message": "词库为空"
+        }
+    avg_score = sum(score * count for score, count in histogram.items()) / total
+    return _mastery_summary(histogram, total, avg_score, median_from_histogram(histogram, total))
+
+
+def analyze_vocab_mastery_db(db_path: str | Path, lang: str | None = None) -> dict:
+    """
+    直接在 SQLite 词库上统计掌握程度,一次得到整库、每个 source、每个章节的结果。
+
+    聚合全部在 SQL 中完成（每种粒度一条 GROUP BY 查询,只返回分数直方图）,
+    平均值与中位数由直方图计算,不需要逐词读取或排序。各项结果的结构与
+    analyze_vocab_mastery 相同（file 为数据库路径,另含 source / chapter）。
+    整个 source 的统计与设备加载整个来源时一致,同一词条在多个章节中只计一次。
+
+    :param db_path: jp_words.db / en_words.db 路径
+    :param lang: "jp" / "en",None 时根据表名自动判断
+    :return: {"db", "lang", "overall", "sources": {source: 结果},
+              "chapters": {source: {chapter: 结果}}}
+    """
+    db_path = Path(db_path)
+    conn = _open_readonly(db_path)
+    try:
+        if lang is None:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            lang = "jp" if "jp_words" in tables else "en"
+        words, source = f"{lang}_words", f"{lang}_source"
+
+        overall = dict(conn.execute(f"SELECT score, COUNT(*) FROM {words} GROUP BY score").fetchall())
+
+        by_source = {}
+        for src, score, count in conn.execute(
+            f"SELECT s.source, w.score, COUNT(DISTINCT w.id) FROM {source} s "
+            f"JOIN {words} w ON w.id = s.word_id GROUP BY s.source, w.score"
+        ):
+            by_source.setdefault(src, {})[score] = count
+
+        by_chapter = {}
+        for src, chapter, score, count in conn.execute(
+            f"SELECT s.source, s.chapter, w.score, COUNT(*) FROM {source} s "
+            f"JOIN {words} w ON w.id = s.word_id GROUP BY s.source, s.chapter, w.score"
+        ):
+            by_chapter.setdefault(src, {}).setdefault(chapter, {})[score] = count
+    finally:
+        conn.close()
+
+    def result(histogram: dict, **where) -> dict:
+        return {"file": str(db_path), **where, **_summary_from_histogram(histogram)}
+
+    return {
+        "db": str(db_path),
+        "lang": lang,
+        "overall": result(overall),
+        "sources": {src: result(hist, source=src) for src, hist in sorted(by_source.items())},
+        "chapters": {
+            src: {
+                chapter: result(hist, source=src, chapter=chapter)
+                for chapter, hist in sorted(chapters.items())
+            }
+            for src, chapters in sorted(by_chapter.items())
+        },
     }
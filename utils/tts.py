@@ -1,16 +1,243 @@
 import os
+import json
+import wave
+import random
 import binascii
+import threading
 import subprocess
 import requests
-from typing import Tuple
+from requests.adapters import HTTPAdapter
+from typing import Tuple, List
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import sqlite3
 import time
-from dotenv import load_dotenv
 
+from .metrics import collect_worker_result, get_metrics, metrics_run, worker_task
 
-load_dotenv()
-api_key = os.getenv("API_KEY")
+try:
+    import miniaudio
+except ImportError:  # 可选依赖组 audio: 未安装时转码回退到 ffmpeg 子进程
+    miniaudio = None
+
+
+MINIMAX_URL = "https://api.minimax.io/v1/t2a_v2"
+YOUDAO_URL = "https://dict.youdao.com/dictvoice"
+
+# 设备端播放使用的 WAV 格式: 16kHz 单声道 16-bit PCM
+WAV_SAMPLE_RATE = 16000
+WAV_CHANNELS = 1
+
+
+def load_api_key() -> str | None:
+    """
+    读取 MiniMax API Key: 先加载 .env（不覆盖已有环境变量）,再读取 API_KEY。
+
+    只在第一次创建 TTSClient 时调用,import 本模块不会读取 .env。
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("API_KEY")
+
+
+class YoudaoDownloadError(Exception):
+    """
+    有道发音下载失败。
+
+    retryable 为 True 表示限流/网络类错误,可以退避后重试；
+    False 表示词条本身无发音（返回内容过短）,重试无意义。
+    """
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class TTSClient:
+    """
+    复用 HTTP 连接的 TTS 客户端。
+
+    内部持有一个带连接池的 requests.Session,同一主机的请求复用
+    keep-alive 连接,省去每个单词一次的 TCP + TLS 握手；API Key 在
+    构造时读取一次。Session 可被多个线程共享,pool_maxsize 应不小于
+    并发线程数,否则多出的连接用完即关,无法复用。
+
+    :param api_key: MiniMax API Key,默认使用 .env 中的 API_KEY
+    :param pool_connections: 缓存连接池的主机数
+    :param pool_maxsize: 每个主机保持的最大连接数
+    :param max_retries: 连接层面（建立连接失败等）的自动重试次数
+    :param minimax_url: MiniMax T2A 接口地址
+    :param youdao_url: 有道发音接口地址
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        max_retries: int = 0,
+        minimax_url: str = MINIMAX_URL,
+        youdao_url: str = YOUDAO_URL,
+    ):
+        self.api_key = api_key if api_key is not None else load_api_key()
+        self.minimax_url = minimax_url
+        self.youdao_url = youdao_url
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "TTSClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def generate_minimax(
+        self,
+        text: str,
+        output_path: Path = Path("output.wav"),
+        model: str = "speech-2.6-turbo",
+        voice_id: str = "Japanese_DecisivePrincess",
+        language: str = "Japanese",
+        sample_rate: int = 32000,
+        bitrate: int = 128000,
+        pitch: int = 0,
+        speed: float = 1.0,
+        volume: float = 1.0,
+        emotion: str = "calm",
+    ) -> Tuple[bool, str]:
+        """
+        使用 MiniMax T2A 接口生成语音文件 (WAV 格式),参数同 generate_tts_minimax。
+        """
+        payload = {
+            "model": model,
+            "text": text,
+            "stream": False,
+            "output_format": "hex",
+            "voice_setting": {
+                "voice_id": voice_id,
+                "speed": speed,
+                "vol": volume,
+                "pitch": pitch,
+                "emotion": emotion
+            },
+            "audio_setting": {
+                "sample_rate": sample_rate,
+                "bitrate": bitrate,
+                "format": "wav",
+                "channel": 1
+            },
+            "language_boost": language
+        }
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        output_path = Path(output_path)
+
+        metrics = get_metrics()
+        try:
+            with metrics.stage("network"):
+                response = self.session.post(self.minimax_url, headers=headers, json=payload, timeout=60)
+                result = response.json()
+            metrics.count("bytes_downloaded", len(response.content))
+
+            # 检查返回码
+            if result.get("base_resp", {}).get("status_code") == 0:
+                audio_hex = result["data"]["audio"]
+                audio_bytes = binascii.unhexlify(audio_hex)
+
+                # 自动创建文件夹
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+
+                # 保存音频
+                with metrics.stage("write"), output_path.open("wb") as f:
+                    f.write(audio_bytes)
+
+                return True, str(output_path)
+
+            else:
+                msg = result.get("base_resp", {}).get("status_msg", "未知错误")
+                return False, msg
+
+        except Exception as e:
+            return False, str(e)
+
+    def download_youdao_mp3(self, text: str) -> bytes:
+        """
+        下载有道词典发音,返回 MP3 字节。
+
+        :param text: 要朗读的文本
+        :return: MP3 音频字节
+        :raises YoudaoDownloadError: 下载失败
+        """
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        }
+        metrics = get_metrics()
+        try:
+            with metrics.stage("network"):
+                response = self.session.get(
+                    self.youdao_url,
+                    params={"audio": text, "type": 2},
+                    headers=headers,
+                    timeout=10,
+                )
+        except requests.RequestException as e:
+            metrics.count("network_errors")
+            raise YoudaoDownloadError(str(e)) from e
+        metrics.count("bytes_downloaded", len(response.content))
+
+        if response.status_code != 200:
+            raise YoudaoDownloadError(f"download failed (status: {response.status_code})")
+        if len(response.content) <= 1000:
+            raise YoudaoDownloadError(
+                f"download failed (status: {response.status_code})", retryable=False
+            )
+        return response.content
+
+    def generate_youdao(
+        self,
+        text: str,
+        output_path: str | Path,
+        backend: str = "auto",
+    ) -> Tuple[bool, str]:
+        """
+        下载有道发音并转为设备使用的 WAV,backend 见 transcode_mp3_to_wav。
+        """
+        try:
+            mp3_bytes = self.download_youdao_mp3(text)
+        except YoudaoDownloadError as e:
+            return False, str(e)
+        return transcode_mp3_to_wav(mp3_bytes, output_path, backend=backend)
+
+
+_default_client: TTSClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> TTSClient:
+    """
+    获取模块级共享的 TTSClient,首次调用时创建。
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = TTSClient()
+    return _default_client
 
 
 def generate_tts_minimax(
@@ -42,82 +269,111 @@ def generate_tts_minimax(
     :param emotion (str): 语音情感,可选 [happy, calm, sad, angry...]
     :retutn [bool, str]: 输出文件路径或错误信息
     """
+    return get_default_client().generate_minimax(
+        text,
+        output_path,
+        model=model,
+        voice_id=voice_id,
+        language=language,
+        sample_rate=sample_rate,
+        bitrate=bitrate,
+        pitch=pitch,
+        speed=speed,
+        volume=volume,
+        emotion=emotion,
+    )
+
+
+def download_youdao_mp3(text: str) -> bytes:
+    """
+    下载有道词典发音,返回 MP3 字节。
 
-    url = "https://api.minimax.io/v1/t2a_v2"
-
-    payload = {
-        "model": model,
-        "text": text,
-        "stream": False,
-        "output_format": "hex",
-        "voice_setting": {
-            "voice_id": voice_id,
-            "speed": speed,
-            "vol": volume,
-            "pitch": pitch,
-            "emotion": emotion
-        },
-        "audio_setting": {
-            "sample_rate": sample_rate,
-            "bitrate": bitrate,
-            "format": "wav",
-            "channel": 1
-        },
-        "language_boost": language
-    }
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    output_path = Path(output_path)
+    :param text: 要朗读的文本
+    :return: MP3 音频字节
+    :raises YoudaoDownloadError: 下载失败
+    """
+    return get_default_client().download_youdao_mp3(text)
 
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
-        result = response.json()
 
-        # 检查返回码
-        if result.get("base_resp", {}).get("status_code") == 0:
-            audio_hex = result["data"]["audio"]
-            audio_bytes = binascii.unhexlify(audio_hex)
+def write_pcm16_wav(
+    pcm: bytes,
+    output_path: str | Path,
+    sample_rate: int = WAV_SAMPLE_RATE,
+    nchannels: int = WAV_CHANNELS,
+) -> None:
+    """
+    将 16-bit 小端 PCM 数据直接写成 RIFF WAV 文件。
 
-            # 自动创建文件夹
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+    先写入同目录临时文件再原子替换,中途失败不会留下半个 WAV。
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    try:
+        with wave.open(str(tmp_path), "wb") as wf:
+            wf.setnchannels(nchannels)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes(pcm)
+        os.replace(str(tmp_path), str(output_path))
+    finally:
+        tmp_path.unlink(missing_ok=True)
 
-            # 保存音频
-            with output_path.open("wb") as f:
-                f.write(audio_bytes)
 
-            return True, str(output_path)
+def _decode_mp3_miniaudio(mp3_bytes: bytes) -> bytes:
+    """
+    在进程内解码 MP3,并重采样/混音为设备格式的 PCM。
+    """
+    decoded = miniaudio.decode(
+        mp3_bytes,
+        output_format=miniaudio.SampleFormat.SIGNED16,
+        nchannels=WAV_CHANNELS,
+        sample_rate=WAV_SAMPLE_RATE,
+    )
+    return decoded.samples.tobytes()
 
-        else:
-            msg = result.get("base_resp", {}).get("status_msg", "未知错误")
-            return False, msg
 
-    except Exception as e:
-        return False, str(e)
+def _decode_mp3_ffmpeg_pipe(mp3_bytes: bytes) -> bytes:
+    """
+    通过管道把 MP3 交给 ffmpeg,从 stdout 读回裸 PCM,不落临时文件。
+    """
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "mp3",
+            "-i",
+            "pipe:0",
+            "-ar",
+            str(WAV_SAMPLE_RATE),
+            "-ac",
+            str(WAV_CHANNELS),
+            "-f",
+            "s16le",
+            "pipe:1",
+        ],
+        input=mp3_bytes,
+        capture_output=True,
+        timeout=30,
+    )
+    if result.returncode != 0 or not result.stdout:
+        err = result.stderr.decode(errors="ignore").strip()
+        raise RuntimeError(err or "ffmpeg failed")
+    return result.stdout
 
 
-def generate_tts_youdao(text: str, output_path: str | Path) -> Tuple[bool, str]:
-    output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+def _transcode_mp3_ffmpeg_file(mp3_bytes: bytes, output_path: Path) -> Tuple[bool, str]:
+    """
+    一次性 ffmpeg 转码: 写临时 MP3,再由 ffmpeg 直接输出 WAV 文件。
+    """
     temp_mp3 = output_path.with_suffix(".mp3.tmp")
 
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        response = requests.get(
-            "https://dict.youdao.com/dictvoice",
-            params={"audio": text, "type": 2},
-            headers=headers,
-            timeout=10,
-        )
-        if response.status_code != 200 or len(response.content) <= 1000:
-            return False, f"download failed (status: {response.status_code})"
-
         with temp_mp3.open("wb") as f:
-            f.write(response.content)
+            f.write(mp3_bytes)
 
         result = subprocess.run(
             [
@@ -126,9 +382,9 @@ def generate_tts_youdao(text: str, output_path: str | Path) -> Tuple[bool, str]:
                 "-i",
                 str(temp_mp3),
                 "-ar",
-                "16000",
+                str(WAV_SAMPLE_RATE),
                 "-ac",
-                "1",
+                str(WAV_CHANNELS),
                 "-c:a",
                 "pcm_s16le",
                 str(output_path),
@@ -147,18 +403,83 @@ def generate_tts_youdao(text: str, output_path: str | Path) -> Tuple[bool, str]:
         return False, str(e)
 
 
-def fill_missing_audio(
-    db_path: str = "words_study/en/en_words.db",
-    audio_dir: str | Path = "words_study/en/audio",
-    delay: float = 0.5,
-) -> Tuple[int, int]:
+TRANSCODE_BACKENDS = ("auto", "miniaudio", "pipe", "ffmpeg")
+
+
+def transcode_mp3_to_wav(
+    mp3_bytes: bytes,
+    output_path: str | Path,
+    backend: str = "auto",
+) -> Tuple[bool, str]:
     """
-    读取英语词库，为没有音频的单词生成有道TTS音频。
+    将 MP3 字节转为设备使用的 16kHz 单声道 16-bit PCM WAV。
+
+    backend 可选:
+    - "miniaudio": 进程内解码 + 重采样,直接写 RIFF,无临时文件、无子进程
+      （需安装可选依赖组 audio,即 pip install -e ".[audio]"）；
+    - "pipe": ffmpeg 经 stdin/stdout 管道转码,不落临时文件；
+    - "ffmpeg": 原有的一次性 ffmpeg 转码（临时文件 + 子进程）；
+    - "auto": 已安装 miniaudio 时走进程内解码,失败或未安装时回退到 "ffmpeg"。
+
+    该函数只依赖参数,可直接提交给 ProcessPoolExecutor。
+
+    :param mp3_bytes: MP3 音频字节
+    :param output_path: 输出 WAV 路径
+    :param backend: 转码后端
+    :return: (是否成功, 输出路径或错误信息)
+    """
+    if backend not in TRANSCODE_BACKENDS:
+        raise ValueError(f"未知转码后端: {backend}, 可选 {TRANSCODE_BACKENDS}")
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if backend == "auto":
+        if miniaudio is not None:
+            ok, msg = transcode_mp3_to_wav(mp3_bytes, output_path, backend="miniaudio")
+            if ok:
+                return ok, msg
+        backend = "ffmpeg"
+
+    metrics = get_metrics()
+    if backend == "ffmpeg":
+        with metrics.stage("transcode"):
+            return _transcode_mp3_ffmpeg_file(mp3_bytes, output_path)
+
+    if backend == "miniaudio" and miniaudio is None:
+        return False, "未安装 miniaudio,无法进程内解码"
+
+    try:
+        with metrics.stage("transcode"):
+            if backend == "miniaudio":
+                pcm = _decode_mp3_miniaudio(mp3_bytes)
+            else:
+                pcm = _decode_mp3_ffmpeg_pipe(mp3_bytes)
+        with metrics.stage("write"):
+            write_pcm16_wav(pcm, output_path)
+    except Exception as e:
+        return False, str(e)
+    return True, str(output_path)
+
+
+def generate_tts_youdao(
+    text: str,
+    output_path: str | Path,
+    backend: str = "auto",
+) -> Tuple[bool, str]:
+    return get_default_client().generate_youdao(text, output_path, backend=backend)
+
+
+def find_missing_audio_words(
+    db_path: str | Path,
+    audio_dir: str | Path,
+) -> List[str]:
+    """
+    对比英语词库与音频目录,返回缺少音频的单词列表（按 id 排序,已去重）。
 
     :param db_path: SQLite 数据库路径
     :param audio_dir: 音频文件存放目录
-    :param delay: 每次请求间隔（秒），避免被限流
-    :return: (成功数, 失败数)
+    :return: 缺少音频的单词列表
     """
     audio_dir = Path(audio_dir)
     audio_dir.mkdir(parents=True, exist_ok=True)
@@ -176,34 +497,285 @@ def fill_missing_audio(
 
     print(f"词库总计: {len(all_words)} 个单词")
 
-    # 筛选出缺少音频的
-    missing = [w for w in all_words if w.lower() not in existing]
+    # 筛选出缺少音频的；去掉首尾空白后重复的单词只保留第一次出现,避免重复下载并发写同一个文件
+    missing = list(dict.fromkeys(w for w in all_words if w.lower() not in existing))
     print(f"缺少音频: {len(missing)} 个单词")
+    return missing
 
-    if not missing:
-        print("所有单词均有音频，无需处理。")
-        return 0, 0
 
-    success = 0
-    fail = 0
+def fill_missing_audio(
+    db_path: str = "words_study/en/en_words.db",
+    audio_dir: str | Path = "words_study/en/audio",
+    delay: float = 0.5,
+) -> Tuple[int, int]:
+    """
+    读取英语词库，为没有音频的单词生成有道TTS音频。
 
-    for i, word in enumerate(missing, 1):
-        output_path = audio_dir / f"{word}.wav"
-        ok, msg = generate_tts_youdao(word, output_path)
+    :param db_path: SQLite 数据库路径
+    :param audio_dir: 音频文件存放目录
+    :param delay: 每次请求间隔（秒），避免被限流
+    :return: (成功数, 失败数)
+    """
+    with metrics_run("fill_missing_audio") as metrics:
+        audio_dir = Path(audio_dir)
+        with metrics.stage("scan"):
+            missing = find_missing_audio_words(db_path, audio_dir)
 
-        if ok:
-            success += 1
-            print(f"[{i}/{len(missing)}] ✅ {word}")
-        else:
-            fail += 1
-            print(f"[{i}/{len(missing)}] ❌ {word}: {msg}")
+        if not missing:
+            print("所有单词均有音频，无需处理。")
+            return 0, 0
+
+        success = 0
+        fail = 0
+
+        for i, word in enumerate(missing, 1):
+            output_path = audio_dir / f"{word}.wav"
+            item_start = time.perf_counter()
+            ok, msg = generate_tts_youdao(word, output_path)
+            metrics.observe("item", time.perf_counter() - item_start)
+            metrics.count("items_ok" if ok else "items_failed")
+
+            if ok:
+                success += 1
+                print(f"[{i}/{len(missing)}] ✅ {word}")
+            else:
+                fail += 1
+                print(f"[{i}/{len(missing)}] ❌ {word}: {msg}")
 
-        if i < len(missing):
+            if i < len(missing):
+                with metrics.stage("delay"):
+                    time.sleep(delay)
+
+        print(f"\n完成: 成功 {success}, 失败 {fail}")
+        return success, fail
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶限流器。
+
+    以 rate 个/秒的速度补充令牌,最多积攒 capacity 个；
+    acquire() 在没有令牌时阻塞,直到补充出下一个令牌。
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
             time.sleep(delay)
 
-    print(f"\n完成: 成功 {success}, 失败 {fail}")
-    return success, fail
 
-if __name__ == "__main__":
-    # 生成所有缺失的音频
-    success, fail = fill_missing_audio()
+class BackfillProgress:
+    """
+    批量补全音频的断点续传记录。
+
+    以 JSON Lines 追加写入每个单词的处理结果,读取时按顺序回放,
+    后写入的记录覆盖先前的记录。已完成的单词在重新运行时因音频
+    已存在而被跳过；永久失败（无发音）的单词默认也不再重复请求。
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.done: set = set()
+        self.failed: dict = {}
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 中断时可能留下半行,忽略即可
+                        continue
+                    self._apply(record)
+
+    def _apply(self, record: dict) -> None:
+        word = record.get("word")
+        if record.get("ok"):
+            self.done.add(word)
+            self.failed.pop(word, None)
+        else:
+            self.done.discard(word)
+            self.failed[word] = {
+                "error": record.get("error", ""),
+                "permanent": bool(record.get("permanent")),
+            }
+
+    def _append(self, record: dict) -> None:
+        with self._lock:
+            self._apply(record)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def mark_done(self, word: str) -> None:
+        self._append({"word": word, "ok": True})
+
+    def mark_failed(self, word: str, msg: str, permanent: bool = False) -> None:
+        self._append({"word": word, "ok": False, "error": msg, "permanent": permanent})
+
+    def is_permanent_failure(self, word: str) -> bool:
+        info = self.failed.get(word)
+        return info is not None and info["permanent"]
+
+
+def _fetch_with_retry(
+    word: str,
+    bucket: TokenBucket,
+    max_retries: int,
+    backoff: float,
+) -> bytes:
+    """
+    在限流器约束下下载单词发音,可重试错误按指数退避（带抖动）重试。
+    """
+    metrics = get_metrics()
+    attempt = 0
+    while True:
+        with metrics.stage("rate_limit_wait"):
+            bucket.acquire()
+        try:
+            return download_youdao_mp3(word)
+        except YoudaoDownloadError as e:
+            if not e.retryable or attempt >= max_retries:
+                raise
+            metrics.count("retries")
+            with metrics.stage("backoff"):
+                time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+            attempt += 1
+
+
+def fill_missing_audio_concurrent(
+    db_path: str = "words_study/en/en_words.db",
+    audio_dir: str | Path = "words_study/en/audio",
+    rate: float = 2.0,
+    burst: int = 1,
+    fetch_workers: int = 4,
+    transcode_workers: int | None = None,
+    max_retries: int = 3,
+    backoff: float = 1.0,
+    progress_path: str | Path | None = None,
+    retry_failed: bool = False,
+    transcode_backend: str = "auto",
+) -> Tuple[int, int]:
+    """
+    并发版 fill_missing_audio: 下载与转码流水线并行执行。
+
+    - 下载在线程池中执行,所有请求共享一个令牌桶限流器；
+    - 转码提交到进程池,默认进程数为 CPU 核数；
+    - 进度写入 progress_path,中断后重新运行可续传；
+    - 限流/网络错误按指数退避重试,无发音的词条不重试。
+
+    总耗时由接口限流速率决定,而不是串行的请求 + 转码延迟。
+
+    :param db_path: SQLite 数据库路径
+    :param audio_dir: 音频文件存放目录
+    :param rate: 每秒最多发起的下载请求数
+    :param burst: 令牌桶容量（允许的瞬时突发请求数）
+    :param fetch_workers: 下载线程数
+    :param transcode_workers: 转码进程数,None 表示 CPU 核数
+    :param max_retries: 每个单词的最大重试次数
+    :param backoff: 首次重试等待秒数,之后每次翻倍
+    :param progress_path: 进度文件路径,默认 audio_dir/.tts_progress.jsonl
+    :param retry_failed: 是否重新尝试上次被判定为永久失败的单词
+    :param transcode_backend: 转码后端,见 transcode_mp3_to_wav
+    :return: (成功数, 失败数)
+    """
+    with metrics_run("fill_missing_audio_concurrent") as metrics:
+        audio_dir = Path(audio_dir)
+        with metrics.stage("scan"):
+            missing = find_missing_audio_words(db_path, audio_dir)
+
+        if progress_path is None:
+            progress_path = audio_dir / ".tts_progress.jsonl"
+        progress = BackfillProgress(progress_path)
+
+        if not retry_failed:
+            skipped = [w for w in missing if progress.is_permanent_failure(w)]
+            if skipped:
+                print(f"跳过上次无发音的单词: {len(skipped)} 个")
+                missing = [w for w in missing if not progress.is_permanent_failure(w)]
+
+        if not missing:
+            print("所有单词均有音频，无需处理。")
+            return 0, 0
+
+        bucket = TokenBucket(rate, burst)
+        total = len(missing)
+        success = 0
+        fail = 0
+        finished = 0
+
+        def report(word: str, started: float, ok: bool, msg: str, permanent: bool = False) -> None:
+            nonlocal success, fail, finished
+            finished += 1
+            # 单个单词从开始下载到转码完成的总耗时（含限流等待与转码排队）
+            metrics.observe("item", time.perf_counter() - started)
+            metrics.count("items_ok" if ok else "items_failed")
+            if ok:
+                success += 1
+                progress.mark_done(word)
+                print(f"[{finished}/{total}] ✅ {word}")
+            else:
+                fail += 1
+                progress.mark_failed(word, msg, permanent)
+                print(f"[{finished}/{total}] ❌ {word}: {msg}")
+
+        def fetch(word: str) -> Tuple[float, bytes | None, Exception | None]:
+            # 开始时间随结果一起返回,计时按任务而不是按单词记录
+            started = time.perf_counter()
+            try:
+                return started, _fetch_with_retry(word, bucket, max_retries, backoff), None
+            except Exception as e:
+                return started, None, e
+
+        with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool, \
+                ProcessPoolExecutor(max_workers=transcode_workers or os.cpu_count()) as transcode_pool:
+            fetching = {
+                fetch_pool.submit(fetch, word): word
+                for word in missing
+            }
+            transcoding = {}
+
+            while fetching or transcoding:
+                done, _ = wait([*fetching, *transcoding], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetching:
+                        word = fetching.pop(future)
+                        started, mp3_bytes, error = future.result()
+                        if isinstance(error, YoudaoDownloadError):
+                            report(word, started, False, str(error), permanent=not error.retryable)
+                            continue
+                        if error is not None:
+                            report(word, started, False, str(error))
+                            continue
+                        output_path = audio_dir / f"{word}.wav"
+                        transcode_future = transcode_pool.submit(
+                            worker_task(transcode_mp3_to_wav), mp3_bytes, output_path, transcode_backend
+                        )
+                        transcoding[transcode_future] = (word, started)
+                    else:
+                        word, started = transcoding.pop(future)
+                        try:
+                            ok, msg = collect_worker_result(future.result())
+                        except Exception as e:
+                            ok, msg = False, str(e)
+                        report(word, started, ok, msg)
+
+        print(f"\n完成: 成功 {success}, 失败 {fail}")
+        return success, fail
@@ -0,0 +1,371 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from typing import Callable, Iterable, Tuple
+from pathlib import Path
+
+from .tts import (
+    generate_tts_minimax,
+    generate_tts_youdao,
+    WAV_SAMPLE_RATE,
+    WAV_CHANNELS,
+)
+
+
+# 各 provider 影响合成结果的默认参数。缓存键包含完整参数,
+# 修改音色、语速、采样率或更换 provider 都会得到不同的键。
+PROVIDER_DEFAULTS = {
+    "youdao": {
+        "voice_type": 2,
+        "sample_rate": WAV_SAMPLE_RATE,
+        "channels": WAV_CHANNELS,
+    },
+    "minimax": {
+        "model": "speech-2.6-turbo",
+        "voice_id": "Japanese_DecisivePrincess",
+        "language": "Japanese",
+        "sample_rate": 32000,
+        "bitrate": 128000,
+        "pitch": 0,
+        "speed": 1.0,
+        "volume": 1.0,
+        "emotion": "calm",
+    },
+}
+
+
+def normalize_tts_text(text: str, casefold: bool = False) -> str:
+    """
+    规范化待合成文本: NFKC 归一化、去除首尾空白并合并连续空白。
+
+    :param text: 原始文本
+    :param casefold: 是否忽略大小写（英语词条 "Apple" / "apple" 共用一份音频）
+    :return: 规范化后的文本
+    """
+    text = " ".join(unicodedata.normalize("NFKC", text).split())
+    return text.casefold() if casefold else text
+
+
+def resolve_tts_params(provider: str, **overrides) -> dict:
+    """
+    合并 provider 默认参数与调用方覆盖项,得到参与缓存键计算的完整参数。
+    """
+    if provider not in PROVIDER_DEFAULTS:
+        raise ValueError(f"未知 TTS provider: {provider}, 可选 {list(PROVIDER_DEFAULTS)}")
+    defaults = PROVIDER_DEFAULTS[provider]
+    if provider == "youdao" and overrides:
+        raise ValueError("youdao 的合成参数固定,不支持自定义")
+    unknown = set(overrides) - set(defaults)
+    if unknown:
+        raise ValueError(f"{provider} 不支持参数: {sorted(unknown)}")
+    return {**defaults, **overrides}
+
+
+class TTSCache:
+    """
+    内容寻址的 TTS 音频缓存。
+
+    键为 sha256(provider + 完整合成参数 + 规范化文本),音频按键存放在
+    cache_dir/objects/<前两位>/<键>.wav,索引保存在 cache_dir/index.db。
+    超出 max_bytes 时按最近访问时间（LRU）淘汰。
+
+    :param cache_dir: 缓存目录
+    :param max_bytes: 缓存容量上限（字节）,None 表示不限制
+    :param casefold: 规范化文本时是否忽略大小写
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path = ".tts_cache",
+        max_bytes: int | None = None,
+        casefold: bool = False,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.casefold = casefold
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_dir / "index.db"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, "
+            "provider TEXT NOT NULL, "
+            "text TEXT NOT NULL, "
+            "params TEXT NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "last_access REAL NOT NULL"
+            ")"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "TTSCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def make_key(self, provider: str, text: str, params: dict) -> str:
+        payload = json.dumps(
+            {
+                "provider": provider,
+                "params": params,
+                "text": normalize_tts_text(text, self.casefold),
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def object_path(self, key: str) -> Path:
+        return self.objects_dir / key[:2] / f"{key}.wav"
+
+    def get(self, provider: str, text: str, params: dict) -> Path | None:
+        """
+        查询缓存,命中时刷新访问时间并返回音频路径；未命中返回 None。
+        """
+        key = self.make_key(provider, text, params)
+        path = self.object_path(key)
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if not path.exists():
+                # 音频被手动删除,索引随之失效
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return path
+
+    def put(self, provider: str, text: str, params: dict, src_path: str | Path) -> Path:
+        """
+        将已生成的音频文件存入缓存,返回缓存内的路径。
+        """
+        key = self.make_key(provider, text, params)
+        path = self.object_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_suffix(".wav.tmp")
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(str(tmp_path), str(path))
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, provider, text, params, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    provider,
+                    normalize_tts_text(text, self.casefold),
+                    json.dumps(params, ensure_ascii=False, sort_keys=True),
+                    path.stat().st_size,
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes, protect=key)
+        return path
+
+    def get_or_create(
+        self,
+        provider: str,
+        text: str,
+        params: dict,
+        generate: Callable[[Path], Tuple[bool, str]],
+    ) -> Tuple[bool, str, bool]:
+        """
+        命中缓存直接返回；未命中时调用 generate(临时路径) 生成并入库。
+
+        :param generate: 生成函数,接收输出路径,返回 (是否成功, 信息)
+        :return: (是否成功, 缓存路径或错误信息, 是否命中缓存)
+        """
+        path = self.get(provider, text, params)
+        if path is not None:
+            return True, str(path), True
+
+        key = self.make_key(provider, text, params)
+        staging = self.cache_dir / "staging" / f"{key}.wav"
+        staging.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            ok, msg = generate(staging)
+            if not ok:
+                return False, msg, False
+            path = self.put(provider, text, params, staging)
+        finally:
+            staging.unlink(missing_ok=True)
+        return True, str(path), False
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self, max_bytes: int, protect: str | None = None) -> int:
+        """
+        按最近访问时间淘汰,直到缓存总大小不超过 max_bytes。
+
+        :param protect: 不参与淘汰的键（通常是刚写入的条目）
+        :return: 淘汰的条目数
+        """
+        removed = 0
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= max_bytes:
+                return 0
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_access"
+            ).fetchall()
+            for key, size in rows:
+                if total <= max_bytes:
+                    break
+                if key == protect:
+                    continue
+                self.object_path(key).unlink(missing_ok=True)
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            by_provider = dict(
+                self._conn.execute("SELECT provider, COUNT(*) FROM entries GROUP BY provider").fetchall()
+            )
+        return {
+            "cache_dir": str(self.cache_dir),
+            "entries": count,
+            "total_bytes": size,
+            "by_provider": by_provider,
+        }
+
+
+def materialize_audio_file(cached_path: str | Path, output_path: str | Path, link: bool = True) -> None:
+    """
+    把缓存中的音频放到设备音频目录: 优先硬链接,跨盘或不支持时复制。
+
+    目标已经是同一文件（硬链接）时不做任何操作。
+    """
+    cached_path = Path(cached_path)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if output_path.exists():
+        if os.path.samefile(cached_path, output_path):
+            return
+        output_path.unlink()
+
+    if link:
+        try:
+            os.link(cached_path, output_path)
+            return
+        except OSError:
+            pass
+    shutil.copyfile(cached_path, output_path)
+
+
+def synthesize_cached(
+    cache: TTSCache,
+    text: str,
+    output_path: str | Path,
+    provider: str = "youdao",
+    link: bool = True,
+    **params,
+) -> Tuple[bool, str, bool]:
+    """
+    带缓存的 TTS 生成: 命中缓存时不调用接口,直接把缓存音频放到 output_path。
+
+    :param cache: TTSCache 实例
+    :param text: 要合成的文本
+    :param output_path: 设备音频目录中的输出路径
+    :param provider: "youdao" 或 "minimax"
+    :param link: 是否用硬链接代替复制
+    :param params: 合成参数（minimax 的 voice_id / speed / sample_rate 等）
+    :return: (是否成功, 输出路径或错误信息, 是否命中缓存)
+    """
+    full_params = resolve_tts_params(provider, **params)
+
+    if provider == "youdao":
+        def generate(path: Path) -> Tuple[bool, str]:
+            return generate_tts_youdao(text, path)
+    else:
+        def generate(path: Path) -> Tuple[bool, str]:
+            return generate_tts_minimax(text, path, **full_params)
+
+    ok, msg, hit = cache.get_or_create(provider, text, full_params, generate)
+    if not ok:
+        return False, msg, hit
+    materialize_audio_file(msg, output_path, link=link)
+    return True, str(output_path), hit
+
+
+def build_audio_library(
+    words: Iterable[str],
+    audio_dir: str | Path,
+    cache: TTSCache,
+    provider: str = "youdao",
+    link: bool = True,
+    delay: float = 0.0,
+    **params,
+) -> dict:
+    """
+    以缓存为后端生成整个设备音频目录。
+
+    对每个单词写出 audio_dir/<word>.wav: 已缓存的直接链接/复制,
+    只有参数或文本发生变化的条目才会真正请求 TTS 接口。
+
+    :param words: 单词列表（即设备端查找的文件名）
+    :param audio_dir: 设备音频目录
+    :param cache: TTSCache 实例
+    :param provider: "youdao" 或 "minimax"
+    :param link: 是否用硬链接代替复制
+    :param delay: 每次实际请求接口后的等待秒数
+    :param params: 合成参数
+    :return: 统计结果 dict
+    """
+    audio_dir = Path(audio_dir)
+    summary = {
+        "total": 0,
+        "cache_hits": 0,
+        "generated": 0,
+        "failed": 0,
+        "errors": [],
+    }
+
+    for word in words:
+        summary["total"] += 1
+        ok, msg, hit = synthesize_cached(
+            cache, word, audio_dir / f"{word}.wav", provider=provider, link=link, **params
+        )
+        if not ok:
+            summary["failed"] += 1
+            summary["errors"].append({"word": word, "error": msg})
+        elif hit:
+            summary["cache_hits"] += 1
+        else:
+            summary["generated"] += 1
+
+        if not hit and delay > 0:
+            time.sleep(delay)
+
+    return summary